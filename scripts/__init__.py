@@ -19,30 +19,42 @@ Usage:
     extractor.save_results()
 """
 
-from .stock_data_loader import (
-    load_stock_data_from_db, 
-    check_database_contents,
-    create_sample_data,
-    create_sample_data_validation
-)
-
-from .pivot_detector import (
-    detect_pivot_points_ultra_log,
-    combine_overlapping_pivots,
-    get_indices_by_type,
-    safe_date_format
-)
-
-from .trendline_detector import (
-    detect_powerful_trendlines_log,
-    find_iterative_trendline_log,
-    calculate_trendline_strength_log
-)
-
-from .trendline_extractor import (
-    TrendlineExtractor,
-    extract_trendlines_for_symbol
-)
+import importlib
+
+# Public name -> submodule. Submodules are imported on first attribute access
+# (PEP 562), so `from scripts.stock_data_loader import ...` does not pull in
+# the pivot/trendline modules and their dependencies.
+_LAZY_ATTRIBUTES = {
+    'load_stock_data_from_db': 'stock_data_loader',
+    'check_database_contents': 'stock_data_loader',
+    'create_sample_data': 'stock_data_loader',
+    'create_sample_data_validation': 'stock_data_loader',
+    'detect_pivot_points_ultra_log': 'pivot_detector',
+    'combine_overlapping_pivots': 'pivot_detector',
+    'get_indices_by_type': 'pivot_detector',
+    'safe_date_format': 'pivot_detector',
+    'detect_powerful_trendlines_log': 'trendline_detector',
+    'find_iterative_trendline_log': 'trendline_detector',
+    'calculate_trendline_strength_log': 'trendline_detector',
+    'TrendlineExtractor': 'trendline_extractor',
+    'extract_trendlines_for_symbol': 'trendline_extractor',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __version__ = "1.0.0"
 __author__ = "Stock Analysis System"
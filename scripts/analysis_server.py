@@ -0,0 +1,576 @@
+"""
+Analysis Server
+Long-lived JSON-RPC service for the web API's Python analyses
+
+Spawning a Python process per API request re-imports pandas/scipy
+and reloads prices from SQLite every time. This server keeps both warm:
+
+- Analysis modules are imported once, in the server and in a bounded pool of
+  worker processes that run the CPU-bound work
+- Loaded price history is cached per (symbol, days) in the server and handed
+  to the workers; entries expire after a TTL or as soon as the SQLite database
+  (or its WAL file) changes
+
+Protocol: JSON-RPC 2.0 over HTTP on localhost.
+
+    POST /rpc   {"jsonrpc": "2.0", "id": 1, "method": "high_volume_vwap",
+                 "params": {"symbol": "QQQ", "top_volume_days": 30}}
+    GET /health server, pool and cache status
+
+Methods: single_trend_clouds, high_volume_vwap, patterns, fibonacci_pivots.
+Run from the project root (the database and results paths are relative):
+
+    python scripts/analysis_server.py serve --port 8765 --workers 2
+    python scripts/analysis_server.py call high_volume_vwap --params '{"symbol": "QQQ"}'
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import signal
+import argparse
+import threading
+import traceback
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Plots are never shown by the server
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+import pandas as pd
+
+# Add the scripts directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stock_data_loader import load_stock_data_from_db
+from single_trend_cloud_generator import SingleTrendCloudGenerator, suppress_stdout
+from high_volume_anchored_vwap import run_high_volume_vwap_analysis, format_high_volume_vwap_results
+from pivot_detector import detect_pivot_points_ultra_log
+from pattern_detector import TechnicalPatternDetector
+from fibonacci_pivot_detector import analyze_fibonacci_pivots
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Same path stock_data_loader reads, relative to the project root
+DATABASE_PATH = Path('data') / 'stock-data.db'
+
+# JSON-RPC error codes (-32000..-32099 are server-defined)
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+ANALYSIS_ERROR = -32000
+SERVER_BUSY = -32001
+REQUEST_TIMEOUT = -32002
+WORKER_CRASHED = -32003
+
+
+class RPCError(Exception):
+    """Error returned to the client as a JSON-RPC error object"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+# ---------------------------------------------------------------------------
+# Analyses: run in worker processes on already loaded price history
+
+def single_trend_clouds(stock_data, symbol, save=False, force=False, output_dir='results'):
+    """
+    Trend clouds for the last 365 days (SingleTrendCloudGenerator).
+
+    Args:
+        stock_data: None; the generator loads prices itself, and only when its
+                    result cache (keyed by the data watermark) is stale
+        save: Also write <output_dir>/<SYMBOL>_continuous_trend_clouds.json
+        force: Recompute even if the cached result is current
+    """
+    generator = SingleTrendCloudGenerator(cache_dir=Path(output_dir) / 'cache', output_dir=output_dir)
+    results = generator.generate_trend_clouds(symbol, force=force)
+    if save:
+        results['path'] = str(generator.save_results(results, symbol))
+    return results
+
+
+def high_volume_vwap(stock_data, symbol, top_volume_days=30, volume_threshold=80, start_date='2023-01-01'):
+    """VWAPs anchored at the highest-volume days since start_date (same data as api_high_volume_vwap.py)"""
+    stock_data = stock_data[stock_data['Date'] >= pd.Timestamp(start_date)].copy().reset_index(drop=True)
+    if len(stock_data) < 30:
+        raise ValueError(f"Insufficient data for {symbol}: only {len(stock_data)} days available")
+
+    results = run_high_volume_vwap_analysis(
+        stock_data=stock_data,
+        symbol=symbol,
+        start_date=start_date,
+        top_volume_days=top_volume_days,
+        volume_percentile_threshold=volume_threshold,
+        show_plot=False
+    )
+    return dict(
+        {'symbol': symbol},
+        **format_high_volume_vwap_results(results),
+        parameters={
+            'top_volume_days': top_volume_days,
+            'volume_percentile_threshold': volume_threshold,
+            'start_date': start_date
+        }
+    )
+
+
+def patterns(stock_data, symbol, min_strength=0.6):
+    """Chart patterns over ultra-log pivots (as detect_patterns_for_symbol)"""
+    pivots, _, _ = detect_pivot_points_ultra_log(stock_data, combine=True)
+    detector = TechnicalPatternDetector(
+        stock_data=stock_data,
+        high_pivots=[p for p in pivots if p['type'] == 'high'],
+        low_pivots=[p for p in pivots if p['type'] == 'low'],
+        min_strength=min_strength
+    )
+    return {
+        'symbol': symbol,
+        'patterns': detector.detect_all_patterns(),
+        'summary': detector.get_pattern_summary()
+    }
+
+
+def fibonacci_pivots(stock_data, symbol, lookback_window=5, min_strength=0.0005, trend_confirmation=1):
+    """Fibonacci pivots, swings and statistics (analyze_fibonacci_pivots)"""
+    return dict({'symbol': symbol}, **analyze_fibonacci_pivots(
+        stock_data, lookback_window=lookback_window, min_strength=min_strength,
+        trend_confirmation=trend_confirmation))
+
+
+def _symbol(params):
+    symbol = str(params.get('symbol') or '').upper()
+    if not symbol or len(symbol) > 10:
+        raise RPCError(INVALID_PARAMS, "Invalid symbol")
+    return symbol
+
+
+def _int_in_range(params, name, default, low, high):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise RPCError(INVALID_PARAMS, f"{name} must be an integer")
+    if not low <= value <= high:
+        raise RPCError(INVALID_PARAMS, f"{name} must be between {low} and {high}")
+    return value
+
+
+def _number(params, name, default):
+    try:
+        return float(params.get(name, default))
+    except (TypeError, ValueError):
+        raise RPCError(INVALID_PARAMS, f"{name} must be a number")
+
+
+def _single_trend_clouds_request(params):
+    # No price history from the server cache: the generator's result cache decides whether to load
+    return None, {'save': bool(params.get('save', False)), 'force': bool(params.get('force', False))}
+
+
+def _high_volume_vwap_request(params):
+    start_date = str(params.get('start_date', '2023-01-01'))
+    try:
+        datetime.strptime(start_date, '%Y-%m-%d')
+    except ValueError:
+        raise RPCError(INVALID_PARAMS, "start_date must be in YYYY-MM-DD format")
+    return 1000, {'top_volume_days': _int_in_range(params, 'top_volume_days', 30, 1, 100),
+                  'volume_threshold': _int_in_range(params, 'volume_threshold', 80, 50, 99),
+                  'start_date': start_date}
+
+
+def _patterns_request(params):
+    return (_int_in_range(params, 'lookback_days', 365, 50, 10000),
+            {'min_strength': _number(params, 'min_strength', 0.6)})
+
+
+def _fibonacci_pivots_request(params):
+    return (_int_in_range(params, 'lookback_days', 365, 50, 10000),
+            {'lookback_window': _int_in_range(params, 'lookback_window', 5, 1, 100),
+             'min_strength': _number(params, 'min_strength', 0.0005),
+             'trend_confirmation': _int_in_range(params, 'trend_confirmation', 1, 0, 100)})
+
+
+# method -> (params -> (history days or None, analysis arguments), analysis)
+METHODS = {
+    'single_trend_clouds': (_single_trend_clouds_request, single_trend_clouds),
+    'high_volume_vwap': (_high_volume_vwap_request, high_volume_vwap),
+    'patterns': (_patterns_request, patterns),
+    'fibonacci_pivots': (_fibonacci_pivots_request, fibonacci_pivots)
+}
+
+
+def to_json_value(value):
+    """Recursively convert analysis output (numpy, pandas, datetimes, NaN) to plain JSON values"""
+    kind = type(value)
+    if kind is str or kind is int or kind is bool or value is None:
+        return value
+    if kind is float:
+        return value if math.isfinite(value) else None
+    if kind is dict:
+        return {str(k): to_json_value(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): to_json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_json_value(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return [to_json_value(v) for v in value.tolist()]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, (datetime, date, pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+def run_analysis(method, stock_data, symbol, arguments):
+    """Run one analysis quietly and return JSON-ready output (worker process entry point)"""
+    with suppress_stdout():
+        result = METHODS[method][1](stock_data, symbol, **arguments)
+    return to_json_value(result)
+
+
+def _warm_worker():
+    """
+    Worker initializer. Unpickling it already imported this module, and with it
+    pandas and the analysis modules; scipy, which those import on first use, is
+    loaded here so the first request does not pay for it
+    """
+    import scipy.signal
+    import scipy.stats
+
+
+# ---------------------------------------------------------------------------
+# Server state
+
+class PriceCache:
+    """
+    Loader output per (symbol, days), invalidated by TTL or database change.
+
+    Loads are serialized: the loader prints progress, and stdout is swapped
+    out process-wide while it runs.
+    """
+
+    def __init__(self, ttl=300, max_entries=64, database_path=DATABASE_PATH):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.database_path = Path(database_path)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _database_signature(self):
+        signature = []
+        for path in (self.database_path, Path(f"{self.database_path}-wal")):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def get(self, symbol, days, refresh=False):
+        key = (symbol, days)
+        with self._lock:
+            signature = self._database_signature()
+            entry = self.entries.get(key)
+            if (entry and not refresh and entry['signature'] == signature
+                    and time.monotonic() - entry['loaded_at'] < self.ttl):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry['stock_data']
+
+            self.misses += 1
+            with suppress_stdout():
+                stock_data = load_stock_data_from_db(symbol=symbol, days=days, timeframe='1D',
+                                                     filter_premarket=True)
+            if stock_data.empty:
+                raise ValueError(f"No data available for symbol {symbol}")
+
+            self.entries[key] = {'stock_data': stock_data, 'signature': signature,
+                                 'loaded_at': time.monotonic()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return stock_data
+
+    def status(self):
+        with self._lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                    'ttl_seconds': self.ttl, 'symbols': sorted({symbol for symbol, _ in self.entries})}
+
+
+class AnalysisService:
+    """Dispatches RPC calls: cached price history in-process, analyses in a bounded worker pool"""
+
+    def __init__(self, workers=2, max_pending=None, cache_ttl=300, request_timeout=300, queue_timeout=30):
+        """
+        Args:
+            workers: Worker processes for analyses
+            max_pending: Requests admitted at once, running or queued (default: 4 per worker)
+            cache_ttl: Seconds a loaded price history stays valid
+            request_timeout: Default seconds to wait for an analysis result
+            queue_timeout: Seconds a request waits for admission before a busy error
+        """
+        self.workers = workers
+        self.max_pending = max_pending or 4 * workers
+        self.request_timeout = request_timeout
+        self.queue_timeout = queue_timeout
+        self.cache = PriceCache(ttl=cache_ttl)
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self._admission = threading.BoundedSemaphore(self.max_pending)
+        self._pool_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._in_flight = 0
+        self._abandoned = set()
+        self.pool_restarts = 0
+        self._pool = None
+        self._start_pool()
+
+    def _start_pool(self):
+        methods = multiprocessing.get_all_start_methods()
+        # The server is multi-threaded; forking it could copy held locks into workers
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                         initializer=_warm_worker)
+        self._abandoned = set()
+        # Start every worker now so the first requests do not pay the imports
+        for future in [self._pool.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+
+    def _restart_pool(self, broken_pool, terminate=False):
+        with self._pool_lock:
+            if self._pool is broken_pool:
+                if terminate:
+                    # shutdown() never stops a running task; kill the stuck workers
+                    for process in list((broken_pool._processes or {}).values()):
+                        process.terminate()
+                broken_pool.shutdown(wait=False, cancel_futures=True)
+                self._start_pool()
+                self.pool_restarts += 1
+
+    def _release(self, future=None):
+        self._count('_in_flight', -1)
+        self._admission.release()
+
+    def _abandon(self, pool, future):
+        """
+        Track a timed-out analysis that is still running. Once such analyses
+        occupy every worker, no admitted request could run, so the pool is
+        restarted (their slots are freed as their futures fail).
+        """
+        with self._pool_lock:
+            if pool is not self._pool:
+                return
+            self._abandoned = {f for f in self._abandoned if not f.done()} | {future}
+            stuck = len(self._abandoned) >= self.workers
+        if stuck:
+            self._restart_pool(pool, terminate=True)
+
+    def call(self, method, params):
+        """Run a method; raises RPCError"""
+        if method not in METHODS:
+            raise RPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        if not isinstance(params, dict):
+            raise RPCError(INVALID_PARAMS, "params must be an object")
+
+        symbol = _symbol(params)
+        days, arguments = METHODS[method][0](params)
+        timeout = _number(params, 'timeout', self.request_timeout)
+
+        if not self._admission.acquire(timeout=self.queue_timeout):
+            raise RPCError(SERVER_BUSY, f"Server busy: {self.max_pending} requests in progress")
+        self._count('_in_flight', 1)
+        future = None
+        try:
+            try:
+                stock_data = self.cache.get(symbol, days, refresh=bool(params.get('refresh', False))) if days else None
+            except Exception as e:
+                raise RPCError(ANALYSIS_ERROR, f"Failed to load data for {symbol}: {e}")
+
+            pool = self._pool
+            try:
+                future = pool.submit(run_analysis, method, stock_data, symbol, arguments)
+                # The slot is held until the analysis ends, not until this request gives up,
+                # so timed-out work still counts against max_pending
+                future.add_done_callback(self._release)
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                # Drop it if still queued; a running analysis cannot be interrupted
+                if not future.cancel():
+                    self._abandon(pool, future)
+                raise RPCError(REQUEST_TIMEOUT, f"{method} timed out after {timeout:g}s")
+            except BrokenProcessPool:
+                self._restart_pool(pool)
+                raise RPCError(WORKER_CRASHED, f"Worker process died during {method}; pool restarted")
+            except RPCError:
+                raise
+            except Exception as e:
+                raise RPCError(ANALYSIS_ERROR, f"{type(e).__name__}: {e}")
+        finally:
+            if future is None:
+                self._release()
+
+    def _count(self, name, delta):
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def handle(self, request):
+        """Answer one JSON-RPC request object"""
+        request_id = request.get('id') if isinstance(request, dict) else None
+        self._count('requests', 1)
+        try:
+            if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or 'method' not in request:
+                raise RPCError(INVALID_REQUEST, "Invalid JSON-RPC 2.0 request")
+            result = self.call(request['method'], request.get('params', {}))
+            return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except RPCError as e:
+            self._count('errors', 1)
+            return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': str(e)}}
+
+    def status(self):
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'uptime_seconds': time.time() - self.started_at,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'in_flight': self._in_flight,
+            'pool_restarts': self.pool_restarts,
+            'requests': self.requests,
+            'errors': self.errors,
+            'methods': sorted(METHODS),
+            'cache': self.cache.status()
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """POST /rpc (or /) for JSON-RPC, GET /health for status"""
+
+    server_version = 'AnalysisServer/1.0'
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self._send_json(self.server.service.status())
+        else:
+            self._send_json({'error': 'Not found'}, status=404)
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('', '/rpc'):
+            self._send_json({'error': 'Not found'}, status=404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            self._send_json({'jsonrpc': '2.0', 'id': None,
+                             'error': {'code': PARSE_ERROR, 'message': 'Parse error'}})
+            return
+        self._send_json(self.server.service.handle(request))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            sys.stderr.write(f"{self.log_date_time_string()} {format % args}\n")
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=2, max_pending=None, cache_ttl=300,
+          request_timeout=300, verbose=False):
+    """Run the server until interrupted"""
+    service = AnalysisService(workers=workers, max_pending=max_pending, cache_ttl=cache_ttl,
+                              request_timeout=request_timeout)
+    httpd = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    httpd.daemon_threads = True
+    httpd.service = service
+    httpd.verbose = verbose
+    print(f"🚀 Analysis server on http://{host}:{port} ({workers} workers, pid {os.getpid()})",
+          file=sys.stderr, flush=True)
+
+    # Stop the worker pool on SIGTERM too, or its processes outlive the server
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.shutdown()
+        print("🛑 Analysis server stopped", file=sys.stderr)
+
+
+def call_once(method, params):
+    """Run one request in this process without a server (same output as the RPC result)"""
+    if method not in METHODS:
+        raise RPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+    symbol = _symbol(params)
+    days, arguments = METHODS[method][0](params)
+    stock_data = None
+    if days:
+        with suppress_stdout():
+            stock_data = load_stock_data_from_db(symbol=symbol, days=days, timeframe='1D', filter_premarket=True)
+    return run_analysis(method, stock_data, symbol, arguments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Long-lived JSON-RPC analysis server')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='Run the server')
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--workers', type=int, default=2, help='Analysis worker processes')
+    serve_parser.add_argument('--max-pending', type=int, default=None,
+                              help='Requests admitted at once (default: 4 per worker)')
+    serve_parser.add_argument('--cache-ttl', type=float, default=300, help='Seconds price history stays cached')
+    serve_parser.add_argument('--timeout', type=float, default=300, help='Default per-request timeout (s)')
+    serve_parser.add_argument('--verbose', action='store_true', help='Log every HTTP request')
+
+    call_parser = subparsers.add_parser('call', help='Run one request in-process and print the JSON result')
+    call_parser.add_argument('method', choices=sorted(METHODS))
+    call_parser.add_argument('--params', default='{}', help='JSON params object')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.host, args.port, args.workers, args.max_pending, args.cache_ttl, args.timeout, args.verbose)
+        return 0
+
+    try:
+        print(json.dumps({'success': True, 'data': call_once(args.method, json.loads(args.params))}))
+        return 0
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        print(json.dumps({'success': False, 'error': {'message': str(e), 'code': 'ANALYSIS_ERROR'}}))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,7 +30,7 @@ sys.path.append('/Users/khaiyuenlooi/code/khaiyuen/stock-analysis')
 
 try:
     from scripts.stock_data_loader import load_stock_data_from_db
-    from scripts.high_volume_anchored_vwap import run_high_volume_vwap_analysis
+    from scripts.high_volume_anchored_vwap import run_high_volume_vwap_analysis, format_high_volume_vwap_results
 except ImportError as e:
     # Fallback error response
     error_response = {
@@ -112,58 +112,16 @@ def main():
 
         print(f"✅ Analysis completed successfully", file=sys.stderr)
 
-        # Format results for API response
-        volume_anchors = []
-        for anchor in results['volume_anchors']:
-            volume_anchors.append({
-                'date': anchor['date'].strftime('%Y-%m-%d'),
-                'price': float(anchor['price']),
-                'volume': int(anchor['volume']),
-                'volume_ratio': float(anchor['volume_ratio']),
-                'significance_score': float(anchor.get('significance_score', 0)),
-                'days_after': int(anchor['days_after'])
-            })
-
-        # Format VWAP results
-        vwap_results = []
-        for i, (anchor_name, vwap_result) in enumerate(results['vwap_results'].items()):
-            vwap_data = []
-            for vwap_point in vwap_result['vwap_data']:
-                vwap_data.append({
-                    'date': vwap_point['date'].strftime('%Y-%m-%d'),
-                    'vwap': float(vwap_point['vwap']),
-                    'price_deviation': float(vwap_point['price_deviation']),
-                    'current_price': float(vwap_point['current_price'])
-                })
-
-            vwap_results.append({
-                'anchor_id': anchor_name,
-                'anchor_date': vwap_result['anchor']['date'].strftime('%Y-%m-%d'),
-                'vwap_data': vwap_data
-            })
-
-        # Format trend analysis
-        trend_analysis = results['trend_analysis']
-        formatted_trend_analysis = {
-            'current_price': float(trend_analysis['current_price']),
-            'total_vwaps': int(trend_analysis['total_vwaps']),
-            'above_vwap_count': int(trend_analysis['above_vwap_count']),
-            'above_vwap_percentage': float(trend_analysis['above_vwap_percentage']),
-            'average_deviation': float(trend_analysis['average_deviation']),
-            'bullish_trends': int(trend_analysis['bullish_trends']),
-            'bearish_trends': int(trend_analysis['bearish_trends']),
-            'bullish_percentage': float(trend_analysis['bullish_percentage']),
-            'bearish_percentage': float(trend_analysis['bearish_percentage'])
-        }
+        formatted = format_high_volume_vwap_results(results)
 
         # Create API response
         api_response = {
             "success": True,
             "data": {
                 "symbol": symbol,
-                "volume_anchors": volume_anchors,
-                "vwap_results": vwap_results,
-                "trend_analysis": formatted_trend_analysis,
+                "volume_anchors": formatted["volume_anchors"],
+                "vwap_results": formatted["vwap_results"],
+                "trend_analysis": formatted["trend_analysis"],
                 "parameters": {
                     "top_volume_days": top_volume_days,
                     "volume_percentile_threshold": volume_threshold,
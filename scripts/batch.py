@@ -0,0 +1,364 @@
+"""
+Universe Batch Driver
+
+Runs the single or continuous trend cloud generator over a list of symbols with
+bounded concurrency. Every attempt runs in its own worker process with an
+address-space cap, so a symbol that crashes, exhausts memory or hangs is
+killed, retried up to --retries times and finally recorded as failed while the
+rest of the universe keeps going.
+
+Per-symbol status events are appended to <batch-dir>/progress.ndjson as they
+happen, worker output goes to <batch-dir>/logs/<SYMBOL>.log, and a summary with
+per-symbol timing is written to <batch-dir>/summary.json at the end.
+
+Usage:
+    python -m scripts.batch --symbols-file universe.txt --mode single --workers 4
+    python -m scripts.batch --symbols-file universe.txt --mode continuous --workers 2 \\
+        --timeout 1800 --memory-mb 4096 --checkpoint-dir results/checkpoints
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import traceback
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory caps are skipped
+    resource = None
+
+MODES = ('single', 'continuous')
+
+
+def read_symbols(path):
+    """
+    Symbols from a universe file: one or more per line (comma or whitespace
+    separated), '#' starts a comment. Upper-cased, duplicates dropped, order kept.
+    """
+    symbols = []
+    seen = set()
+    with open(path, 'r') as f:
+        for line in f:
+            for token in line.split('#', 1)[0].replace(',', ' ').split():
+                symbol = token.upper()
+                if symbol not in seen:
+                    seen.add(symbol)
+                    symbols.append(symbol)
+    return symbols
+
+
+def run_symbol(symbol, mode, options):
+    """
+    Generate and save trend clouds for one symbol in the current process.
+
+    Returns:
+        Path of the saved results file
+    """
+    if mode == 'single':
+        from single_trend_cloud_generator import generate_single_trend_clouds
+        return generate_single_trend_clouds(symbol, output_dir=options['output_dir'])
+
+    # Only the saved file is needed here, so checkpointed runs save it from the
+    # checkpoint instead of holding every cloud record under the memory cap
+    from continuous_trend_cloud_generator import generate_continuous_trend_clouds
+    incremental = options.get('incremental', False)
+    return generate_continuous_trend_clouds(
+        symbol,
+        analysis_period_years=options.get('years'),
+        window_size=options.get('window_size', 365),
+        step_size=options.get('step_size', 5),
+        output_dir=options['output_dir'],
+        checkpoint_dir=options.get('checkpoint_dir'),
+        incremental=incremental,
+        return_records=incremental or not options.get('checkpoint_dir')
+    )
+
+
+def _symbol_worker(connection, symbol, mode, options, log_path, memory_mb):
+    """Child process entry point: cap memory, redirect output, run, report over the pipe"""
+    if memory_mb and resource is not None:
+        limit = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    with open(log_path, 'a') as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        sys.stdout = sys.stderr = log
+        try:
+            path = run_symbol(symbol, mode, options)
+            connection.send({'status': 'ok', 'output': str(path)})
+        except BaseException as e:
+            log.write(traceback.format_exc())
+            log.flush()
+            # A MemoryError may leave too little headroom to build a long message
+            connection.send({'status': 'error', 'error_type': type(e).__name__,
+                             'error': str(e)[:500]})
+        finally:
+            connection.close()
+
+
+class BatchRunner:
+    """Schedules symbols over a bounded set of isolated worker processes"""
+
+    def __init__(self, mode, workers=1, timeout=None, retries=1, memory_mb=None,
+                 retry_delay=5.0, batch_dir="results/batch", options=None):
+        """
+        Args:
+            mode: 'single' or 'continuous'
+            workers: Maximum concurrent symbol processes
+            timeout: Seconds before an attempt is killed (None = no limit)
+            retries: Extra attempts after a failure or timeout
+            memory_mb: Address-space cap per worker process in MB (None = no cap)
+            retry_delay: Seconds before a failed symbol is eligible again
+            batch_dir: Directory for progress.ndjson, summary.json and logs/
+            options: Generator options passed to run_symbol (output_dir, step_size, ...)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}' (expected one of {MODES})")
+        self.mode = mode
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.memory_mb = memory_mb
+        self.retry_delay = retry_delay
+        self.batch_dir = Path(batch_dir)
+        self.options = dict({'output_dir': 'results'}, **(options or {}))
+        self.progress_path = self.batch_dir / 'progress.ndjson'
+        self.summary_path = self.batch_dir / 'summary.json'
+        self.log_dir = self.batch_dir / 'logs'
+        self._context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+        self._progress = None
+        self._stopping = False
+
+    def _event(self, symbol, event, **fields):
+        entry = dict({'time': datetime.now().isoformat(), 'symbol': symbol, 'event': event}, **fields)
+        self._progress.write(json.dumps(entry, default=str) + '\n')
+        self._progress.flush()
+
+    def _start(self, symbol, attempt):
+        parent_end, child_end = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_symbol_worker,
+            args=(child_end, symbol, self.mode, self.options,
+                  str(self.log_dir / f"{symbol}.log"), self.memory_mb),
+            daemon=True
+        )
+        process.start()
+        child_end.close()
+        self._event(symbol, 'start', attempt=attempt, pid=process.pid)
+        return {'symbol': symbol, 'attempt': attempt, 'process': process,
+                'connection': parent_end, 'started': time.monotonic(), 'message': None}
+
+    def _collect(self, job):
+        """Outcome of a finished job (the process has exited or been killed)"""
+        connection = job['connection']
+        message = job['message']
+        if message is None:
+            try:
+                if connection.poll():
+                    message = connection.recv()
+            except (EOFError, OSError):
+                message = None
+        connection.close()
+        job['process'].join()
+        if message is None:
+            exitcode = job['process'].exitcode
+            reason = f"signal {-exitcode}" if exitcode is not None and exitcode < 0 else f"exit code {exitcode}"
+            message = {'status': 'error', 'error_type': 'WorkerDied',
+                       'error': f"Worker exited without a result ({reason})"}
+        return message
+
+    @staticmethod
+    def _kill(process):
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def run(self, symbols):
+        """
+        Process every symbol and write the summary.
+
+        Returns:
+            Summary dict (also saved to summary.json)
+        """
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        batch_start = time.monotonic()
+        started_at = datetime.now().isoformat()
+
+        records = {symbol: {'symbol': symbol, 'status': 'pending', 'attempts': 0, 'seconds': None,
+                            'total_seconds': 0.0, 'output': None, 'error': None}
+                   for symbol in symbols}
+        pending = deque((symbol, 1, 0.0) for symbol in symbols)
+        running = []
+
+        print(f"🚀 Batch {self.mode}: {len(symbols)} symbols, {self.workers} workers"
+              f"{f', timeout {self.timeout}s' if self.timeout else ''}"
+              f"{f', {self.memory_mb} MB/worker' if self.memory_mb else ''}")
+
+        previous_handler = signal.signal(signal.SIGINT, self._request_stop)
+        self._progress = open(self.progress_path, 'a')
+        try:
+            while (pending or running) and not self._stopping:
+                now = time.monotonic()
+
+                # Fill free slots with the first symbols whose retry delay has passed
+                for _ in range(len(pending)):
+                    if len(running) >= self.workers:
+                        break
+                    symbol, attempt, not_before = pending.popleft()
+                    if not_before > now:
+                        pending.append((symbol, attempt, not_before))
+                        continue
+                    records[symbol]['status'] = 'running'
+                    records[symbol]['attempts'] = attempt
+                    running.append(self._start(symbol, attempt))
+
+                still_running = []
+                for job in running:
+                    process = job['process']
+                    elapsed = time.monotonic() - job['started']
+                    # Drain the result as soon as it is sent, so a large message never blocks the child
+                    if job['message'] is None and job['connection'].poll():
+                        try:
+                            job['message'] = job['connection'].recv()
+                        except (EOFError, OSError):
+                            pass
+
+                    if process.is_alive() and job['message'] is None:
+                        if self.timeout and elapsed > self.timeout:
+                            self._kill(process)
+                            job['message'] = {'status': 'error', 'error_type': 'Timeout',
+                                              'error': f"Exceeded {self.timeout}s"}
+                        else:
+                            still_running.append(job)
+                            continue
+
+                    message = self._collect(job)
+                    self._finish(job, message, elapsed, records, pending)
+                running = still_running
+
+                time.sleep(0.05)
+        finally:
+            for job in running:
+                self._kill(job['process'])
+                job['connection'].close()
+                records[job['symbol']]['status'] = 'interrupted'
+                self._event(job['symbol'], 'interrupted', attempt=job['attempt'])
+            for symbol, _, _ in pending:
+                records[symbol]['status'] = 'interrupted'
+            self._progress.close()
+            self._progress = None
+            signal.signal(signal.SIGINT, previous_handler)
+
+        summary = self._summary(records, started_at, time.monotonic() - batch_start)
+        with open(self.summary_path, 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+
+        interrupted = f", {summary['interrupted']} interrupted" if summary['interrupted'] else ""
+        print(f"✅ Batch complete: {summary['succeeded']} ok, {summary['failed']} failed{interrupted} "
+              f"in {summary['elapsed_seconds']:.1f}s")
+        print(f"💾 Summary: {self.summary_path}")
+        return summary
+
+    def _finish(self, job, message, elapsed, records, pending):
+        symbol, attempt = job['symbol'], job['attempt']
+        record = records[symbol]
+        record['seconds'] = round(elapsed, 3)
+        record['total_seconds'] = round(record['total_seconds'] + elapsed, 3)
+
+        if message['status'] == 'ok':
+            record.update(status='ok', output=message['output'], error=None)
+            self._event(symbol, 'ok', attempt=attempt, seconds=record['seconds'], output=message['output'])
+            print(f"✅ {symbol} ({elapsed:.1f}s)")
+            return
+
+        error = f"{message['error_type']}: {message['error']}"
+        record['error'] = error
+        if attempt <= self.retries:
+            record['status'] = 'retrying'
+            pending.append((symbol, attempt + 1, time.monotonic() + self.retry_delay))
+            self._event(symbol, 'retry', attempt=attempt, seconds=record['seconds'], error=error)
+            print(f"🔁 {symbol} attempt {attempt} failed ({error}), retrying")
+        else:
+            record['status'] = 'timeout' if message['error_type'] == 'Timeout' else 'failed'
+            self._event(symbol, record['status'], attempt=attempt, seconds=record['seconds'], error=error)
+            print(f"❌ {symbol} {record['status']} after {attempt} attempt(s): {error}")
+
+    def _summary(self, records, started_at, elapsed):
+        symbols = list(records.values())
+        succeeded = [r for r in symbols if r['status'] == 'ok']
+        timings = sorted(r['seconds'] for r in succeeded)
+        return {
+            'mode': self.mode,
+            'started_at': started_at,
+            'finished_at': datetime.now().isoformat(),
+            'elapsed_seconds': round(elapsed, 3),
+            'workers': self.workers,
+            'timeout': self.timeout,
+            'retries': self.retries,
+            'memory_mb': self.memory_mb,
+            'options': self.options,
+            'total': len(symbols),
+            'succeeded': len(succeeded),
+            'failed': sum(r['status'] in ('failed', 'timeout') for r in symbols),
+            'interrupted': sum(r['status'] == 'interrupted' for r in symbols),
+            'median_seconds': timings[len(timings) // 2] if timings else None,
+            'max_seconds': timings[-1] if timings else None,
+            # Slowest first, so the symbols that dominate a run are at the top
+            'symbols': sorted(symbols, key=lambda r: -(r['total_seconds'] or 0))
+        }
+
+    def _request_stop(self, signum, frame):
+        print("\n⏹️ Stopping: killing running symbols and writing the summary")
+        self._stopping = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run trend cloud generation over a universe of symbols')
+    parser.add_argument('--symbols-file', required=True, help='File with one or more symbols per line')
+    parser.add_argument('--mode', choices=MODES, default='single')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--timeout', type=float, default=None, help='Seconds per symbol attempt')
+    parser.add_argument('--retries', type=int, default=1, help='Extra attempts after a failure or timeout')
+    parser.add_argument('--retry-delay', type=float, default=5.0)
+    parser.add_argument('--memory-mb', type=int, default=None, help='Address-space cap per worker process')
+    parser.add_argument('--output-dir', default='results')
+    parser.add_argument('--batch-dir', default=None, help='Progress/summary/log directory (default: <output-dir>/batch)')
+    parser.add_argument('--window-size', type=int, default=365, help='Continuous mode window (days)')
+    parser.add_argument('--step-size', type=int, default=5, help='Continuous mode step (days)')
+    parser.add_argument('--years', type=float, default=None, help='Continuous mode: years from the beginning')
+    parser.add_argument('--checkpoint-dir', default=None, help='Continuous mode: resumable checkpoints')
+    parser.add_argument('--incremental', action='store_true', help='Continuous mode: only compute new dates')
+    args = parser.parse_args()
+
+    symbols = read_symbols(args.symbols_file)
+    if not symbols:
+        print(f"❌ No symbols in {args.symbols_file}")
+        sys.exit(1)
+
+    options = {'output_dir': args.output_dir}
+    if args.mode == 'continuous':
+        options.update(window_size=args.window_size, step_size=args.step_size, years=args.years,
+                       checkpoint_dir=args.checkpoint_dir, incremental=args.incremental)
+
+    runner = BatchRunner(args.mode, workers=args.workers, timeout=args.timeout, retries=args.retries,
+                         memory_mb=args.memory_mb, retry_delay=args.retry_delay,
+                         batch_dir=args.batch_dir or Path(args.output_dir) / 'batch', options=options)
+    summary = runner.run(symbols)
+    sys.exit(0 if summary['succeeded'] == summary['total'] else 1)
+
+
+if __name__ == "__main__":
+    main()
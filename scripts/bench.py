@@ -0,0 +1,595 @@
+"""
+Benchmark Suite
+
+Scaling benchmarks for the analysis pipeline on seeded synthetic data, so
+optimizations can be measured and regressions caught against a stored baseline.
+
+Usage:
+    python -m scripts.bench trendlines
+    python -m scripts.bench trendlines --pivots 50 100 500 --save-baseline
+    python -m scripts.bench trendlines --grid --threshold 0.15
+    python -m scripts.bench rolling --workers 1 2 4 8 16
+    python -m scripts.bench server --method high_volume_vwap --requests 100
+    python -m scripts.bench imports --budget 1.0
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import socket
+import argparse
+import contextlib
+import subprocess
+import urllib.request
+import tracemalloc
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the scripts directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from trendline_detector import (
+    detect_powerful_trendlines_log,
+    detect_time_weighted_trendlines_log,
+    find_weighted_iterative_trendline_log,
+    find_weighted_iterative_trendlines_batch,
+    apply_time_weights_to_pivots
+)
+from continuous_trend_cloud_generator import ContinuousTrendCloudGenerator
+
+DEFAULT_BENCH_DIR = Path("results") / "bench"
+
+# Scripts the API routes start in a fresh interpreter, imported the way they run (by path,
+# with the scripts directory on sys.path), and dependencies they must not pull in:
+# the analysis server both routes call, and the scripts each route spawns without it
+API_ENTRY_MODULES = (
+    'analysis_server',
+    'api_high_volume_vwap',          # high-volume-vwap route fallback
+    'single_trend_cloud_generator'   # auto-update route fallback
+)
+DEFERRED_IMPORTS = ('matplotlib', 'yfinance', 'scipy')
+
+
+def make_synthetic_pivots(n_pivots, window_days=365, seed=0):
+    """
+    Create a seeded synthetic window: daily prices plus alternating high/low pivots.
+
+    Pivots sit on a geometric random walk so that many of them line up along
+    a handful of trends, which keeps the refit stage realistic.
+
+    Returns:
+        (pivots, stock_data) in the same format as detect_pivot_points_ultra_log output
+    """
+    rng = np.random.default_rng(seed)
+
+    dates = pd.date_range(end=pd.Timestamp('2024-12-31'), periods=window_days + 1, freq='D')
+    log_prices = np.log(100.0) + np.cumsum(rng.normal(0.0003, 0.012, len(dates)))
+    stock_data = pd.DataFrame({'Date': dates, 'Price': np.exp(log_prices), 'LogPrice': log_prices})
+
+    # Distinct, sorted pivot positions (fall back to sampling with replacement for dense sets)
+    replace = n_pivots > len(dates)
+    indices = np.sort(rng.choice(len(dates), size=n_pivots, replace=replace))
+
+    pivots = []
+    for k, idx in enumerate(indices):
+        pivot_type = 'high' if k % 2 == 0 else 'low'
+        offset = abs(rng.normal(0, 0.01)) * (1 if pivot_type == 'high' else -1)
+        log_price = log_prices[idx] + offset
+        pivots.append({
+            'date': dates[idx],
+            'price': float(np.exp(log_price)),
+            'log_price': float(log_price),
+            'type': pivot_type,
+            'index': int(idx),
+            'method': 'synthetic',
+            'strength': 1
+        })
+
+    return pivots, stock_data
+
+
+def make_synthetic_prices(years=4, seed=0):
+    """Seeded synthetic daily closes (business days) in load_and_clean_data format"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2015-01-02', periods=int(252 * years)) + pd.Timedelta(hours=20)
+    log_prices = np.log(100.0) + np.cumsum(rng.normal(0.0004, 0.013, len(dates)))
+    return pd.DataFrame({'Date': dates, 'Price': np.exp(log_prices), 'LogPrice': log_prices})
+
+
+def _preload_deferred_imports():
+    """
+    Import scipy, which the pivot and trendline modules load on first use, so
+    that the first timed run does not pay for it
+    """
+    import scipy.signal
+    import scipy.stats
+
+
+def _measure(func, memory=True):
+    """Run func once, returning (result, wall_time_s, peak_memory_bytes)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func()
+        wall_time = time.perf_counter() - start
+
+        peak_memory = None
+        if memory:
+            tracemalloc.start()
+            try:
+                func()
+                peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    return result, wall_time, peak_memory
+
+
+def bench_trendline_config(n_pivots, window_days, tolerance_percent, seed=0, memory=True, refit_sample=20):
+    """Benchmark the trendline-stage functions on one synthetic configuration"""
+    pivots, stock_data = make_synthetic_pivots(n_pivots, window_days, seed)
+    config = {'pivots': n_pivots, 'window_days': window_days, 'tolerance_percent': tolerance_percent}
+    records = []
+
+    detectors = [
+        ('detect_powerful_trendlines_log', detect_powerful_trendlines_log, {}),
+        ('detect_time_weighted_trendlines_log', detect_time_weighted_trendlines_log, {}),
+        ('detect_time_weighted_trendlines_log[batched]', detect_time_weighted_trendlines_log,
+         {'batched_refinement': True})
+    ]
+    for name, detector, options in detectors:
+        stats = {}
+
+        def run():
+            stats.clear()
+            return detector(pivots, stock_data, tolerance_percent=tolerance_percent, stats=stats, **options)
+
+        trendlines, wall_time, peak_memory = _measure(run, memory)
+        records.append(dict(config, function=name, wall_time_s=wall_time, peak_memory_bytes=peak_memory,
+                            pairs_total=stats['pairs_total'], pairs_processed=stats['pairs_processed'],
+                            pairs_skipped=stats['pairs_skipped'], refits=stats['refits'],
+                            refit_iterations=stats['refit_iterations'], trendlines=len(trendlines)))
+
+    # Single refits over a fixed, seeded sample of pairs
+    weighted_pivots = apply_time_weights_to_pivots(pivots, stock_data)
+    rng = np.random.default_rng(seed + 1)
+    sample = [tuple(sorted(rng.choice(len(weighted_pivots), size=2, replace=False)))
+              for _ in range(refit_sample)]
+
+    def run_refits():
+        return [find_weighted_iterative_trendline_log(weighted_pivots[i], weighted_pivots[j],
+                                                      weighted_pivots, stock_data,
+                                                      tolerance_percent=tolerance_percent)
+                for i, j in sample]
+
+    results, wall_time, peak_memory = _measure(run_refits, memory)
+    records.append(dict(config, function='find_weighted_iterative_trendline_log',
+                        wall_time_s=wall_time, peak_memory_bytes=peak_memory,
+                        pairs_total=len(sample), pairs_processed=len(sample), pairs_skipped=0,
+                        refits=len(sample),
+                        refit_iterations=sum(r['iterations'] for r in results if r),
+                        trendlines=sum(1 for r in results if r)))
+
+    def run_batched_refits():
+        return find_weighted_iterative_trendlines_batch(sample, weighted_pivots, stock_data,
+                                                        tolerance_percent=tolerance_percent)
+
+    results, wall_time, peak_memory = _measure(run_batched_refits, memory)
+    records.append(dict(config, function='find_weighted_iterative_trendlines_batch',
+                        wall_time_s=wall_time, peak_memory_bytes=peak_memory,
+                        pairs_total=len(sample), pairs_processed=len(sample), pairs_skipped=0,
+                        refits=len(sample),
+                        refit_iterations=sum(r['iterations'] for r in results if r),
+                        trendlines=sum(1 for r in results if r)))
+
+    return records
+
+
+def bench_trendlines(pivot_counts=(50, 100, 250, 500, 1000, 2000),
+                     window_days=(365, 1825),
+                     tolerances=(1.0, 2.0, 3.0),
+                     grid=False, seed=0, memory=True):
+    """
+    Sweep the trendline stage over pivot count, window length and tolerance.
+
+    By default each axis is swept on its own around a base configuration (250
+    pivots and 2% tolerance when listed, first window length); grid=True runs the
+    full cartesian product.
+    """
+    if grid:
+        configs = list(product(pivot_counts, window_days, tolerances))
+    else:
+        base_pivots, base_window, base_tolerance = pivot_counts[0], window_days[0], tolerances[0]
+        if 250 in pivot_counts:
+            base_pivots = 250
+        if 2.0 in tolerances:
+            base_tolerance = 2.0
+        configs = [(n, base_window, base_tolerance) for n in pivot_counts]
+        configs += [(base_pivots, w, base_tolerance) for w in window_days if w != base_window]
+        configs += [(base_pivots, base_window, t) for t in tolerances if t != base_tolerance]
+        configs = list(dict.fromkeys(configs))
+
+    _preload_deferred_imports()
+    records = []
+    for n_pivots, days, tolerance in configs:
+        print(f"⏱️  pivots={n_pivots}, window={days}d, tolerance={tolerance}%")
+        for record in bench_trendline_config(n_pivots, days, tolerance, seed=seed, memory=memory):
+            records.append(record)
+            peak = record['peak_memory_bytes']
+            print(f"   {record['function']}: {record['wall_time_s']:.3f}s, "
+                  f"{record['pairs_processed']:,} pairs ({record['pairs_skipped']:,} skipped), "
+                  f"{record['refit_iterations']} refit iterations"
+                  + (f", peak {peak / 1e6:.1f} MB" if peak is not None else ""))
+
+    return records
+
+
+def bench_rolling(worker_counts=(1, 2, 4, 8, 16), years=4, step_size=10, seed=0, chart_path=None):
+    """
+    Scaling of the continuous generator's process pool over worker counts.
+
+    Every run is checked against the first (sequential when 1 is listed) for
+    identical cloud output; chart_path, if given, gets a wall-time/speedup plot.
+    """
+    _preload_deferred_imports()
+    stock_data = make_synthetic_prices(years, seed)
+    records = []
+    reference = None
+    for workers in worker_counts:
+        generator = ContinuousTrendCloudGenerator(step_size=step_size, workers=workers,
+                                                  output_dir=DEFAULT_BENCH_DIR)
+        results, wall_time, _ = _measure(
+            lambda: generator.generate_trend_clouds('SYNTH', stock_data=stock_data), memory=False
+        )
+        if reference is None:
+            reference = results['trend_clouds']
+        records.append({
+            'function': 'ContinuousTrendCloudGenerator.generate_trend_clouds',
+            'workers': workers,
+            'years': years,
+            'step_size': step_size,
+            'windows': results['metadata']['total_calculation_points'],
+            'wall_time_s': wall_time,
+            'speedup': records[0]['wall_time_s'] / wall_time if records else 1.0,
+            'identical': results['trend_clouds'] == reference
+        })
+        print(f"⏱️  workers={workers}: {wall_time:.2f}s, {records[-1]['speedup']:.2f}x, "
+              f"identical={records[-1]['identical']}")
+
+    if chart_path:
+        write_scaling_chart(records, chart_path)
+        print(f"📈 Chart: {chart_path}")
+
+    return records
+
+
+def _latency_record(mode, method, latencies, **extra):
+    latencies = np.asarray(latencies)
+    return dict({
+        'function': 'analysis_server',
+        'mode': mode,
+        'method': method,
+        'requests': len(latencies),
+        'wall_time_s': float(latencies.sum()),
+        'first_s': float(latencies[0]),
+        'mean_s': float(latencies.mean()),
+        'p50_s': float(np.percentile(latencies, 50)),
+        'p95_s': float(np.percentile(latencies, 95)),
+        'max_s': float(latencies.max())
+    }, **extra)
+
+
+def _rpc(url, method, params, request_id):
+    body = json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def bench_server(method='high_volume_vwap', params=None, requests=100, workers=1, startup_timeout=120):
+    """
+    Latency of sequential requests: a fresh interpreter per request (what the
+    API routes did) against the resident analysis_server.
+
+    Both modes run in the current directory, so run from the project root to
+    measure against the real database.
+    """
+    script = str(Path(__file__).with_name('analysis_server.py'))
+    params = dict(params or {'symbol': 'QQQ'})
+    records = []
+
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, script, 'call', method, '--params', json.dumps(params)],
+                                   capture_output=True, text=True)
+        latencies.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Spawned {method} failed: {completed.stderr.strip()[-500:]}")
+    records.append(_latency_record('spawn', method, latencies))
+    print(f"⏱️  spawn:  {requests} requests, mean {records[-1]['mean_s'] * 1000:.0f} ms, "
+          f"p95 {records[-1]['p95_s'] * 1000:.0f} ms")
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    url = f"http://127.0.0.1:{port}"
+
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, script, 'serve', '--port', str(port), '--workers', str(workers)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"{url}/health") as response:
+                    json.loads(response.read())
+                break
+            except OSError:
+                if server.poll() is not None or time.perf_counter() - start > startup_timeout:
+                    raise RuntimeError("Analysis server did not start")
+                time.sleep(0.1)
+        startup = time.perf_counter() - start
+
+        latencies = []
+        for i in range(requests):
+            start = time.perf_counter()
+            response = _rpc(f"{url}/rpc", method, params, i)
+            latencies.append(time.perf_counter() - start)
+            if 'error' in response:
+                raise RuntimeError(f"Server {method} failed: {response['error']}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    records.append(_latency_record('server', method, latencies, workers=workers, startup_s=startup,
+                                   speedup=records[0]['mean_s'] / float(np.mean(latencies))))
+    print(f"⏱️  server: {requests} requests, mean {records[-1]['mean_s'] * 1000:.0f} ms, "
+          f"p95 {records[-1]['p95_s'] * 1000:.0f} ms (startup {startup:.1f}s, "
+          f"{records[-1]['speedup']:.0f}x faster per request)")
+
+    return records
+
+
+def _import_profile(module):
+    """
+    Total import time (s) of a module in a fresh interpreter, from -X importtime,
+    and the top-level packages it imported
+    """
+    scripts_dir = Path(__file__).resolve().parent
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(scripts_dir),
+                                                                            os.environ.get('PYTHONPATH')])))
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               cwd=scripts_dir.parent, env=environment, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {completed.stderr.strip()[-500:]}")
+
+    total_us = 0
+    packages = set()
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        packages.add(name.strip().split('.')[0])
+    return total_us / 1e6, packages
+
+
+def bench_imports(modules=API_ENTRY_MODULES, budget_s=1.0, repeats=5):
+    """
+    Cold-start import cost of the API entry points against a time budget.
+
+    Each module is imported in a fresh interpreter (best of repeats, as the
+    first run also pays for a cold disk cache). A module is over budget when
+    its import time exceeds budget_s or it imports one of DEFERRED_IMPORTS.
+    """
+    records = []
+    for module in modules:
+        profiles = [_import_profile(module) for _ in range(repeats)]
+        import_time = min(seconds for seconds, _ in profiles)
+        deferred = sorted(set(DEFERRED_IMPORTS) & profiles[0][1])
+        records.append({
+            'function': 'import',
+            'module': module,
+            'repeats': repeats,
+            'wall_time_s': import_time,
+            'budget_s': budget_s,
+            'deferred_imported': deferred,
+            'within_budget': import_time <= budget_s and not deferred
+        })
+        print(f"{'✅' if records[-1]['within_budget'] else '❌'} {module}: {import_time * 1000:.0f} ms"
+              + (f", imports {', '.join(deferred)}" if deferred else ""))
+
+    return records
+
+
+def write_scaling_chart(records, chart_path):
+    """Plot wall time and speedup against worker count"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    workers = [r['workers'] for r in records]
+    fig, (ax_time, ax_speedup) = plt.subplots(1, 2, figsize=(11, 4))
+    ax_time.plot(workers, [r['wall_time_s'] for r in records], marker='o')
+    ax_time.set_xlabel('Workers')
+    ax_time.set_ylabel('Wall time (s)')
+    ax_time.set_xscale('log', base=2)
+    ax_speedup.plot(workers, [r['speedup'] for r in records], marker='o', label='Measured')
+    ax_speedup.plot(workers, [w / workers[0] for w in workers], linestyle='--', label='Linear')
+    ax_speedup.set_xlabel('Workers')
+    ax_speedup.set_ylabel('Speedup')
+    ax_speedup.set_xscale('log', base=2)
+    ax_speedup.legend()
+    fig.suptitle(f"Continuous generator scaling ({records[0]['windows']} windows, {os.cpu_count()} CPUs)")
+    fig.tight_layout()
+
+    Path(chart_path).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(chart_path, dpi=120)
+    plt.close(fig)
+
+
+def _record_key(record, key_fields):
+    return tuple(record.get(field) for field in key_fields)
+
+
+def compare_to_baseline(records, baseline_records, threshold=0.25, metric='wall_time_s',
+                        key_fields=('function', 'pivots', 'window_days', 'tolerance_percent')):
+    """
+    Compare records against a baseline.
+
+    Returns:
+        List of regressions where metric grew by more than threshold (fractional)
+    """
+    baseline = {_record_key(r, key_fields): r for r in baseline_records}
+    regressions = []
+    for record in records:
+        reference = baseline.get(_record_key(record, key_fields))
+        if not reference or not reference.get(metric):
+            continue
+        change = record[metric] / reference[metric] - 1
+        if change > threshold:
+            regressions.append({
+                'key': dict(zip(key_fields, _record_key(record, key_fields))),
+                'metric': metric,
+                'baseline': reference[metric],
+                'current': record[metric],
+                'change': change
+            })
+    return regressions
+
+
+def write_report(suite, records, output_path, regressions=None, threshold=None):
+    """Write benchmark records to JSON"""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        'suite': suite,
+        'generated': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'records': records
+    }
+    if regressions is not None:
+        report['regression_threshold'] = threshold
+        report['regressions'] = regressions
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    return output_path
+
+
+def _finish(suite, records, args, key_fields=('function', 'pivots', 'window_days', 'tolerance_percent')):
+    """Save results, compare with / update the stored baseline, return the exit code"""
+    baseline_path = Path(args.baseline or DEFAULT_BENCH_DIR / f"{suite}_baseline.json")
+    output_path = Path(args.output or DEFAULT_BENCH_DIR / f"{suite}_latest.json")
+
+    regressions = None
+    if baseline_path.exists() and not args.save_baseline:
+        with open(baseline_path, 'r') as f:
+            baseline_records = json.load(f)['records']
+        regressions = compare_to_baseline(records, baseline_records, args.threshold, key_fields=key_fields)
+
+    write_report(suite, records, output_path, regressions, args.threshold)
+    print(f"💾 Saved: {output_path}")
+
+    if args.save_baseline:
+        write_report(suite, records, baseline_path)
+        print(f"💾 Baseline updated: {baseline_path}")
+        return 0
+
+    if regressions is None:
+        print(f"ℹ️  No baseline at {baseline_path} (use --save-baseline to create one)")
+        return 0
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"   {regression['key']}: {regression['baseline']:.4f} → {regression['current']:.4f} "
+                  f"(+{regression['change']:.0%})")
+        return 1
+
+    print(f"✅ No regressions over {args.threshold:.0%} against {baseline_path}")
+    return 0
+
+
+def _add_common_arguments(parser):
+    parser.add_argument('--seed', type=int, default=0, help='Seed for synthetic data')
+    parser.add_argument('--output', help='Results JSON path (default: results/bench/<suite>_latest.json)')
+    parser.add_argument('--baseline', help='Baseline JSON path (default: results/bench/<suite>_baseline.json)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Fractional slowdown that counts as a regression (default: 0.25)')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analysis pipeline benchmarks')
+    subparsers = parser.add_subparsers(dest='suite', required=True)
+
+    trendlines_parser = subparsers.add_parser('trendlines', help='Trendline-stage scaling sweep')
+    trendlines_parser.add_argument('--pivots', type=int, nargs='+', default=[50, 100, 250, 500, 1000, 2000])
+    trendlines_parser.add_argument('--window-days', type=int, nargs='+', default=[365, 1825])
+    trendlines_parser.add_argument('--tolerance', type=float, nargs='+', default=[1.0, 2.0, 3.0])
+    trendlines_parser.add_argument('--grid', action='store_true', help='Full cartesian sweep')
+    trendlines_parser.add_argument('--no-memory', action='store_true', help='Skip peak memory measurement')
+    _add_common_arguments(trendlines_parser)
+
+    rolling_parser = subparsers.add_parser('rolling', help='Continuous generator process-pool scaling')
+    rolling_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    rolling_parser.add_argument('--years', type=float, default=4, help='Years of synthetic prices')
+    rolling_parser.add_argument('--step-size', type=int, default=10, help='Days between windows')
+    rolling_parser.add_argument('--chart', default=str(DEFAULT_BENCH_DIR / 'rolling_scaling.png'),
+                                help='Scaling chart path')
+    _add_common_arguments(rolling_parser)
+
+    server_parser = subparsers.add_parser('server', help='Per-request spawn vs resident analysis server latency')
+    server_parser.add_argument('--method', default='high_volume_vwap',
+                               help='analysis_server method (default: high_volume_vwap)')
+    server_parser.add_argument('--params', default='{"symbol": "QQQ"}', help='JSON params object')
+    server_parser.add_argument('--requests', type=int, default=100, help='Sequential requests per mode')
+    server_parser.add_argument('--workers', type=int, default=1, help='Server worker processes')
+    _add_common_arguments(server_parser)
+
+    imports_parser = subparsers.add_parser('imports', help='Cold-start import time of the API entry points')
+    imports_parser.add_argument('--modules', nargs='+', default=list(API_ENTRY_MODULES))
+    imports_parser.add_argument('--budget', type=float, default=1.0,
+                                help='Maximum import time per module in seconds (default: 1.0)')
+    imports_parser.add_argument('--repeats', type=int, default=5, help='Fresh interpreters per module')
+    _add_common_arguments(imports_parser)
+
+    args = parser.parse_args(argv)
+
+    if args.suite == 'trendlines':
+        records = bench_trendlines(args.pivots, args.window_days, args.tolerance,
+                                   grid=args.grid, seed=args.seed, memory=not args.no_memory)
+        return _finish('trendlines', records, args)
+
+    if args.suite == 'rolling':
+        records = bench_rolling(args.workers, args.years, args.step_size, seed=args.seed, chart_path=args.chart)
+        if not all(r['identical'] for r in records):
+            print("❌ Parallel output differs from the first run")
+            return 1
+        return _finish('rolling', records, args, key_fields=('function', 'workers', 'years', 'step_size'))
+
+    if args.suite == 'server':
+        records = bench_server(args.method, json.loads(args.params), args.requests, args.workers)
+        return _finish('server', records, args, key_fields=('function', 'mode', 'method', 'requests'))
+
+    if args.suite == 'imports':
+        records = bench_imports(args.modules, args.budget, args.repeats)
+        exit_code = _finish('imports', records, args, key_fields=('function', 'module'))
+        if not all(r['within_budget'] for r in records):
+            print(f"❌ Import budget of {args.budget:.2f}s exceeded")
+            return 1
+        return exit_code
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
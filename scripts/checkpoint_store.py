@@ -0,0 +1,174 @@
+"""
+Checkpoint Store Module
+Append-only NDJSON checkpoints of per-window results for resumable runs
+
+Each file holds one symbol under one parameter fingerprint: a header line with
+the fingerprint and parameters, then one line per finished calculation date
+({"calculation_date": ..., "clouds": [...] or null}, plus an optional "detail").
+Lines are flushed and fsynced as they are written, so a killed run loses at
+most the window in flight; a torn final line is ignored on load.
+
+CheckpointRecords reads a run's cloud records back from the file in date order,
+so a run can save its results without holding them in memory.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+
+def parameter_fingerprint(parameters):
+    """Short stable hash of a JSON-serializable parameter dict"""
+    encoded = json.dumps(parameters, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class CheckpointStore:
+    """Durable per-window results for one symbol and parameter set"""
+
+    def __init__(self, path, fingerprint, parameters=None, sync=True):
+        """
+        Args:
+            path: NDJSON checkpoint file (created on first append)
+            fingerprint: Parameter fingerprint the file must carry
+            parameters: Parameters recorded in the header of a new file
+            sync: fsync after every append (durable against power loss, not just crashes)
+        """
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.parameters = parameters or {}
+        self.sync = sync
+        self.details = {}
+        self._file = None
+
+    @classmethod
+    def for_run(cls, checkpoint_dir, symbol, parameters, sync=True):
+        """Store at <checkpoint_dir>/<symbol>_<fingerprint>.ndjson"""
+        fingerprint = parameter_fingerprint(parameters)
+        path = Path(checkpoint_dir) / f"{symbol}_{fingerprint}.ndjson"
+        return cls(path, fingerprint, parameters, sync)
+
+    def load(self):
+        """
+        Completed windows as {calculation_date (ISO): clouds or None}.
+
+        Window details stored alongside are loaded into self.details.
+
+        Raises:
+            ValueError: If the file was written under a different fingerprint
+        """
+        completed = {}
+        for _, entry in self._entries():
+            completed[entry['calculation_date']] = entry['clouds']
+            if entry.get('detail') is not None:
+                self.details[entry['calculation_date']] = entry['detail']
+        return completed
+
+    def index(self):
+        """
+        Completed windows as {calculation_date (ISO): byte offset of its entry}, without
+        keeping any clouds in memory (read an entry with read()).
+
+        Raises:
+            ValueError: If the file was written under a different fingerprint
+        """
+        return {entry['calculation_date']: offset for offset, entry in self._entries()}
+
+    def read(self, offset):
+        """The entry at a byte offset from index(): {'calculation_date', 'clouds'[, 'detail']}"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _entries(self):
+        """Yield (byte offset, entry) for every complete window entry, in file order"""
+        if not self.path.exists():
+            return
+
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line_number, line in enumerate(f):
+                line_offset, offset = offset, offset + len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial line from an interrupted write
+                    continue
+                if line_number == 0:
+                    if entry.get('fingerprint') != self.fingerprint:
+                        raise ValueError(f"Checkpoint {self.path} has fingerprint "
+                                         f"{entry.get('fingerprint')}, expected {self.fingerprint}")
+                    continue
+                yield line_offset, entry
+
+    def append(self, calculation_date, clouds, detail=None):
+        """Durably record one finished calculation date (and optional per-window detail)"""
+        if self._file is None:
+            self._open()
+        entry = {'calculation_date': calculation_date, 'clouds': clouds}
+        if detail is not None:
+            entry['detail'] = detail
+        self._write(entry)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, 'a')
+        if is_new:
+            self._write({'fingerprint': self.fingerprint, 'parameters': self.parameters})
+        elif not self._ends_with_newline():
+            # Terminate a torn final line so the next record starts cleanly
+            self._file.write('\n')
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators=(',', ':'), default=str) + '\n')
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CheckpointRecords:
+    """
+    The cloud records of a run, read lazily from its checkpoint file.
+
+    Iterating yields the records of each calculation date in the given order,
+    reading one checkpoint entry at a time.
+    """
+
+    def __init__(self, store, calculation_dates, count):
+        """
+        Args:
+            store: CheckpointStore holding every listed calculation date
+            calculation_dates: ISO calculation dates with clouds, in output order
+            count: Total number of cloud records over those dates
+        """
+        self.store = store
+        self.calculation_dates = calculation_dates
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        offsets = self.store.index()
+        with open(self.store.path, 'rb') as f:
+            for calculation_date in self.calculation_dates:
+                f.seek(offsets[calculation_date])
+                yield from json.loads(f.readline())['clouds']
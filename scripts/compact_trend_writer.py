@@ -0,0 +1,238 @@
+"""
+Compact Trend Writer Module
+Writes the deduplicated "ultra_compact" trend format read by
+src/lib/data/compact-trend-reader.ts
+
+Layout of results/<SYMBOL>_optimized_analysis/ultra_compact.json:
+    meta:      {symbol, config, date}
+    base_date: ISO date every day offset `d` counts from
+    pivots:    [{id, d, p, t (1=high, 0=low), m (method id), s}], each pivot once
+    windows:   [{id, d, p, pv, c: [{t, p, w, s, r}], t: [{pids, ls, li, s, r2, ld}]}]
+
+Trendline intercepts share the file's origin: log(price) = ls * d + li, with d
+counted from base_date like every other day offset. The detector fits each
+window from its own first bar, so add_window() rebases the intercept,
+li = log_intercept - ls * (window_start - base_date).days, and any line can be
+projected from the file alone.
+
+Pivots are interned across overlapping windows, so each window's trendlines
+only carry pivot-id arrays. An optional binary sidecar (ultra_compact.bin) holds
+the same numeric columns as typed arrays, described in the JSON's `binary`
+entry and memory-mappable with load_compact_columns().
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Index = method id, matching methodFromId() in compact-trend-reader.ts
+PIVOT_METHODS = ('zigzag', 'rolling', 'scipy', 'fractal', 'slope', 'derivative')
+
+
+def method_id(method):
+    """Numeric id of a pivot detection method name (-1 if unknown)"""
+    for index, prefix in enumerate(PIVOT_METHODS):
+        if str(method).startswith(prefix):
+            return index
+    return -1
+
+
+def window_detail(pivots, trendlines, window_start):
+    """
+    JSON-serializable pivots and trendlines of one window, for add_window().
+
+    Trendline connected points are referenced by position in the pivot list;
+    intercepts stay relative to window_start (the window's first bar, the
+    detector's x origin) until add_window() rebases them.
+    """
+    def key(pivot):
+        return (pd.Timestamp(pivot['date']).isoformat(), pivot['type'], float(pivot['price']))
+
+    compact_pivots = []
+    positions = {}
+    for pivot in pivots:
+        positions.setdefault(key(pivot), len(compact_pivots))
+        compact_pivots.append([key(pivot)[0], float(pivot['price']), pivot['type'],
+                               pivot.get('method', ''), float(pivot.get('strength', 1))])
+
+    compact_trendlines = []
+    for trendline in trendlines:
+        compact_trendlines.append({
+            'pivots': [positions[key(point)] for point in trendline['connected_points']
+                       if key(point) in positions],
+            'ls': float(trendline['log_slope']),
+            'li': float(trendline['log_intercept']),
+            's': float(trendline.get('weighted_strength', trendline.get('strength', 0))),
+            'r2': float(trendline.get('r_squared', 0)),
+            'ld': int(trendline.get('length_days', 0))
+        })
+
+    return {'start': pd.Timestamp(window_start).isoformat(), 'pivots': compact_pivots,
+            'trendlines': compact_trendlines}
+
+
+class CompactTrendWriter:
+    """Accumulates windows into the ultra_compact format, interning pivots"""
+
+    def __init__(self, symbol, config, base_date):
+        self.symbol = symbol
+        self.config = config
+        self.base_date = pd.Timestamp(base_date)
+        self.pivots = []
+        self.windows = []
+        self._pivot_ids = {}
+
+    @classmethod
+    def from_existing(cls, data):
+        """Continue a previously written ultra_compact dict (e.g. for incremental runs)"""
+        writer = cls(data['meta']['symbol'], data['meta']['config'], data['base_date'])
+        writer.pivots = list(data['pivots'])
+        writer.windows = list(data['windows'])
+        writer._pivot_ids = {(p['d'], p['p'], p['t'], p['m'], p['s']): p['id'] for p in writer.pivots}
+        return writer
+
+    def _days(self, date):
+        return int((pd.Timestamp(date) - self.base_date).days)
+
+    def intern_pivot(self, date, price, pivot_type, method, strength):
+        """Id of a pivot, adding it on first sight"""
+        entry = (self._days(date), float(price), 1 if pivot_type == 'high' else 0,
+                 method_id(method), float(strength))
+        pivot_id = self._pivot_ids.get(entry)
+        if pivot_id is None:
+            pivot_id = len(self.pivots)
+            self._pivot_ids[entry] = pivot_id
+            d, p, t, m, s = entry
+            self.pivots.append({'id': pivot_id, 'd': d, 'p': p, 't': t, 'm': m, 's': s})
+        return pivot_id
+
+    def add_window(self, calculation_date, current_price, cloud_records, detail=None):
+        """
+        Add one calculation date.
+
+        Args:
+            calculation_date: Window end date
+            current_price: Price at the window end
+            cloud_records: Cloud dicts with center_price, price_range, cloud_type,
+                           softmax_weight and total_weighted_strength
+            detail: window_detail() output, or None to store clusters only
+        """
+        pivot_ids = []
+        trendlines = []
+        if detail:
+            pivot_ids = [self.intern_pivot(*pivot) for pivot in detail['pivots']]
+            start_offset = self._days(detail['start'])
+            trendlines = [{
+                'pids': [pivot_ids[k] for k in trendline['pivots']],
+                'ls': trendline['ls'],
+                'li': trendline['li'] - trendline['ls'] * start_offset,
+                's': trendline['s'],
+                'r2': trendline['r2'],
+                'ld': trendline['ld']
+            } for trendline in detail['trendlines']]
+
+        self.windows.append({
+            'id': len(self.windows),
+            'd': self._days(calculation_date),
+            'p': float(current_price),
+            'pv': len(pivot_ids),
+            'c': [{
+                't': 1 if cloud['cloud_type'] == 'Resistance' else 0,
+                'p': float(cloud['center_price']),
+                'w': float(cloud.get('softmax_weight', 1.0)),
+                's': float(cloud['total_weighted_strength']),
+                'r': [float(cloud['price_range'][0]), float(cloud['price_range'][1])]
+            } for cloud in cloud_records],
+            't': trendlines
+        })
+
+    def to_dict(self):
+        return {
+            'meta': {'symbol': self.symbol, 'config': self.config, 'date': datetime.now().isoformat()},
+            'base_date': self.base_date.isoformat(),
+            'pivots': self.pivots,
+            'windows': self.windows
+        }
+
+    def columns(self):
+        """Numeric columns of the format as typed arrays (CSR offsets for nested lists)"""
+        clouds = [cloud for window in self.windows for cloud in window['c']]
+        trendlines = [trendline for window in self.windows for trendline in window['t']]
+        return {
+            'pivot_id': np.array([p['id'] for p in self.pivots], dtype=np.int32),
+            'pivot_d': np.array([p['d'] for p in self.pivots], dtype=np.int32),
+            'pivot_p': np.array([p['p'] for p in self.pivots], dtype=np.float64),
+            'pivot_t': np.array([p['t'] for p in self.pivots], dtype=np.int8),
+            'pivot_m': np.array([p['m'] for p in self.pivots], dtype=np.int8),
+            'pivot_s': np.array([p['s'] for p in self.pivots], dtype=np.float32),
+            'window_id': np.array([w['id'] for w in self.windows], dtype=np.int32),
+            'window_d': np.array([w['d'] for w in self.windows], dtype=np.int32),
+            'window_p': np.array([w['p'] for w in self.windows], dtype=np.float64),
+            'window_pv': np.array([w['pv'] for w in self.windows], dtype=np.int32),
+            'window_cloud_offsets': np.cumsum([0] + [len(w['c']) for w in self.windows]).astype(np.int64),
+            'window_trendline_offsets': np.cumsum([0] + [len(w['t']) for w in self.windows]).astype(np.int64),
+            'cloud_t': np.array([c['t'] for c in clouds], dtype=np.int8),
+            'cloud_p': np.array([c['p'] for c in clouds], dtype=np.float64),
+            'cloud_w': np.array([c['w'] for c in clouds], dtype=np.float64),
+            'cloud_s': np.array([c['s'] for c in clouds], dtype=np.float64),
+            'cloud_r': np.array([c['r'] for c in clouds], dtype=np.float64).reshape(-1, 2),
+            'trendline_ls': np.array([t['ls'] for t in trendlines], dtype=np.float64),
+            'trendline_li': np.array([t['li'] for t in trendlines], dtype=np.float64),
+            'trendline_s': np.array([t['s'] for t in trendlines], dtype=np.float64),
+            'trendline_r2': np.array([t['r2'] for t in trendlines], dtype=np.float64),
+            'trendline_ld': np.array([t['ld'] for t in trendlines], dtype=np.int32),
+            'trendline_pid_offsets': np.cumsum([0] + [len(t['pids']) for t in trendlines]).astype(np.int64),
+            'trendline_pids': np.array([pid for t in trendlines for pid in t['pids']], dtype=np.int32)
+        }
+
+    def write(self, path, binary=False):
+        """
+        Write the JSON file, plus the .bin column sidecar when binary=True.
+
+        Returns:
+            Path of the JSON file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.to_dict()
+
+        if binary:
+            bin_path = path.with_suffix('.bin')
+            layout = {}
+            offset = 0
+            with open(bin_path, 'wb') as f:
+                for name, values in self.columns().items():
+                    values = np.ascontiguousarray(values)
+                    padding = -offset % 8  # keep every column 8-byte aligned
+                    f.write(b'\0' * padding)
+                    offset += padding
+                    layout[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': offset}
+                    f.write(values.tobytes())
+                    offset += values.nbytes
+            data['binary'] = {'file': bin_path.name, 'columns': layout}
+
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+        return path
+
+
+def load_compact_columns(json_path):
+    """Memory-map the binary sidecar columns described in an ultra_compact.json"""
+    json_path = Path(json_path)
+    with open(json_path, 'r') as f:
+        layout = json.load(f)['binary']
+
+    bin_path = json_path.with_name(layout['file'])
+    columns = {}
+    for name, column in layout['columns'].items():
+        shape = tuple(column['shape'])
+        if int(np.prod(shape)) == 0:
+            columns[name] = np.empty(shape, dtype=np.dtype(column['dtype']))
+            continue
+        columns[name] = np.memmap(bin_path, dtype=np.dtype(column['dtype']), mode='r',
+                                  offset=column['offset'], shape=shape)
+    return columns
@@ -17,8 +17,12 @@ import numpy as np
 import pandas as pd
 import json
 import sys
+import math
+import time
 import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from itertools import groupby
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
@@ -26,8 +30,15 @@ warnings.filterwarnings('ignore')
 # Import our modular components
 from stock_data_loader import load_stock_data_from_db
 from pivot_detector import detect_pivot_points_ultra_log
-from trendline_detector import detect_time_weighted_trendlines_log
-from trend_cloud_detector import detect_trend_clouds, analyze_trend_cloud_metrics
+from trendline_detector import detect_time_weighted_trendlines_log, pivot_key
+from trend_cloud_detector import detect_trend_clouds, analyze_trend_cloud_metrics, cloud_set_deviation
+from time_weights import days_since, time_weights_for_dates
+from shared_arrays import SharedArrays, price_arrays, price_frame
+from checkpoint_store import CheckpointStore, CheckpointRecords, parameter_fingerprint
+from trend_cloud_stream import TrendCloudStreamWriter, TrendCloudStreamReader
+from compact_trend_writer import CompactTrendWriter, window_detail
+from window_profile import timed, summarize_profiles, write_profile_csv
+from market_data_validation import validate_market_data
 
 @contextlib.contextmanager
 def suppress_stdout():
@@ -59,6 +70,21 @@ class ContinuousTrendCloudGenerator:
                  merge_threshold=4.0,
                  max_trend_clouds=6,
                  temperature=2.0,
+                 warm_start=None,
+                 warm_start_check_interval=10,
+                 batched_refinement=True,
+                 pivot_methods=('scipy', 'rolling', 'zigzag', 'fractal'),
+                 recompute_on_change=False,
+                 recompute_weight_drift=0.02,
+                 recompute_check_interval=10,
+                 validate_market_data=False,
+                 workers=1,
+                 checkpoint_dir=None,
+                 return_records=True,
+                 stream_output=False,
+                 compact_output=False,
+                 compact_binary=False,
+                 profile_csv=False,
                  output_dir="results"):
         """
         Initialize the continuous trend cloud generator.
@@ -76,6 +102,45 @@ class ContinuousTrendCloudGenerator:
             merge_threshold: Distance threshold for zone merging ($)
             max_trend_clouds: Maximum trend clouds per window
             temperature: Softmax temperature for weighting
+            warm_start: Seed each window's trendline search from the previous window
+                        ('fast', 'strict' or None for a cold search every window).
+                        'fast' only skips old-pivot pairs ranked below every seed, so
+                        it stays close to the cold search but saves little work
+            warm_start_check_interval: In 'fast' mode, verify every Nth window against a
+                                       cold search to measure divergence (0 = never)
+            batched_refinement: Refine trendline candidates with the vectorized batch
+                                kernel (same trendlines, float-rounding-level differences)
+            pivot_methods: Pivot detection methods combined in each window
+            recompute_on_change: Search trendlines only when the window changed since the
+                                 last full search (new or aged-out pivot, a trendline's
+                                 projections crossing the ±30% band, or time-weight drift);
+                                 otherwise reproject the previous trendlines
+            recompute_weight_drift: Largest tolerated absolute change of any pivot's time
+                                    weight since the last full search (0.02 is about 2
+                                    days at the default 80-day half-life)
+            recompute_check_interval: Also run the full search on every Nth reprojected window
+                                      and record the worst-case cloud deviation (0 = never)
+            validate_market_data: Drop abnormal bars (bad OHLC, closed-market dates,
+                                  aggregated pre-market entries) with the single
+                                  generator's rules; counts go to the metadata
+            workers: Processes analyzing calculation dates in parallel (1 = sequential).
+                     Dates are split into contiguous chunks; with warm_start each
+                     chunk's first window starts cold
+            checkpoint_dir: Append each finished window to an NDJSON checkpoint here and
+                            skip already-completed dates on rerun (None = no checkpoints).
+                            This makes runs resumable; on its own it does not bound
+                            memory, since the returned results hold every cloud record
+            return_records: With checkpoint_dir, False keeps no cloud records in memory:
+                            resumed and new windows are read back from the checkpoint
+                            as needed, results['trend_clouds'] is a CheckpointRecords
+                            view of the file, and save_results streams it to JSON
+            stream_output: Also write <symbol>_continuous_trend_clouds.ndjson (compact line
+                           per calculation date, plus a seek index) as windows finish
+            compact_output: Also write <symbol>_optimized_analysis/ultra_compact.json with
+                            per-window trendlines over interned pivots
+            compact_binary: Add the memory-mappable ultra_compact.bin column sidecar
+            profile_csv: Also write <symbol>_window_profile.csv with per-window stage
+                         timings and counters (the aggregate is always in the metadata)
             output_dir: Directory to save results
         """
         self.window_size = window_size
@@ -90,8 +155,43 @@ class ContinuousTrendCloudGenerator:
         self.merge_threshold = merge_threshold
         self.max_trend_clouds = max_trend_clouds
         self.temperature = temperature
+        self.warm_start = warm_start
+        self.warm_start_check_interval = warm_start_check_interval
+        self.batched_refinement = batched_refinement
+        self.pivot_methods = tuple(pivot_methods)
+        self.recompute_on_change = recompute_on_change
+        self.recompute_weight_drift = recompute_weight_drift
+        self.recompute_check_interval = recompute_check_interval
+        self.validate_market_data = validate_market_data
+        self.workers = workers
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.return_records = return_records
+        if not return_records and not checkpoint_dir:
+            raise ValueError("return_records=False needs a checkpoint_dir to read records back from")
+        self.stream_output = stream_output
+        self.compact_output = compact_output
+        self.compact_binary = compact_binary
+        self.profile_csv = profile_csv
         self.output_dir = Path(output_dir)
 
+        # Previous window's pivots/trendlines, carried between consecutive windows
+        self._warm_start_state = None
+        self._warm_start_log = []
+
+        # Last fully searched window, for change-driven recomputation
+        self._change_reference = None
+        self._reprojected_windows = 0
+
+        # Per-window stage timings and counters (window_profile record format)
+        self._window_profiles = []
+
+        # Rejections per reason of the last validated load (validate_market_data)
+        self.validation_counts = None
+
+        # Sorted column arrays of the DataFrame being analyzed, for window slicing
+        self._columns_source = None
+        self._columns = None
+
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -108,6 +208,11 @@ class ContinuousTrendCloudGenerator:
         if stock_data.empty:
             raise ValueError(f"No data available for symbol {symbol}")
 
+        if self.validate_market_data:
+            valid_mask, self.validation_counts = validate_market_data(
+                stock_data, volume_p99=stock_data['Volume'].quantile(0.99))
+            stock_data = stock_data[valid_mask].copy().reset_index(drop=True)
+
         # Minimal cleaning to preserve historical data
         min_valid_date = pd.Timestamp('1990-01-01')
         max_valid_date = pd.Timestamp.now() + pd.Timedelta(days=1)
@@ -129,84 +234,552 @@ class ContinuousTrendCloudGenerator:
 
         return stock_data
 
-    def analyze_window_at_date(self, stock_data, calculation_date):
-        """Analyze trend clouds for a specific calculation date"""
+    def analyze_window_at_date(self, stock_data, calculation_date, detail=None):
+        """
+        Analyze trend clouds for a specific calculation date.
+
+        If a dict is passed as detail, it receives the window's pivots and trendlines.
+        Stage timings, counters and any swallowed exception are appended to
+        self._window_profiles.
+        """
+        profile = {'calculation_date': calculation_date.isoformat(), 'status': None, 'error': None}
+        self._window_profiles.append(profile)
+        window_start = time.perf_counter()
+        try:
+            return self._analyze_window(stock_data, calculation_date, detail, profile)
+        finally:
+            profile['window_seconds'] = time.perf_counter() - window_start
 
+    def _analyze_window(self, stock_data, calculation_date, detail, profile):
         # Define window bounds
-        end_date = calculation_date
-        start_date = end_date - pd.Timedelta(days=self.window_size)
+        with timed(profile, 'slice'):
+            start, end = self._window_bounds(stock_data, calculation_date)
+            profile['rows'] = end - start
 
-        # Filter to window data
-        window_mask = (stock_data['Date'] >= start_date) & (stock_data['Date'] <= end_date)
-        window_data = stock_data[window_mask].copy().reset_index(drop=True)
+            if end - start < 50:
+                profile['status'] = 'too_few_rows'
+                return None
 
-        if len(window_data) < 50:
-            return None
+            window_data = self._window_frame(stock_data, start, end)
 
         try:
             # Suppress verbose output from underlying functions
             with suppress_stdout():
                 # Detect pivots
-                pivots, swing_highs, swing_lows = detect_pivot_points_ultra_log(
-                    window_data,
-                    methods=['scipy', 'rolling', 'zigzag', 'fractal'],
-                    combine=True
-                )
+                with timed(profile, 'pivots'):
+                    pivots = self.detect_window_pivots(window_data)
+                profile['pivots'] = len(pivots)
 
                 if not pivots:
+                    profile['status'] = 'no_pivots'
+                    self._warm_start_state = None
+                    self._change_reference = None
                     return None
 
-                # Add log prices to pivots
-                for pivot in pivots:
-                    pivot['log_price'] = np.log(pivot['price'])
-
-                # Detect time-weighted trendlines
-                time_weighted_trendlines = detect_time_weighted_trendlines_log(
-                    pivots, window_data,
-                    max_lines=self.max_trendlines,
-                    half_life_days=self.half_life_days,
-                    min_weight=self.min_pivot_weight,
-                    weight_factor=self.weight_factor
-                )
+                # Reuse the last searched trendlines if nothing invalidated them
+                reprojected = None
+                if self.recompute_on_change:
+                    with timed(profile, 'trendlines'):
+                        reprojected = self._reprojected_trendlines(pivots, window_data, profile)
+                    profile['recompute'] = 'full' if reprojected is None else 'reprojected'
+
+                check = reprojected is not None and self._recompute_check_due()
+                if reprojected is None or check:
+                    # Detect time-weighted trendlines
+                    warm_start_args = self._warm_start_args()
+                    trendline_stats = warm_start_args.setdefault('stats', {})
+                    with timed(profile, 'trendlines'):
+                        time_weighted_trendlines = self.detect_window_trendlines(
+                            pivots, window_data, **warm_start_args
+                        )
+                    for counter in ('pairs_total', 'pairs_processed', 'pairs_skipped', 'trendlines_accepted'):
+                        profile[counter] = trendline_stats.get(counter)
+                    if self.recompute_on_change:
+                        self._change_reference = (self._change_state(pivots, time_weighted_trendlines, window_data)
+                                                  if time_weighted_trendlines else None)
+                else:
+                    time_weighted_trendlines = reprojected
+                profile['trendlines'] = len(time_weighted_trendlines)
 
                 if not time_weighted_trendlines:
+                    profile['status'] = 'no_trendlines'
+                    self._warm_start_state = None
                     return None
 
-                # Detect trend clouds using modular detector
-                final_trend_clouds = detect_trend_clouds(
-                    time_weighted_trendlines,
-                    window_data,
-                    projection_days=self.projection_days,
-                    convergence_tolerance=self.convergence_tolerance,
-                    merge_threshold=self.merge_threshold,
-                    min_trendlines=self.min_convergence_trendlines,
-                    max_clouds=self.max_trend_clouds,
-                    temperature=self.temperature
-                )
+                self._warm_start_state = {'pivots': pivots, 'trendlines': time_weighted_trendlines}
+                if detail is not None:
+                    detail['pivots'] = pivots
+                    detail['trendlines'] = time_weighted_trendlines
+                    detail['window_start'] = window_data['Date'].iloc[0]
 
+                # Detect trend clouds using modular detector
+                cloud_stats = {}
+                with timed(profile, 'clouds'):
+                    final_trend_clouds = self.detect_window_clouds(time_weighted_trendlines, window_data,
+                                                                   stats=cloud_stats)
+                profile['projections'] = cloud_stats.get('projections')
+                profile['clouds'] = len(final_trend_clouds)
+
+                if check:
+                    # Verification window: the full result is kept, the reprojection measured
+                    profile['recompute'] = 'checked'
+                    with timed(profile, 'clouds'):
+                        reprojected_clouds = self.detect_window_clouds(reprojected, window_data)
+                    profile.update(cloud_set_deviation(reprojected_clouds, final_trend_clouds,
+                                                       window_data['Price'].iloc[-1]))
+
+            profile['status'] = 'ok' if final_trend_clouds else 'no_clouds'
             return final_trend_clouds if final_trend_clouds else None
 
         except Exception as e:
+            profile['status'] = 'error'
+            profile['error'] = type(e).__name__
+            self._warm_start_state = None
+            self._change_reference = None
             return None
 
-    def generate_trend_clouds(self, symbol, analysis_period_years=None):
+    def _recompute_check_due(self):
+        """Count a reprojected window; True if it should also get the full search"""
+        self._reprojected_windows += 1
+        return bool(self.recompute_check_interval) and \
+            self._reprojected_windows % self.recompute_check_interval == 0
+
+    def _recompute_summary(self, profiles=None):
+        """Skip rate, signal counts and checked deviations for the results metadata"""
+        profiles = self._window_profiles if profiles is None else profiles
+        windows = [p for p in profiles if p.get('recompute')]
+        unchanged = [p for p in windows if p['recompute'] != 'full']
+        checked = [p for p in windows if p['recompute'] == 'checked']
+        signals = {}
+        for profile in windows:
+            for signal in filter(None, profile.get('change_signals', '').split(';')):
+                signals[signal] = signals.get(signal, 0) + 1
+        return {
+            'weight_drift_threshold': self.recompute_weight_drift,
+            'check_interval': self.recompute_check_interval,
+            'windows': len(windows),
+            'reprojected_windows': len(unchanged) - len(checked),
+            'skip_rate': len(unchanged) / len(windows) if windows else None,
+            'signals': signals,
+            'checked_windows': len(checked),
+            'matching_windows': sum(1 for p in checked
+                                    if p['center_deviation'] < 1e-9 and p['count_difference'] == 0),
+            'mean_center_deviation': (float(np.mean([p['center_deviation'] for p in checked]))
+                                      if checked else None),
+            'max_center_deviation': max((p['center_deviation'] for p in checked), default=None),
+            'max_weight_deviation': max((p['weight_deviation'] for p in checked), default=None),
+            'max_count_difference': max((p['count_difference'] for p in checked), default=None)
+        }
+
+    def _change_state(self, pivots, trendlines, window_data):
+        """What change-driven recomputation compares later windows against"""
+        base_date = window_data['Date'].iloc[0]
+        current_date = window_data['Date'].iloc[-1]
+        return {
+            'pivot_keys': {pivot_key(pivot) for pivot in pivots},
+            'connected_keys': {pivot_key(point) for tl in trendlines for point in tl['connected_points']},
+            'base_date': base_date,
+            'current_date': current_date,
+            'trendlines': trendlines,
+            'in_band': self._projection_band(trendlines, base_date, current_date, window_data['Price'].iloc[-1])
+        }
+
+    def _projection_band(self, trendlines, base_date, current_date, current_price):
+        """Per trendline: whether any projected day falls in the detector's ±30% band"""
+        slopes = np.array([tl['log_slope'] for tl in trendlines], dtype=float)
+        intercepts = np.array([tl['log_intercept'] for tl in trendlines], dtype=float)
+        x_future = days_since(base_date, current_date) + np.arange(1, self.projection_days + 1)
+        projected = np.exp(slopes[:, np.newaxis] * x_future + intercepts[:, np.newaxis])
+        return ((0.7 * current_price <= projected) & (projected <= 1.3 * current_price)).any(axis=1)
+
+    def _reprojected_trendlines(self, pivots, window_data, profile):
+        """
+        The reference window's trendlines moved onto this window, or None if a change
+        signal fires (signals are recorded in profile['change_signals']).
+
+        Intercepts are re-based to this window's first date,
+        intercept_new = intercept_old + slope * (base_new - base_old).days,
+        and weighted strengths recomputed from the connected pivots' current weights.
+        """
+        reference = self._change_reference
+        if reference is None:
+            profile['change_signals'] = 'no_reference'
+            return None
+
+        base_date = window_data['Date'].iloc[0]
+        current_date = window_data['Date'].iloc[-1]
+        signals = []
+
+        # Pivot set changes. A removed pivot can only alter the trendlines it was
+        # connected to, since every other line was fitted without it
+        keys = {pivot_key(pivot) for pivot in pivots}
+        removed = (reference['pivot_keys'] - keys) & reference['connected_keys']
+        if keys - reference['pivot_keys']:
+            signals.append('new_pivot')
+        if any(date < base_date for date, _ in removed):
+            signals.append('pivot_aged_out')
+        if any(date >= base_date for date, _ in removed):
+            signals.append('pivot_revised')
+
+        # Time-weight drift: pair priorities mix weights with time spans, so even a
+        # uniform decay eventually reorders the search. Priorities and capture
+        # tolerances both use the absolute weights, so measure the absolute change
+        pivot_dates = [pivot['date'] for pivot in pivots]
+        reference_weights = time_weights_for_dates(pivot_dates, reference['current_date'],
+                                                   self.half_life_days, self.min_pivot_weight)
+        weights = time_weights_for_dates(pivot_dates, current_date, self.half_life_days, self.min_pivot_weight)
+        drift = float(np.max(np.abs(weights - reference_weights)))
+        profile['weight_drift'] = drift
+        if drift > self.recompute_weight_drift:
+            signals.append('weight_drift')
+
+        shift = (base_date - reference['base_date']).days
+        trendlines = []
+        for trendline in reference['trendlines']:
+            point_weights = time_weights_for_dates([p['date'] for p in trendline['connected_points']],
+                                                   current_date, self.half_life_days, self.min_pivot_weight)
+            weighted_strength = float(np.sum(point_weights))
+            trendlines.append(dict(trendline,
+                                   log_intercept=trendline['log_intercept'] + trendline['log_slope'] * shift,
+                                   weighted_strength=weighted_strength,
+                                   average_weight=weighted_strength / trendline['strength']))
+
+        # A trendline entering or leaving the ±30% projection band
+        in_band = self._projection_band(trendlines, base_date, current_date, window_data['Price'].iloc[-1])
+        if np.any(in_band != reference['in_band']):
+            signals.append('projection_band')
+
+        # Same order as the search: floored weights can reorder near-equal strengths
+        trendlines.sort(key=lambda x: (x['weighted_strength'], x['r_squared']), reverse=True)
+
+        profile['change_signals'] = ';'.join(signals)
+        return None if signals else trendlines
+
+    def detect_window_pivots(self, window_data):
+        """Pivot stage: combined pivots of one window, with log prices"""
+        pivots, swing_highs, swing_lows = detect_pivot_points_ultra_log(
+            window_data,
+            methods=list(self.pivot_methods),
+            combine=True
+        )
+
+        # Add log prices to pivots
+        for pivot in pivots:
+            pivot['log_price'] = np.log(pivot['price'])
+
+        return pivots
+
+    def detect_window_trendlines(self, pivots, window_data, **warm_start_args):
+        """Trendline stage: time-weighted trendlines of one window's pivots"""
+        return detect_time_weighted_trendlines_log(
+            pivots, window_data,
+            max_lines=self.max_trendlines,
+            half_life_days=self.half_life_days,
+            min_weight=self.min_pivot_weight,
+            weight_factor=self.weight_factor,
+            batched_refinement=self.batched_refinement,
+            **warm_start_args
+        )
+
+    def detect_window_clouds(self, trendlines, window_data, stats=None):
+        """Cloud stage: final trend clouds from one window's trendlines"""
+        return detect_trend_clouds(
+            trendlines,
+            window_data,
+            projection_days=self.projection_days,
+            convergence_tolerance=self.convergence_tolerance,
+            merge_threshold=self.merge_threshold,
+            min_trendlines=self.min_convergence_trendlines,
+            max_clouds=self.max_trend_clouds,
+            temperature=self.temperature,
+            retain_trendlines=False,
+            stats=stats
+        )
+
+    def _column_arrays(self, stock_data):
+        """Date (int64 ns and datetime64), Price and LogPrice arrays, cached per DataFrame"""
+        if self._columns_source is not stock_data:
+            dates = stock_data['Date'].to_numpy(dtype='datetime64[ns]')
+            self._columns = {
+                'date_ns': dates.view('int64'),
+                'Date': dates,
+                'Price': stock_data['Price'].to_numpy(dtype=float),
+                'LogPrice': stock_data['LogPrice'].to_numpy(dtype=float)
+            }
+            self._columns_source = stock_data
+        return self._columns
+
+    def _window_bounds(self, stock_data, calculation_date):
+        """
+        Row range [start, end) of the window ending at calculation_date.
+
+        Rows with calculation_date - window_size <= Date <= calculation_date, found by
+        binary search on the sorted date column; end - 1 is the latest bar at or
+        before calculation_date.
+        """
+        date_ns = self._column_arrays(stock_data)['date_ns']
+        end_ns = pd.Timestamp(calculation_date).value
+        start_ns = (pd.Timestamp(calculation_date) - pd.Timedelta(days=self.window_size)).value
+        start = int(np.searchsorted(date_ns, start_ns, side='left'))
+        end = int(np.searchsorted(date_ns, end_ns, side='right'))
+        return start, end
+
+    def _window_frame(self, stock_data, start, end):
+        """Window rows as a DataFrame of zero-copy views (row 0 is stock_data row start)"""
+        columns = self._column_arrays(stock_data)
+        return pd.DataFrame({
+            'Date': columns['Date'][start:end],
+            'Price': columns['Price'][start:end],
+            'LogPrice': columns['LogPrice'][start:end]
+        }, copy=False)
+
+    def _warm_start_args(self):
+        """Trendline search arguments seeding this window from the previous one"""
+        if not self.warm_start or self._warm_start_state is None:
+            return {}
+
+        mode = self.warm_start
+        if (mode == 'fast' and self.warm_start_check_interval and
+                (len(self._warm_start_log) + 1) % self.warm_start_check_interval == 0):
+            mode = 'strict'
+
+        stats = {}
+        self._warm_start_log.append(stats)
+        return {
+            'seed_trendlines': self._warm_start_state['trendlines'],
+            'seed_pivots': self._warm_start_state['pivots'],
+            'warm_start_mode': mode,
+            'stats': stats
+        }
+
+    def _warm_start_summary(self):
+        """Aggregate warm-start statistics for the results metadata"""
+        runs = [s['warm_start'] for s in self._warm_start_log if 'warm_start' in s]
+        checked = [r for r in runs if r['divergence'] is not None]
+        divergences = [r['divergence'] for r in checked]
+        return {
+            'mode': self.warm_start,
+            'check_interval': self.warm_start_check_interval,
+            'warm_started_windows': len(runs),
+            'checked_windows': len(checked),
+            'mean_divergence': float(np.mean(divergences)) if divergences else None,
+            'max_divergence': float(np.max(divergences)) if divergences else None,
+            'equivalent_rate': (sum(1 for r in checked if r['equivalent']) / len(checked)
+                                if checked else None),
+            'avg_seeds_dropped': (float(np.mean([r['seeds_dropped'] for r in runs]))
+                                  if runs else None)
+        }
+
+    def window_cloud_records(self, stock_data, calc_date, detail=None):
+        """
+        Analyze one calculation date and return its essential cloud records (None if no clouds).
+
+        If a dict is passed as detail, it receives the window's compact pivots and
+        trendlines (compact_trend_writer.window_detail format).
+        """
+        window = {} if detail is not None else None
+        trend_clouds = self.analyze_window_at_date(stock_data, calc_date, detail=window)
+        if not trend_clouds:
+            return None
+
+        if detail is not None:
+            detail.update(window_detail(window['pivots'], window['trendlines'], window['window_start']))
+
+        return self.cloud_records(stock_data, calc_date, trend_clouds)
+
+    def cloud_records(self, stock_data, calc_date, trend_clouds):
+        """Essential, JSON-ready records of one calculation date's trend clouds"""
+        _, end = self._window_bounds(stock_data, calc_date)
+        current_price = self._column_arrays(stock_data)['Price'][end - 1]
+
+        # Store only essential trend cloud data
+        return [{
+            'calculation_date': calc_date.isoformat(),
+            'projection_start': (calc_date + pd.Timedelta(days=1)).isoformat(),
+            'projection_end': (calc_date + pd.Timedelta(days=self.projection_days)).isoformat(),
+            'center_price': float(cloud['center_price']),
+            'price_range': [float(cloud['price_range'][0]), float(cloud['price_range'][1])],
+            'cloud_type': cloud['cloud_type'],
+            'cloud_id': cloud['cloud_id'],
+            'unique_trendlines': int(cloud['unique_trendlines']),
+            'total_weighted_strength': float(cloud['total_weighted_strength']),
+            'softmax_weight': float(cloud.get('softmax_weight', 1.0)),
+            'merged_from': int(cloud.get('merged_from', 1)),
+            'current_price': float(current_price)
+        } for cloud in trend_clouds]
+
+    def _iter_window_records(self, stock_data, calculation_dates):
+        """Yield (index, cloud records, compact detail or None) for each calculation date, in date order"""
+        if self.workers and self.workers > 1 and len(calculation_dates) > 1:
+            yield from self._iter_window_records_parallel(stock_data, calculation_dates)
+            return
+
+        for i, calc_date in enumerate(calculation_dates):
+            detail = {} if self.compact_output else None
+            cloud_records = self.window_cloud_records(stock_data, calc_date, detail=detail)
+            yield i, cloud_records, detail if cloud_records else None
+
+    def _iter_window_records_parallel(self, stock_data, calculation_dates):
+        """
+        Process pool version of _iter_window_records.
+
+        Price columns are placed once in shared memory; each task is a contiguous
+        chunk of calculation dates, and chunks are consumed in submission order.
+        """
+        chunk_size = max(1, math.ceil(len(calculation_dates) / (self.workers * 4)))
+        chunks = [calculation_dates[k:k + chunk_size] for k in range(0, len(calculation_dates), chunk_size)]
+
+        with SharedArrays.create(price_arrays(stock_data)) as shared:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     initializer=_init_window_worker,
+                                     initargs=(self.worker_parameters(), shared.spec())) as executor:
+                i = 0
+                for chunk_results, warm_start_log, window_profiles in executor.map(_analyze_chunk_worker, chunks):
+                    self._warm_start_log.extend(warm_start_log)
+                    self._window_profiles.extend(window_profiles)
+                    for cloud_records, detail in chunk_results:
+                        yield i, cloud_records, detail
+                        i += 1
+
+    def analyze_chunk(self, stock_data, calculation_dates, on_window=None):
+        """
+        Analyze consecutive calculation dates from a cold start, as one unit of distributed work.
+
+        Args:
+            stock_data: Price data with Date, Price and LogPrice columns
+            calculation_dates: Window end dates, in order
+            on_window: Optional callback(index) after each window (may raise to abort)
+
+        Returns:
+            ((records, detail) per date, warm-start log, window profiles)
+        """
+        self._warm_start_state = None
+        self._warm_start_log = []
+        self._change_reference = None
+        self._reprojected_windows = 0
+        self._window_profiles = []
+        results = []
+        for i, calc_date in enumerate(calculation_dates):
+            detail = {} if self.compact_output else None
+            cloud_records = self.window_cloud_records(stock_data, calc_date, detail=detail)
+            results.append((cloud_records, detail if cloud_records else None))
+            if on_window is not None:
+                on_window(i)
+        return results, self._warm_start_log, self._window_profiles
+
+    def worker_parameters(self):
+        """Constructor arguments for an equivalent sequential generator in a worker process"""
+        return {
+            'window_size': self.window_size,
+            'step_size': self.step_size,
+            'max_trendlines': self.max_trendlines,
+            'projection_days': self.projection_days,
+            'half_life_days': self.half_life_days,
+            'min_pivot_weight': self.min_pivot_weight,
+            'weight_factor': self.weight_factor,
+            'min_convergence_trendlines': self.min_convergence_trendlines,
+            'convergence_tolerance': self.convergence_tolerance,
+            'merge_threshold': self.merge_threshold,
+            'max_trend_clouds': self.max_trend_clouds,
+            'temperature': self.temperature,
+            'warm_start': self.warm_start,
+            'warm_start_check_interval': self.warm_start_check_interval,
+            'batched_refinement': self.batched_refinement,
+            'pivot_methods': list(self.pivot_methods),
+            'recompute_on_change': self.recompute_on_change,
+            'recompute_weight_drift': self.recompute_weight_drift,
+            'recompute_check_interval': self.recompute_check_interval,
+            'validate_market_data': self.validate_market_data,
+            'compact_output': self.compact_output,
+            'workers': 1,
+            'output_dir': str(self.output_dir)
+        }
+
+    def _metadata_parameters(self):
+        """Parameters recorded in the results metadata"""
+        return {
+            'max_trendlines': self.max_trendlines,
+            'projection_days': self.projection_days,
+            'half_life_days': self.half_life_days,
+            'min_pivot_weight': self.min_pivot_weight,
+            'weight_factor': self.weight_factor,
+            'min_convergence_trendlines': self.min_convergence_trendlines,
+            'convergence_tolerance': self.convergence_tolerance,
+            'merge_threshold': self.merge_threshold,
+            'max_trend_clouds': self.max_trend_clouds,
+            'temperature': self.temperature,
+            'batched_refinement': self.batched_refinement,
+            'workers': self.workers
+        }
+
+    def parameter_fingerprint(self):
+        """Fingerprint of every parameter that affects the generated clouds"""
+        return parameter_fingerprint(self._result_parameters())
+
+    def _result_parameters(self):
+        parameters = self.worker_parameters()
+        del parameters['workers'], parameters['output_dir'], parameters['compact_output']
+        return parameters
+
+    def calculation_dates(self, stock_data, analysis_start_date, analysis_end_date):
+        """Window end dates: every step_size days from one window_size after the start"""
+        calculation_dates = []
+        current_date = analysis_start_date + pd.Timedelta(days=self.window_size)
+
+        while current_date <= analysis_end_date:
+            if current_date <= stock_data['Date'].iloc[-1]:
+                calculation_dates.append(current_date)
+            current_date += pd.Timedelta(days=self.step_size)
+
+        return calculation_dates
+
+    def generate_trend_clouds(self, symbol, analysis_period_years=None, stock_data=None, incremental=False):
         """
         Generate trend cloud data for entire available period or specified years.
 
         Args:
             symbol: Stock symbol to analyze
             analysis_period_years: Number of years to analyze from beginning (None = all available)
+            stock_data: Already cleaned price data (as from load_and_clean_data); loaded if None
+            incremental: Extend the saved results in output_dir with only the calculation
+                         dates after their analysis end date (same step alignment);
+                         the saved parameters must match this generator's
 
         Returns:
-            Dict with trend cloud data and metadata
+            Dict with trend cloud data and metadata. All cloud records are kept in
+            memory, including those resumed from a checkpoint, unless return_records
+            is False (then 'trend_clouds' reads them from the checkpoint file)
         """
         print(f"🌤️ Generating trend clouds for {symbol} | Window: {self.window_size}d, Step: {self.step_size}d")
 
-        # Load and clean data
-        stock_data = self.load_and_clean_data(symbol)
+        existing = None
+        if incremental:
+            if not self.return_records:
+                raise ValueError("incremental mode extends the saved records in memory; "
+                                 "it needs return_records=True")
+            if analysis_period_years:
+                raise ValueError("incremental mode always extends to the latest available date")
+            existing = self._load_existing_results(symbol)
 
-        # Define analysis period
-        analysis_start_date = stock_data['Date'].iloc[0]
+        # Load and clean data
+        load_seconds = None
+        self.validation_counts = None
+        if stock_data is None:
+            load_start = time.perf_counter()
+            stock_data = self.load_and_clean_data(symbol)
+            load_seconds = time.perf_counter() - load_start
+
+        self._warm_start_state = None
+        self._warm_start_log = []
+        self._change_reference = None
+        self._reprojected_windows = 0
+        self._window_profiles = []
+
+        # Define analysis period (incremental runs keep the saved step grid)
+        if existing:
+            analysis_start_date = pd.Timestamp(existing['metadata']['analysis_start_date'])
+        else:
+            analysis_start_date = stock_data['Date'].iloc[0]
 
         if analysis_period_years:
             analysis_end_date = analysis_start_date + pd.Timedelta(days=int(analysis_period_years * 365.25))
@@ -215,102 +788,294 @@ class ContinuousTrendCloudGenerator:
             analysis_end_date = stock_data['Date'].iloc[-1]
 
         # Generate calculation dates
-        calculation_dates = []
-        current_date = analysis_start_date + pd.Timedelta(days=self.window_size)
+        calculation_dates = self.calculation_dates(stock_data, analysis_start_date, analysis_end_date)
 
-        while current_date <= analysis_end_date:
-            if current_date <= stock_data['Date'].iloc[-1]:
-                calculation_dates.append(current_date)
-            current_date += pd.Timedelta(days=self.step_size)
+        if existing:
+            previous_end_date = pd.Timestamp(existing['metadata']['analysis_end_date'])
+            calculation_dates = [d for d in calculation_dates if d > previous_end_date]
+            print(f"➕ Incremental: {len(calculation_dates)} new windows after {previous_end_date.date()}")
 
         print(f"📅 {analysis_start_date.date()} → {analysis_end_date.date()} | {len(calculation_dates)} windows")
 
-        # Process each calculation date
+        # Resume from the checkpoint, if any
+        completed = {}
+        store = None
+        if self.checkpoint_dir:
+            store = CheckpointStore.for_run(self.checkpoint_dir, symbol, self._result_parameters())
+            # Without returned records, keep only where each window's entry is
+            completed = store.load() if self.return_records else store.index()
+            if completed:
+                print(f"♻️  Resuming: {len(completed)} windows already in {store.path.name}")
+        pending_dates = [d for d in calculation_dates if d.isoformat() not in completed]
+
+        # Stream finished windows to NDJSON as they arrive
+        stream = None
+        if self.stream_output:
+            stream = TrendCloudStreamWriter(self.stream_path(symbol), {
+                'symbol': symbol,
+                'analysis_start_date': analysis_start_date.isoformat(),
+                'window_size': self.window_size,
+                'step_size': self.step_size,
+                'parameter_fingerprint': self.parameter_fingerprint(),
+                'parameters': self._metadata_parameters()
+            })
+            if existing:
+                for calc_key, group in groupby(existing['trend_clouds'], key=lambda c: c['calculation_date']):
+                    stream.append(calc_key, list(group))
+
+        # Per-window trendline detail in the ultra_compact format
+        compact = None
+        if self.compact_output:
+            compact = self._compact_writer(symbol, analysis_start_date, existing)
+
+        # Process each calculation date, taking checkpointed ones from the store
         all_trend_clouds = []
+        record_dates = []
+        record_count = 0
         successful_calculations = 0
+        pending = self._iter_window_records(stock_data, pending_dates)
+        try:
+            for calc_date in calculation_dates:
+                calc_key = calc_date.isoformat()
+                if calc_key in completed:
+                    if self.return_records:
+                        cloud_records = completed.pop(calc_key)
+                        detail = store.details.pop(calc_key, None)
+                    else:
+                        entry = store.read(completed.pop(calc_key))
+                        cloud_records, detail = entry['clouds'], entry.get('detail')
+                    if detail is not None and 'start' not in detail:
+                        # Checkpointed before window starts were recorded
+                        start, _ = self._window_bounds(stock_data, calc_date)
+                        detail['start'] = pd.Timestamp(self._column_arrays(stock_data)['Date'][start]).isoformat()
+                else:
+                    i, cloud_records, detail = next(pending)
+                    if i % 50 == 0:  # Progress every 50 calculations
+                        progress = (i / len(pending_dates)) * 100
+                        print(f"📊 {progress:.1f}% ({i+1}/{len(pending_dates)}) - {calc_date.date()}")
+                    if store:
+                        store.append(calc_key, cloud_records, detail)
+
+                if cloud_records:
+                    if self.return_records:
+                        all_trend_clouds.extend(cloud_records)
+                    else:
+                        record_dates.append(calc_key)
+                    record_count += len(cloud_records)
+                    successful_calculations += 1
+                    if stream:
+                        stream.append(calc_key, cloud_records)
+                    if compact:
+                        compact.add_window(calc_date, cloud_records[0]['current_price'], cloud_records, detail)
+        except BaseException:
+            if stream:
+                stream.close()
+            raise
+        finally:
+            pending.close()
+            if store:
+                store.close()
 
-        for i, calc_date in enumerate(calculation_dates):
-            if i % 50 == 0:  # Progress every 50 calculations
-                progress = (i / len(calculation_dates)) * 100
-                print(f"📊 {progress:.1f}% ({i+1}/{len(calculation_dates)}) - {calc_date.date()}")
-
-            trend_clouds = self.analyze_window_at_date(stock_data, calc_date)
-
-            if trend_clouds:
-                current_price = stock_data[stock_data['Date'] <= calc_date]['Price'].iloc[-1]
-
-                for cloud in trend_clouds:
-                    # Store only essential trend cloud data
-                    trend_cloud_data = {
-                        'calculation_date': calc_date.isoformat(),
-                        'projection_start': (calc_date + pd.Timedelta(days=1)).isoformat(),
-                        'projection_end': (calc_date + pd.Timedelta(days=self.projection_days)).isoformat(),
-                        'center_price': float(cloud['center_price']),
-                        'price_range': [float(cloud['price_range'][0]), float(cloud['price_range'][1])],
-                        'cloud_type': cloud['cloud_type'],
-                        'cloud_id': cloud['cloud_id'],
-                        'unique_trendlines': int(cloud['unique_trendlines']),
-                        'total_weighted_strength': float(cloud['total_weighted_strength']),
-                        'softmax_weight': float(cloud.get('softmax_weight', 1.0)),
-                        'merged_from': int(cloud.get('merged_from', 1)),
-                        'current_price': float(current_price)
-                    }
-                    all_trend_clouds.append(trend_cloud_data)
-
-                successful_calculations += 1
-
-        print(f"✅ Complete! {successful_calculations}/{len(calculation_dates)} windows, {len(all_trend_clouds)} clouds")
+        if not self.return_records:
+            all_trend_clouds = CheckpointRecords(store, record_dates, record_count)
+
+        print(f"✅ Complete! {successful_calculations}/{len(calculation_dates)} windows, {record_count} clouds")
 
         # Create comprehensive results
         results = {
-            'metadata': {
-                'symbol': symbol,
-                'generation_date': datetime.now().isoformat(),
-                'analysis_start_date': analysis_start_date.isoformat(),
-                'analysis_end_date': analysis_end_date.isoformat(),
-                'analysis_period_days': (analysis_end_date - analysis_start_date).days,
-                'window_size': self.window_size,
-                'step_size': self.step_size,
-                'successful_calculations': successful_calculations,
-                'total_calculation_points': len(calculation_dates),
-                'total_trend_clouds': len(all_trend_clouds),
-                'parameters': {
-                    'max_trendlines': self.max_trendlines,
-                    'projection_days': self.projection_days,
-                    'half_life_days': self.half_life_days,
-                    'min_pivot_weight': self.min_pivot_weight,
-                    'weight_factor': self.weight_factor,
-                    'min_convergence_trendlines': self.min_convergence_trendlines,
-                    'convergence_tolerance': self.convergence_tolerance,
-                    'merge_threshold': self.merge_threshold,
-                    'max_trend_clouds': self.max_trend_clouds,
-                    'temperature': self.temperature
-                }
-            },
+            'metadata': self.results_metadata(symbol, analysis_start_date, analysis_end_date,
+                                              len(calculation_dates), successful_calculations,
+                                              len(all_trend_clouds)),
             'trend_clouds': all_trend_clouds
         }
 
+        if self.warm_start:
+            results['metadata']['warm_start'] = self._warm_start_summary()
+
+        if self.recompute_on_change:
+            results['metadata']['recompute'] = self._recompute_summary()
+
+        if self.validate_market_data and self.validation_counts is not None:
+            results['metadata']['validation'] = dict(self.validation_counts)
+
+        # Stage timings and counters of the windows computed in this run
+        results['metadata']['profile'] = summarize_profiles(self._window_profiles, load_seconds)
+        if self.profile_csv:
+            profile_path = write_profile_csv(self._window_profiles, self.profile_path(symbol))
+            print(f"⏱️ Window profile: {profile_path}")
+
+        if existing:
+            results = self._extend_results(existing, results)
+            all_trend_clouds = results['trend_clouds']
+
         # Summary statistics
         if all_trend_clouds:
-            df = pd.DataFrame(all_trend_clouds)
-            resistance_count = len(df[df['cloud_type'] == 'Resistance'])
-            support_count = len(df[df['cloud_type'] == 'Support'])
-            avg_strength = df['total_weighted_strength'].mean()
-            avg_trendlines = df['unique_trendlines'].mean()
-            merged_count = len(df[df['merged_from'] > 1])
-
-            results['summary'] = {
-                'resistance_clouds': resistance_count,
-                'support_clouds': support_count,
-                'avg_strength': float(avg_strength),
-                'avg_trendlines_per_cloud': float(avg_trendlines),
-                'merged_cloud_count': merged_count,
-                'merge_rate_percent': float(merged_count / len(all_trend_clouds) * 100)
-            }
+            results['summary'] = self.results_summary(all_trend_clouds)
 
+        if compact:
+            compact_path = compact.write(self.compact_path(symbol), binary=self.compact_binary)
+            print(f"💾 Compact: {compact_path} ({compact_path.stat().st_size:,} bytes)")
+
+        if stream:
+            stream.close(results['metadata'], results.get('summary'))
+            print(f"💾 Streamed: {stream.path.name} ({stream.records} calculation dates)")
 
         return results
 
+    def results_metadata(self, symbol, analysis_start_date, analysis_end_date,
+                         total_calculation_points, successful_calculations, total_trend_clouds):
+        """Core results metadata of a run"""
+        return {
+            'symbol': symbol,
+            'generation_date': datetime.now().isoformat(),
+            'analysis_start_date': analysis_start_date.isoformat(),
+            'analysis_end_date': analysis_end_date.isoformat(),
+            'analysis_period_days': (analysis_end_date - analysis_start_date).days,
+            'window_size': self.window_size,
+            'step_size': self.step_size,
+            'successful_calculations': successful_calculations,
+            'total_calculation_points': total_calculation_points,
+            'total_trend_clouds': total_trend_clouds,
+            'parameter_fingerprint': self.parameter_fingerprint(),
+            'parameters': self._metadata_parameters()
+        }
+
+    def results_summary(self, all_trend_clouds):
+        """Summary statistics over a non-empty list (or CheckpointRecords) of cloud records"""
+        if isinstance(all_trend_clouds, CheckpointRecords):
+            return self._streamed_summary(all_trend_clouds)
+
+        df = pd.DataFrame(all_trend_clouds)
+        resistance_count = len(df[df['cloud_type'] == 'Resistance'])
+        support_count = len(df[df['cloud_type'] == 'Support'])
+        avg_strength = df['total_weighted_strength'].mean()
+        avg_trendlines = df['unique_trendlines'].mean()
+        merged_count = len(df[df['merged_from'] > 1])
+
+        return {
+            'resistance_clouds': resistance_count,
+            'support_clouds': support_count,
+            'avg_strength': float(avg_strength),
+            'avg_trendlines_per_cloud': float(avg_trendlines),
+            'merged_cloud_count': merged_count,
+            'merge_rate_percent': float(merged_count / len(all_trend_clouds) * 100)
+        }
+
+    def _streamed_summary(self, records):
+        """results_summary in one pass over the records (means may differ in the last digit)"""
+        resistance_count = support_count = merged_count = total_trendlines = 0
+        total_strength = 0.0
+        for cloud in records:
+            resistance_count += cloud['cloud_type'] == 'Resistance'
+            support_count += cloud['cloud_type'] == 'Support'
+            merged_count += cloud['merged_from'] > 1
+            total_strength += cloud['total_weighted_strength']
+            total_trendlines += cloud['unique_trendlines']
+
+        return {
+            'resistance_clouds': resistance_count,
+            'support_clouds': support_count,
+            'avg_strength': float(total_strength / len(records)),
+            'avg_trendlines_per_cloud': float(total_trendlines / len(records)),
+            'merged_cloud_count': merged_count,
+            'merge_rate_percent': float(merged_count / len(records) * 100)
+        }
+
+    def _load_existing_results(self, symbol):
+        """
+        Saved results to extend incrementally, or None if there are none yet.
+
+        Raises:
+            ValueError: If the saved window, step or parameters differ from this generator's
+        """
+        json_path = self.output_dir / f"{symbol}_continuous_trend_clouds.json"
+        if not json_path.exists():
+            print(f"ℹ️  No saved results at {json_path}, running full history")
+            return None
+
+        existing = self.load_results(json_path)
+        metadata = existing['metadata']
+
+        mismatches = []
+        for key, value in (('window_size', self.window_size), ('step_size', self.step_size)):
+            if metadata.get(key) != value:
+                mismatches.append(f"{key}: saved {metadata.get(key)}, current {value}")
+
+        # Files written before fingerprints existed are checked parameter by parameter
+        saved_fingerprint = metadata.get('parameter_fingerprint')
+        if saved_fingerprint and saved_fingerprint != self.parameter_fingerprint():
+            mismatches.append(f"parameter_fingerprint: saved {saved_fingerprint}, "
+                              f"current {self.parameter_fingerprint()}")
+        current_parameters = self._result_parameters()
+        for key, value in metadata.get('parameters', {}).items():
+            if key in current_parameters and current_parameters[key] != value:
+                mismatches.append(f"{key}: saved {value}, current {current_parameters[key]}")
+
+        if mismatches:
+            raise ValueError(f"Saved results for {symbol} were generated with different parameters: "
+                             + "; ".join(mismatches))
+        return existing
+
+    def _extend_results(self, existing, results):
+        """Append a run over newer calculation dates to previously saved results"""
+        saved = existing['metadata']
+        new = results['metadata']
+
+        metadata = dict(saved)
+        metadata.update({
+            'generation_date': new['generation_date'],
+            'analysis_end_date': new['analysis_end_date'],
+            'analysis_period_days': new['analysis_period_days'],
+            'successful_calculations': saved['successful_calculations'] + new['successful_calculations'],
+            'total_calculation_points': saved['total_calculation_points'] + new['total_calculation_points'],
+            'parameter_fingerprint': new['parameter_fingerprint'],
+            'parameters': new['parameters'],
+            'incremental': {
+                'previous_end_date': saved['analysis_end_date'],
+                'new_calculation_points': new['total_calculation_points'],
+                'new_trend_clouds': new['total_trend_clouds']
+            }
+        })
+        if 'warm_start' in new:
+            metadata['warm_start'] = new['warm_start']
+        if 'recompute' in new:
+            metadata['recompute'] = new['recompute']
+        if 'validation' in new:
+            metadata['validation'] = new['validation']
+        metadata['profile'] = new['profile']
+
+        trend_clouds = existing['trend_clouds'] + results['trend_clouds']
+        metadata['total_trend_clouds'] = len(trend_clouds)
+        return {'metadata': metadata, 'trend_clouds': trend_clouds}
+
+    def compact_path(self, symbol):
+        """Path of the ultra_compact results read by compact-trend-reader.ts"""
+        return self.output_dir / f"{symbol}_optimized_analysis" / "ultra_compact.json"
+
+    def _compact_writer(self, symbol, analysis_start_date, existing=None):
+        """Compact writer for this run, continuing the saved compact file in incremental mode"""
+        compact_path = self.compact_path(symbol)
+        if existing and compact_path.exists():
+            with open(compact_path, 'r') as f:
+                return CompactTrendWriter.from_existing(json.load(f))
+
+        config = dict(self._metadata_parameters(), window_size=self.window_size, step_size=self.step_size)
+        writer = CompactTrendWriter(symbol, config, analysis_start_date)
+        if existing:
+            # Saved windows without a compact file keep their clusters only
+            for _, group in groupby(existing['trend_clouds'], key=lambda c: c['calculation_date']):
+                group = list(group)
+                writer.add_window(group[0]['calculation_date'], group[0]['current_price'], group)
+        return writer
+
+    def profile_path(self, symbol):
+        """Path of the per-window profile CSV for symbol"""
+        return self.output_dir / f"{symbol}_window_profile.csv"
+
+    def stream_path(self, symbol):
+        """Path of the streamed NDJSON results for symbol"""
+        return self.output_dir / f"{symbol}_continuous_trend_clouds.ndjson"
+
     def save_results(self, results, symbol, suffix=""):
         """Save trend cloud results to JSON file"""
         base_filename = f"{symbol}_continuous_trend_clouds{suffix}"
@@ -318,7 +1083,10 @@ class ContinuousTrendCloudGenerator:
         # Save as JSON for easy reading/analysis
         json_path = self.output_dir / f"{base_filename}.json"
         with open(json_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+            if isinstance(results.get('trend_clouds'), CheckpointRecords):
+                _dump_streamed(results, f)
+            else:
+                json.dump(results, f, indent=2, default=str)
 
         print(f"💾 Saved: {json_path.name} ({json_path.stat().st_size:,} bytes)")
 
@@ -331,15 +1099,58 @@ class ContinuousTrendCloudGenerator:
         if filepath.suffix == '.json':
             with open(filepath, 'r') as f:
                 return json.load(f)
+        elif filepath.suffix == '.ndjson':
+            return TrendCloudStreamReader(filepath).load_results()
         else:
-            raise ValueError("File must be .json")
+            raise ValueError("File must be .json or .ndjson")
+
+
+def _dump_streamed(results, f):
+    """
+    json.dump(results, f, indent=2, default=str), writing CheckpointRecords values
+    one record at a time instead of materializing them.
+    """
+    f.write('{')
+    for n, (key, value) in enumerate(results.items()):
+        f.write((',' if n else '') + '\n  ' + json.dumps(key) + ': ')
+        if not isinstance(value, CheckpointRecords):
+            f.write(json.dumps(value, indent=2, default=str).replace('\n', '\n  '))
+        elif not value:
+            f.write('[]')
+        else:
+            f.write('[')
+            for m, record in enumerate(value):
+                f.write((',' if m else '') + '\n    ' +
+                        json.dumps(record, indent=2, default=str).replace('\n', '\n    '))
+            f.write('\n  ]')
+    f.write('\n}' if results else '}')
+
+
+_window_worker_state = {}
+
+
+def _init_window_worker(generator_parameters, shared_spec):
+    """Pool initializer: attach the shared price arrays and build a sequential generator"""
+    shared = SharedArrays.attach(shared_spec)
+    _window_worker_state['shared'] = shared  # keeps the shared blocks mapped
+    _window_worker_state['stock_data'] = price_frame(shared.arrays)
+    _window_worker_state['generator'] = ContinuousTrendCloudGenerator(**generator_parameters)
+
+
+def _analyze_chunk_worker(calculation_dates):
+    """Analyze consecutive calculation dates in a worker (see analyze_chunk)"""
+    generator = _window_worker_state['generator']
+    return generator.analyze_chunk(_window_worker_state['stock_data'], calculation_dates)
 
 
 def generate_continuous_trend_clouds(symbol,
                                    analysis_period_years=None,
                                    window_size=365,
                                    step_size=5,
-                                   output_dir="results"):
+                                   output_dir="results",
+                                   checkpoint_dir=None,
+                                   incremental=False,
+                                   return_records=True):
     """
     Convenience function to generate continuous trend clouds for a symbol
 
@@ -349,6 +1160,10 @@ def generate_continuous_trend_clouds(symbol,
         window_size: Analysis window size in days
         step_size: Days between calculation windows
         output_dir: Directory to save results
+        checkpoint_dir: Directory for resumable per-window checkpoints (None = off)
+        incremental: Only compute calculation dates newer than the saved results
+        return_records: False saves the results from the checkpoint without holding
+                        the cloud records in memory (needs checkpoint_dir)
 
     Returns:
         Path to saved results file
@@ -356,10 +1171,12 @@ def generate_continuous_trend_clouds(symbol,
     generator = ContinuousTrendCloudGenerator(
         window_size=window_size,
         step_size=step_size,
+        checkpoint_dir=checkpoint_dir,
+        return_records=return_records,
         output_dir=output_dir
     )
 
-    results = generator.generate_trend_clouds(symbol, analysis_period_years)
+    results = generator.generate_trend_clouds(symbol, analysis_period_years, incremental=incremental)
     json_path = generator.save_results(results, symbol)
 
     return json_path
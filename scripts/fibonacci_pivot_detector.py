@@ -15,14 +15,19 @@ Author: Claude Code
 Created: September 2025
 """
 
+import os
+import sys
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add the scripts directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from time_weights import time_weights_for_dates
+
 
 def detect_fibonacci_pivots(stock_data, lookback_window=5, min_strength=0.0005, trend_confirmation=1):
     """
@@ -294,6 +299,10 @@ def plot_fibonacci_pivots(stock_data, fibonacci_pivots, fibonacci_swings, symbol
     Returns:
         matplotlib.figure.Figure: The created figure
     """
+    # Imported here so analysis-only callers (the API) skip matplotlib's import cost
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize,
                                    gridspec_kw={'height_ratios': [3, 1], 'hspace': 0.1})
 
@@ -525,17 +534,10 @@ def calculate_time_weight(pivot_date, reference_date, half_life_days=80, min_wei
         
     Returns:
         float: Weight value between min_weight and 1.0
+
+    For many pivots or reference dates at once use time_weights.time_weights_for_dates.
     """
-    # Handle datetime differences safely
-    time_diff = reference_date - pivot_date
-    if hasattr(time_diff, 'days'):
-        days_ago = time_diff.days
-    else:
-        days_ago = int(time_diff / pd.Timedelta(days=1))
-    
-    decay_factor = np.exp(-days_ago * np.log(2) / half_life_days)
-    weight = max(decay_factor, min_weight)
-    return weight
+    return float(time_weights_for_dates([pivot_date], reference_date, half_life_days, min_weight)[0])
 
 
 def analyze_fibonacci_pivots(stock_data, **kwargs):
@@ -17,7 +17,6 @@ Created: 2025
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 
@@ -238,7 +237,7 @@ def plot_high_volume_anchored_vwap(
     start_date: str = '2023-01-01',
     volume_percentile_threshold: int = 80,
     figsize: Tuple[int, int] = (20, 16)
-) -> plt.Figure:
+) -> 'matplotlib.figure.Figure':
     """
     Visualization of AVWAP from high volume anchor days
 
@@ -253,6 +252,9 @@ def plot_high_volume_anchored_vwap(
     Returns:
         Matplotlib figure object
     """
+    # Imported here so analysis-only callers (the API) skip matplotlib's import cost
+    import matplotlib.pyplot as plt
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize,
                                    gridspec_kw={'height_ratios': [4, 1]})
 
@@ -532,6 +534,7 @@ def run_high_volume_vwap_analysis(
             stock_data, volume_vwap_results, symbol, start_date,
             volume_percentile_threshold, figsize
         )
+        import matplotlib.pyplot as plt
         plt.show()
 
     # Compile complete results
@@ -552,6 +555,61 @@ def run_high_volume_vwap_analysis(
     return results
 
 
+def format_high_volume_vwap_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    JSON-ready form of run_high_volume_vwap_analysis results (as served by the web API)
+
+    Returns:
+        Dictionary with volume_anchors, vwap_results and trend_analysis
+    """
+    volume_anchors = []
+    for anchor in results['volume_anchors']:
+        volume_anchors.append({
+            'date': anchor['date'].strftime('%Y-%m-%d'),
+            'price': float(anchor['price']),
+            'volume': int(anchor['volume']),
+            'volume_ratio': float(anchor['volume_ratio']),
+            'significance_score': float(anchor.get('significance_score', 0)),
+            'days_after': int(anchor['days_after'])
+        })
+
+    vwap_results = []
+    for anchor_name, vwap_result in results['vwap_results'].items():
+        vwap_data = []
+        for vwap_point in vwap_result['vwap_data']:
+            vwap_data.append({
+                'date': vwap_point['date'].strftime('%Y-%m-%d'),
+                'vwap': float(vwap_point['vwap']),
+                'price_deviation': float(vwap_point['price_deviation']),
+                'current_price': float(vwap_point['current_price'])
+            })
+
+        vwap_results.append({
+            'anchor_id': anchor_name,
+            'anchor_date': vwap_result['anchor']['date'].strftime('%Y-%m-%d'),
+            'vwap_data': vwap_data
+        })
+
+    trend_analysis = results['trend_analysis']
+    formatted_trend_analysis = {
+        'current_price': float(trend_analysis['current_price']),
+        'total_vwaps': int(trend_analysis['total_vwaps']),
+        'above_vwap_count': int(trend_analysis['above_vwap_count']),
+        'above_vwap_percentage': float(trend_analysis['above_vwap_percentage']),
+        'average_deviation': float(trend_analysis['average_deviation']),
+        'bullish_trends': int(trend_analysis['bullish_trends']),
+        'bearish_trends': int(trend_analysis['bearish_trends']),
+        'bullish_percentage': float(trend_analysis['bullish_percentage']),
+        'bearish_percentage': float(trend_analysis['bearish_percentage'])
+    }
+
+    return {
+        'volume_anchors': volume_anchors,
+        'vwap_results': vwap_results,
+        'trend_analysis': formatted_trend_analysis
+    }
+
+
 # Example usage and testing
 if __name__ == "__main__":
     # This would typically be imported and used in a notebook or other script
@@ -0,0 +1,109 @@
+"""
+Market Data Validation Module
+Vectorized detection of abnormal OHLCV bars (bad prices, closed-market dates,
+aggregated pre-market entries)
+
+Applies the rules of SingleTrendCloudGenerator.is_valid_market_data to a whole
+frame at once, using date components of the Date column and a precomputed set
+of US market holidays instead of per-row pd.to_datetime calls. Each rejected
+row is attributed to the first rule it fails, in the order of the row-wise
+checks, so rejection counts add up to the number of rejected rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rule order of is_valid_market_data; code k (1-based) in rejection_codes() = REJECTION_REASONS[k - 1]
+REJECTION_REASONS = (
+    'non_positive_price',     # Open/High/Low/Close <= 0
+    'ohlc_inconsistent',      # Open/Close outside [Low, High], or High < Low
+    'weekend',                # Saturday or Sunday
+    'holiday',                # New Year's Day, Independence Day, Christmas, Labor Day
+    'volume_outlier',         # Volume > 2 x p99 on a 4-6 AM bar
+    'extreme_range',          # (High - Low) / Low > 25% (35% in volatile years)
+    'month_start_4am',        # 4 AM bar on the 1st of the month (aggregated data)
+    'early_high_volume'       # 4-6 AM bar with more than 100M volume
+)
+
+# Years whose genuine daily ranges may reach 35%
+VOLATILE_YEARS = (2008, 2009, 2020, 2021, 2022)
+
+
+def us_market_holidays(years):
+    """
+    Closed-market dates checked by the validation rules, for the given years.
+
+    Returns:
+        Sorted datetime64[D] array: Jan 1, Jul 4, Dec 25 and Labor Day (first
+        Monday of September) of each year
+    """
+    holidays = []
+    for year in sorted(set(int(y) for y in years)):
+        september_first = pd.Timestamp(year=year, month=9, day=1)
+        labor_day = september_first + pd.Timedelta(days=(7 - september_first.dayofweek) % 7)
+        holidays.extend([f'{year}-01-01', f'{year}-07-04', f'{year}-12-25', labor_day.strftime('%Y-%m-%d')])
+    return np.array(sorted(holidays), dtype='datetime64[D]')
+
+
+def rejection_codes(stock_data, volume_p99=None):
+    """
+    Per-row rejection code: 0 for a valid bar, else the 1-based index into
+    REJECTION_REASONS of the first rule the bar fails.
+
+    Args:
+        stock_data: DataFrame with Date, Open, High, Low, Close, Volume columns
+        volume_p99: 99th volume percentile for the outlier rule (None skips that
+                    rule, like is_valid_market_data without _volume_percentiles)
+
+    Returns:
+        int8 array aligned with stock_data rows
+    """
+    open_ = stock_data['Open'].to_numpy(dtype=float)
+    high = stock_data['High'].to_numpy(dtype=float)
+    low = stock_data['Low'].to_numpy(dtype=float)
+    close = stock_data['Close'].to_numpy(dtype=float)
+    volume = stock_data['Volume'].to_numpy(dtype=float)
+
+    dates = pd.DatetimeIndex(pd.to_datetime(stock_data['Date']))
+    if dates.tz is not None:
+        # Rules are on wall-clock components, as with per-row Timestamps
+        dates = dates.tz_localize(None)
+    day_of_week = dates.dayofweek.to_numpy()
+    day = dates.day.to_numpy()
+    hour = dates.hour.to_numpy()
+    year = dates.year.to_numpy()
+    early_morning = (hour >= 4) & (hour <= 6)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_range = (high - low) / low
+
+    rules = [
+        (open_ <= 0) | (high <= 0) | (low <= 0) | (close <= 0),
+        (high < low) | (open_ < low) | (close < low) | (open_ > high) | (close > high),
+        day_of_week >= 5,
+        np.isin(dates.to_numpy().astype('datetime64[D]'), us_market_holidays(np.unique(year))),
+        (volume > volume_p99 * 2) & early_morning if volume_p99 is not None else np.zeros(len(dates), dtype=bool),
+        np.where(np.isin(year, VOLATILE_YEARS), daily_range > 0.35, daily_range > 0.25),
+        (hour == 4) & (day == 1),
+        early_morning & (volume > 100_000_000)
+    ]
+
+    # Apply in reverse so the first failing rule's code wins
+    codes = np.zeros(len(dates), dtype=np.int8)
+    for code in range(len(rules), 0, -1):
+        codes[rules[code - 1]] = code
+    return codes
+
+
+def validate_market_data(stock_data, volume_p99=None):
+    """
+    Vectorized validity mask with per-reason rejection counts.
+
+    Returns:
+        (mask, counts): boolean array (True = keep) and {reason: rejected rows}
+        for every reason in REJECTION_REASONS
+    """
+    codes = rejection_codes(stock_data, volume_p99)
+    tally = np.bincount(codes, minlength=len(REJECTION_REASONS) + 1)
+    counts = {reason: int(tally[k + 1]) for k, reason in enumerate(REJECTION_REASONS)}
+    return codes == 0, counts
@@ -0,0 +1,293 @@
+"""
+Parameter Sweep Module
+Trend cloud parameter sweeps that share intermediate results between combinations
+
+The continuous pipeline is a chain of stages, each depending on a subset of the
+parameters:
+
+    pivots     <- pivot_methods
+    trendlines <- pivots + half_life_days, weight_factor, min_pivot_weight, max_trendlines
+    clouds     <- trendlines + projection_days, convergence_tolerance, merge_threshold,
+                  min_convergence_trendlines, max_trend_clouds, temperature
+
+For every calculation date each distinct stage input is computed once and
+reused by all combinations that share it, so a sweep over cloud parameters
+costs one pivot and one trendline stage per window. The cloud stage then runs
+once per combination over all windows with detect_trend_clouds_batch, from the
+stacked trendline parameters of its trendline variant. Results for every
+combination land in one columnar table.
+
+Usage:
+    python scripts/parameter_sweep.py QQQ --grid '{"temperature": [1.0, 2.0], "merge_threshold": [2.0, 4.0]}'
+"""
+
+import json
+import argparse
+from itertools import product
+from pathlib import Path
+
+import pandas as pd
+
+from continuous_trend_cloud_generator import ContinuousTrendCloudGenerator, suppress_stdout
+from trend_cloud_detector import detect_trend_clouds_batch
+
+PIVOT_PARAMETERS = ('pivot_methods',)
+TRENDLINE_PARAMETERS = ('half_life_days', 'weight_factor', 'min_pivot_weight', 'max_trendlines')
+CLOUD_PARAMETERS = ('projection_days', 'convergence_tolerance', 'merge_threshold',
+                    'min_convergence_trendlines', 'max_trend_clouds', 'temperature')
+SWEEP_PARAMETERS = PIVOT_PARAMETERS + TRENDLINE_PARAMETERS + CLOUD_PARAMETERS
+
+
+def expand_grid(grid):
+    """
+    All combinations of a parameter grid, in grid order.
+
+    Args:
+        grid: Dict of parameter name -> list of values
+
+    Returns:
+        List of {parameter: value} dicts
+    """
+    unknown = set(grid) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    names = list(grid)
+    combinations = []
+    for values in product(*(grid[name] for name in names)):
+        combination = dict(zip(names, values))
+        if 'pivot_methods' in combination:
+            combination['pivot_methods'] = tuple(combination['pivot_methods'])
+        combinations.append(combination)
+    return combinations
+
+
+class ParameterSweep:
+    """
+    Runs the continuous trend cloud pipeline for every combination of a grid.
+
+    Combinations are evaluated with cold (non-warm-started) trendline searches,
+    so each row equals what ContinuousTrendCloudGenerator produces for the same
+    parameters with warm_start=None.
+    """
+
+    def __init__(self, grid, window_size=365, step_size=5, base_parameters=None):
+        """
+        Args:
+            grid: Dict of parameter name -> list of values (see SWEEP_PARAMETERS)
+            window_size: Calendar days per analysis window
+            step_size: Days between calculation dates
+            base_parameters: Other ContinuousTrendCloudGenerator arguments shared by all runs
+        """
+        self.combinations = expand_grid(grid)
+        self.window_size = window_size
+        self.step_size = step_size
+        self.base_parameters = dict(base_parameters or {})
+        self.generators = [
+            ContinuousTrendCloudGenerator(window_size=window_size, step_size=step_size,
+                                          **dict(self.base_parameters, **combination))
+            for combination in self.combinations
+        ]
+        self.stats = {}
+
+    def _stage_keys(self, generator):
+        pivot_key = tuple(getattr(generator, name) for name in PIVOT_PARAMETERS)
+        trendline_key = pivot_key + tuple(getattr(generator, name) for name in TRENDLINE_PARAMETERS)
+        return pivot_key, trendline_key
+
+    def run(self, symbol, stock_data=None, analysis_period_years=None):
+        """
+        Sweep every combination over the symbol's calculation dates.
+
+        Args:
+            symbol: Stock symbol
+            stock_data: Already cleaned price data; loaded if None
+            analysis_period_years: Years to analyze from the beginning (None = all)
+
+        Returns:
+            DataFrame with one row per (combination, calculation date, cloud): a
+            combination id, the swept parameter values and the cloud record fields
+        """
+        reference = self.generators[0]
+        if stock_data is None:
+            stock_data = reference.load_and_clean_data(symbol)
+
+        analysis_start_date = stock_data['Date'].iloc[0]
+        analysis_end_date = stock_data['Date'].iloc[-1]
+        if analysis_period_years:
+            analysis_end_date = min(analysis_start_date + pd.Timedelta(days=int(analysis_period_years * 365.25)),
+                                    analysis_end_date)
+        calculation_dates = reference.calculation_dates(stock_data, analysis_start_date, analysis_end_date)
+
+        stage_keys = [self._stage_keys(generator) for generator in self.generators]
+        self.stats = {
+            'combinations': len(self.combinations),
+            'calculation_dates': len(calculation_dates),
+            'pivot_stages': 0,
+            'trendline_stages': 0,
+            'cloud_stages': 0,
+            'cloud_batches': 0
+        }
+        print(f"🧪 Sweep {symbol}: {len(self.combinations)} combinations × {len(calculation_dates)} windows "
+              f"({len(set(k[0] for k in stage_keys))} pivot / {len(set(k[1] for k in stage_keys))} "
+              f"trendline variants)")
+
+        # Pivot and trendline stages, window by window: stacked trendline
+        # parameters and window metadata per trendline variant
+        stacked = {trendline_key: {'params': [], 'meta': [], 'windows': set()}
+                   for _, trendline_key in stage_keys}
+        for i, calc_date in enumerate(calculation_dates):
+            if i % 50 == 0:
+                print(f"📊 {i / len(calculation_dates) * 100:.1f}% ({i+1}/{len(calculation_dates)}) - {calc_date.date()}")
+
+            start, end = reference._window_bounds(stock_data, calc_date)
+            if end - start < 50:
+                continue
+            window_data = reference._window_frame(stock_data, start, end)
+
+            pivot_cache = {}
+            for generator, (pivot_key, trendline_key) in zip(self.generators, stage_keys):
+                if i in stacked[trendline_key]['windows']:
+                    continue
+                try:
+                    with suppress_stdout():
+                        if pivot_key not in pivot_cache:
+                            pivot_cache[pivot_key] = generator.detect_window_pivots(window_data)
+                            self.stats['pivot_stages'] += 1
+                        pivots = pivot_cache[pivot_key]
+                        trendlines = generator.detect_window_trendlines(pivots, window_data) if pivots else []
+                        if pivots:
+                            self.stats['trendline_stages'] += 1
+                except Exception:
+                    # Same failure handling as the generator: the window yields no clouds
+                    pivot_cache.setdefault(pivot_key, [])
+                    trendlines = []
+
+                stacked[trendline_key]['windows'].add(i)
+                if not trendlines:
+                    continue
+                stacked[trendline_key]['meta'].append({
+                    'window_id': i,
+                    'base_date': window_data['Date'].iloc[0],
+                    'current_date': window_data['Date'].iloc[-1],
+                    'current_price': window_data['Price'].iloc[-1]
+                })
+                stacked[trendline_key]['params'].extend({
+                    'window_id': i,
+                    'log_slope': trendline['log_slope'],
+                    'log_intercept': trendline['log_intercept'],
+                    'weighted_strength': trendline.get('weighted_strength', 0.0),
+                    'average_weight': trendline.get('average_weight', 0.0)
+                } for trendline in trendlines)
+
+        # Cloud stage: one batch over every window per combination
+        combination_clouds = []
+        for generator, (_, trendline_key) in zip(self.generators, stage_keys):
+            variant = stacked[trendline_key]
+            combination_clouds.append(self._batch_clouds(generator, variant, stock_data, calculation_dates))
+
+        columns = {name: [] for name in ['combination_id'] + list(SWEEP_PARAMETERS)}
+        cloud_columns = {}
+        for i, calc_date in enumerate(calculation_dates):
+            for combination_id, generator in enumerate(self.generators):
+                trend_clouds = combination_clouds[combination_id].get(i)
+                if not trend_clouds:
+                    continue
+
+                for record in generator.cloud_records(stock_data, calc_date, trend_clouds):
+                    columns['combination_id'].append(combination_id)
+                    for name in SWEEP_PARAMETERS:
+                        value = getattr(generator, name)
+                        columns[name].append(','.join(value) if name == 'pivot_methods' else value)
+                    for field, value in record.items():
+                        if field == 'price_range':
+                            cloud_columns.setdefault('price_range_low', []).append(value[0])
+                            cloud_columns.setdefault('price_range_high', []).append(value[1])
+                        else:
+                            cloud_columns.setdefault(field, []).append(value)
+
+        print(f"✅ Sweep complete: {self.stats['pivot_stages']} pivot, {self.stats['trendline_stages']} trendline, "
+              f"{self.stats['cloud_stages']} cloud stages")
+
+        table = pd.DataFrame(dict(columns, **cloud_columns))
+        # Drop parameters that were not swept
+        swept = [name for name in SWEEP_PARAMETERS if any(name in c for c in self.combinations)]
+        return table.drop(columns=[name for name in SWEEP_PARAMETERS if name not in swept])
+
+    def _batch_clouds(self, generator, variant, stock_data, calculation_dates):
+        """
+        Cloud stage of one combination over all windows of its trendline variant.
+
+        Returns:
+            {window index: final trend clouds}
+        """
+        window_ids = [meta['window_id'] for meta in variant['meta']]
+        if not window_ids:
+            return {}
+        self.stats['cloud_stages'] += len(window_ids)
+        try:
+            cloud_lists = detect_trend_clouds_batch(
+                pd.DataFrame(variant['params']),
+                pd.DataFrame(variant['meta']),
+                projection_days=generator.projection_days,
+                convergence_tolerance=generator.convergence_tolerance,
+                merge_threshold=generator.merge_threshold,
+                min_trendlines=generator.min_convergence_trendlines,
+                max_clouds=generator.max_trend_clouds,
+                temperature=generator.temperature
+            )
+            self.stats['cloud_batches'] += 1
+            return dict(zip(window_ids, cloud_lists))
+        except Exception:
+            pass
+
+        # Per-window fallback, so a failing window only loses its own clouds
+        clouds = {}
+        for i in window_ids:
+            start, end = generator._window_bounds(stock_data, calculation_dates[i])
+            trendlines = [row for row in variant['params'] if row['window_id'] == i]
+            try:
+                with suppress_stdout():
+                    clouds[i] = generator.detect_window_clouds(trendlines,
+                                                              generator._window_frame(stock_data, start, end))
+            except Exception:
+                continue
+        return clouds
+
+
+def run_parameter_sweep(symbol, grid, window_size=365, step_size=5, analysis_period_years=None,
+                        output_dir="results", base_parameters=None):
+    """
+    Convenience function: sweep a grid and save the table as CSV.
+
+    Returns:
+        (table, csv_path)
+    """
+    sweep = ParameterSweep(grid, window_size=window_size, step_size=step_size,
+                           base_parameters=dict(base_parameters or {}, output_dir=output_dir))
+    table = sweep.run(symbol, analysis_period_years=analysis_period_years)
+
+    csv_path = Path(output_dir) / f"{symbol}_parameter_sweep.csv"
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(csv_path, index=False)
+    print(f"💾 Saved: {csv_path} ({len(table):,} rows)")
+    return table, csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trend cloud parameter sweep with shared intermediates')
+    parser.add_argument('symbol', help='Stock symbol (e.g., QQQ)')
+    parser.add_argument('--grid', required=True, help='JSON dict of parameter -> list of values')
+    parser.add_argument('--window-size', type=int, default=365)
+    parser.add_argument('--step-size', type=int, default=5)
+    parser.add_argument('--years', type=float, default=None, help='Years to analyze from the beginning')
+    parser.add_argument('--output-dir', default='results')
+    args = parser.parse_args()
+
+    run_parameter_sweep(args.symbol.upper(), json.loads(args.grid), window_size=args.window_size,
+                        step_size=args.step_size, analysis_period_years=args.years,
+                        output_dir=args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,6 @@ Extracts pivot detection functionality from the trend cloud notebook
 
 import numpy as np
 import pandas as pd
-from scipy.signal import argrelextrema
-from scipy import stats
 
 
 def detect_pivot_points_ultra_log(data, methods=['scipy', 'rolling', 'zigzag', 'fractal', 'slope', 'derivative'], combine=True):
@@ -22,6 +20,9 @@ def detect_pivot_points_ultra_log(data, methods=['scipy', 'rolling', 'zigzag', '
 
     # Method 1: Scipy with multiple window sizes ON LOG SCALE
     if 'scipy' in methods:
+        # Imported on use: scipy.signal dominates this module's import time
+        from scipy.signal import argrelextrema
+
         print("   📊 Method 1: Scipy argrelextrema with multiple windows (LOG SCALE)")
         for window in [2, 3, 4, 5, 7, 10, 15]:
             swing_highs = argrelextrema(log_prices, np.greater, order=window)[0]
@@ -0,0 +1,111 @@
+"""
+Result Cache Module
+Two-tier (memory, disk) cache of analysis results keyed by the data watermark
+
+An entry is identified by (symbol, parameter fingerprint) and stamped with the
+data watermark (a JSON value that changes with the underlying data, e.g.
+stock_data_loader.data_watermark) and the code version (hash of the source
+files that produce the result). A lookup hits only when both stamps match the
+current ones, so there is no TTL: new or rewritten data or a code change makes
+the entry stale, and the next put overwrites it. Disk entries are one
+JSON file per (symbol, fingerprint), written atomically.
+
+The memory tier is shared by every cache in the process, so a long-lived
+process (e.g. an analysis_server worker) answers repeats without touching disk.
+"""
+
+import os
+import copy
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+MAX_MEMORY_ENTRIES = 128
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_code_versions = {}
+
+
+def code_version(module_names):
+    """
+    Short hash of the source of sibling modules (e.g. ('pivot_detector', ...)).
+
+    Computed once per process for each set of names.
+    """
+    module_names = tuple(module_names)
+    if module_names not in _code_versions:
+        digest = hashlib.sha256()
+        for name in module_names:
+            digest.update(name.encode('utf-8'))
+            digest.update(Path(__file__).with_name(f"{name}.py").read_bytes())
+        _code_versions[module_names] = digest.hexdigest()[:16]
+    return _code_versions[module_names]
+
+
+class ResultCache:
+    """Results of one kind of analysis under <cache_dir>/<SYMBOL>_<fingerprint>.json"""
+
+    def __init__(self, cache_dir, version):
+        """
+        Args:
+            cache_dir: Directory for the disk tier (None = memory tier only)
+            version: Code version stamp (see code_version)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.version = version
+
+    def path(self, symbol, fingerprint):
+        return self.cache_dir / f"{symbol}_{fingerprint}.json"
+
+    def get(self, symbol, fingerprint, watermark):
+        """
+        Cached results for the current watermark and code version.
+
+        Returns:
+            (results, tier) with tier 'memory' or 'disk', or (None, None) on a miss
+        """
+        key = (str(self.cache_dir), symbol, fingerprint)
+        with _memory_lock:
+            entry = _memory.get(key)
+            if entry and entry['watermark'] == watermark and entry['version'] == self.version:
+                _memory.move_to_end(key)
+                return copy.deepcopy(entry['results']), 'memory'
+
+        if self.cache_dir is None:
+            return None, None
+        try:
+            with open(self.path(symbol, fingerprint), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        if entry.get('watermark') != watermark or entry.get('version') != self.version:
+            return None, None
+
+        self._remember(key, entry)
+        return copy.deepcopy(entry['results']), 'disk'
+
+    def put(self, symbol, fingerprint, watermark, results):
+        """Store results for the watermark, replacing the entry for an older one"""
+        # Round-trip through JSON so memory and disk hits return identical values
+        entry = json.loads(json.dumps({'symbol': symbol, 'fingerprint': fingerprint, 'watermark': watermark,
+                                       'version': self.version, 'results': results}, default=str))
+        self._remember((str(self.cache_dir), symbol, fingerprint), entry)
+
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(symbol, fingerprint)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temporary, 'w') as f:
+            json.dump(entry, f)
+        os.replace(temporary, path)
+
+    def _remember(self, key, entry):
+        with _memory_lock:
+            _memory[key] = entry
+            _memory.move_to_end(key)
+            while len(_memory) > MAX_MEMORY_ENTRIES:
+                _memory.popitem(last=False)
@@ -0,0 +1,87 @@
+"""
+Shared Arrays Module
+Numeric price columns placed once in shared memory for worker processes
+
+The parent process copies each array into a multiprocessing.shared_memory block
+and hands workers a small picklable spec; workers attach and get zero-copy
+numpy views instead of receiving a pickled DataFrame with every task.
+"""
+
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+
+class SharedArrays:
+    """Named numpy arrays backed by shared memory blocks"""
+
+    def __init__(self, blocks, arrays, owner):
+        self._blocks = blocks
+        self.arrays = arrays
+        self.owner = owner
+
+    @classmethod
+    def create(cls, arrays):
+        """Copy a dict of numpy arrays into new shared memory blocks"""
+        blocks, views = {}, {}
+        try:
+            for name, values in arrays.items():
+                values = np.ascontiguousarray(values)
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks[name] = block
+                views[name] = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+                views[name][...] = values
+        except Exception:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+            raise
+        return cls(blocks, views, owner=True)
+
+    @classmethod
+    def attach(cls, spec):
+        """Attach to blocks described by another process's spec()"""
+        blocks, views = {}, {}
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks[name] = block
+            views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return cls(blocks, views, owner=False)
+
+    def spec(self):
+        """Picklable description of the blocks: {name: (block name, shape, dtype)}"""
+        return {name: (self._blocks[name].name, values.shape, values.dtype.str)
+                for name, values in self.arrays.items()}
+
+    def close(self):
+        """Release this process's views; the creating process also frees the blocks"""
+        self.arrays = {}
+        for block in self._blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def price_arrays(stock_data):
+    """Date (int64 ns), Price and LogPrice columns of a cleaned price DataFrame"""
+    return {
+        'Date': stock_data['Date'].to_numpy(dtype='datetime64[ns]').view('int64'),
+        'Price': stock_data['Price'].to_numpy(dtype=float),
+        'LogPrice': stock_data['LogPrice'].to_numpy(dtype=float)
+    }
+
+
+def price_frame(arrays):
+    """Rebuild the Date/Price/LogPrice DataFrame from price_arrays() output"""
+    return pd.DataFrame({
+        'Date': pd.to_datetime(arrays['Date'].view('datetime64[ns]')),
+        'Price': arrays['Price'],
+        'LogPrice': arrays['LogPrice']
+    })
@@ -16,10 +16,18 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # Import our modular components
-from stock_data_loader import load_stock_data_from_db
+from stock_data_loader import load_stock_data_from_db, data_watermark
 from pivot_detector import detect_pivot_points_ultra_log
 from trendline_detector import detect_time_weighted_trendlines_log
 from trend_cloud_detector import detect_trend_clouds, analyze_trend_cloud_metrics
+from market_data_validation import validate_market_data
+from checkpoint_store import parameter_fingerprint
+from result_cache import ResultCache, code_version
+
+# Source files whose changes invalidate cached results
+RESULT_CACHE_MODULES = ('single_trend_cloud_generator', 'stock_data_loader', 'market_data_validation',
+                        'pivot_detector', 'trendline_detector', 'trendline_kernels', 'time_weights',
+                        'trend_cloud_detector')
 
 @contextlib.contextmanager
 def suppress_stdout():
@@ -51,6 +59,7 @@ class SingleTrendCloudGenerator:
                  merge_threshold=4.0,
                  max_trend_clouds=6,
                  temperature=2.0,
+                 cache_dir=None,
                  output_dir="results"):
         """
         Initialize the single trend cloud generator.
@@ -67,6 +76,7 @@ class SingleTrendCloudGenerator:
             merge_threshold: Distance threshold for zone merging ($)
             max_trend_clouds: Maximum trend clouds to generate
             temperature: Softmax temperature for weighting
+            cache_dir: Directory for the on-disk result cache (None = in-memory tier only)
             output_dir: Directory to save results
         """
         self.window_days = window_days
@@ -80,6 +90,7 @@ class SingleTrendCloudGenerator:
         self.merge_threshold = merge_threshold
         self.max_trend_clouds = max_trend_clouds
         self.temperature = temperature
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         self.output_dir = Path(output_dir)
 
         # Create output directory if it doesn't exist
@@ -89,6 +100,9 @@ class SingleTrendCloudGenerator:
         """
         Validate market data to detect abnormal entries
         Simplified validation without verbose logging
+
+        Single-row form of market_data_validation.validate_market_data, which
+        load_and_clean_data uses to check the whole frame at once
         """
         # Basic price validation
         if row['Open'] <= 0 or row['High'] <= 0 or row['Low'] <= 0 or row['Close'] <= 0:
@@ -162,7 +176,10 @@ class SingleTrendCloudGenerator:
             raise ValueError(f"No data available for symbol {symbol}")
 
         print(f"📊 Loaded {len(stock_data)} raw records for {symbol}")
+        return self.clean_data(stock_data, symbol)
 
+    def clean_data(self, stock_data, symbol):
+        """Drop abnormal records from raw loader output and add log prices"""
         # Calculate volume percentiles for intelligent validation
         self._volume_percentiles = {
             'p95': stock_data['Volume'].quantile(0.95),
@@ -173,8 +190,13 @@ class SingleTrendCloudGenerator:
 
         # Apply data validation
         initial_count = len(stock_data)
-        valid_mask = stock_data.apply(self.is_valid_market_data, axis=1)
+        valid_mask, self.validation_counts = validate_market_data(
+            stock_data, volume_p99=self._volume_percentiles.get('p99', 500_000_000))
         stock_data = stock_data[valid_mask].copy().reset_index(drop=True)
+        rejected = {reason: count for reason, count in self.validation_counts.items() if count}
+        if rejected:
+            print(f"🧹 Rejected {initial_count - len(stock_data)} abnormal records: "
+                  + ", ".join(f"{reason}={count}" for reason, count in rejected.items()))
 
         # Basic date and price filtering
         min_valid_date = pd.Timestamp('1990-01-01')
@@ -197,20 +219,71 @@ class SingleTrendCloudGenerator:
         print(f"✅ Clean dataset: {len(stock_data)} records for {symbol}")
         return stock_data
 
-    def generate_trend_clouds(self, symbol):
+    def _result_parameters(self):
+        """Parameters that determine the results (cache fingerprint)"""
+        return {
+            'window_days': self.window_days,
+            'projection_days': self.projection_days,
+            'max_trendlines': self.max_trendlines,
+            'half_life_days': self.half_life_days,
+            'min_pivot_weight': self.min_pivot_weight,
+            'weight_factor': self.weight_factor,
+            'min_convergence_trendlines': self.min_convergence_trendlines,
+            'convergence_tolerance': self.convergence_tolerance,
+            'merge_threshold': self.merge_threshold,
+            'max_trend_clouds': self.max_trend_clouds,
+            'temperature': self.temperature
+        }
+
+    def generate_trend_clouds(self, symbol, stock_data=None, force=False):
         """
         Generate trend clouds for last 365 calendar days to predict 5 days forward.
 
+        When the data is loaded here, results are cached per (symbol, data
+        watermark, parameter fingerprint, code version): while no bar is
+        added, rewritten or removed in the database (see data_watermark),
+        repeat calls return the stored result without loading prices.
+        Passed-in stock_data is never cached.
+
         Args:
             symbol: Stock symbol to analyze
+            stock_data: Already cleaned price data (see clean_data); loaded if None
+            force: Recompute even if a cached result is current (and replace it)
 
         Returns:
             Dict with trend cloud data and metadata
         """
+        watermark = data_watermark(symbol) if stock_data is None else None
+        if watermark is None:
+            return self._compute_trend_clouds(symbol, stock_data)
+
+        cache = ResultCache(self.cache_dir, code_version(RESULT_CACHE_MODULES))
+        fingerprint = parameter_fingerprint(self._result_parameters())
+        cache_info = {
+            'last_bar': pd.Timestamp(watermark['last_bar'], unit='s').isoformat(),
+            'watermark': watermark,
+            'fingerprint': fingerprint,
+            'code_version': cache.version
+        }
+
+        if not force:
+            results, tier = cache.get(symbol, fingerprint, watermark)
+            if results is not None:
+                print(f"♻️ Cached trend clouds for {symbol} ({tier}, last bar {cache_info['last_bar']})")
+                results['metadata']['cache'] = dict(cache_info, hit=True, tier=tier)
+                return results
+
+        results = self._compute_trend_clouds(symbol, stock_data)
+        cache.put(symbol, fingerprint, watermark, results)
+        results['metadata']['cache'] = dict(cache_info, hit=False, tier=None)
+        return results
+
+    def _compute_trend_clouds(self, symbol, stock_data):
         print(f"🌤️ Generating trend clouds for {symbol} | Window: {self.window_days} days, Projection: {self.projection_days} days")
 
         # Load and clean data
-        stock_data = self.load_and_clean_data(symbol)
+        if stock_data is None:
+            stock_data = self.load_and_clean_data(symbol)
 
         # Use last 365 calendar days of data for analysis, but project from today
         analysis_end_date = stock_data['Date'].iloc[-1]
@@ -269,7 +342,8 @@ class SingleTrendCloudGenerator:
                     merge_threshold=self.merge_threshold,
                     min_trendlines=self.min_convergence_trendlines,
                     max_clouds=self.max_trend_clouds,
-                    temperature=self.temperature
+                    temperature=self.temperature,
+                    retain_trendlines=False
                 )
 
                 if not final_trend_clouds:
@@ -368,13 +442,14 @@ class SingleTrendCloudGenerator:
         return json_path
 
 
-def generate_single_trend_clouds(symbol, output_dir="results"):
+def generate_single_trend_clouds(symbol, output_dir="results", force=False):
     """
     Convenience function to generate trend clouds for a symbol using last 365 days
 
     Args:
         symbol: Stock symbol to analyze
-        output_dir: Directory to save results
+        output_dir: Directory to save results (the result cache is in <output_dir>/cache)
+        force: Recompute even if the cached result is current
 
     Returns:
         Path to saved results file
@@ -382,10 +457,11 @@ def generate_single_trend_clouds(symbol, output_dir="results"):
     generator = SingleTrendCloudGenerator(
         window_days=365,
         projection_days=5,
+        cache_dir=Path(output_dir) / "cache",
         output_dir=output_dir
     )
 
-    results = generator.generate_trend_clouds(symbol)
+    results = generator.generate_trend_clouds(symbol, force=force)
     json_path = generator.save_results(results, symbol)
 
     return json_path
@@ -393,15 +469,15 @@ def generate_single_trend_clouds(symbol, output_dir="results"):
 
 if __name__ == "__main__":
     # Command line usage
-    if len(sys.argv) != 2:
-        print("Usage: python single_trend_cloud_generator.py <SYMBOL>")
+    if len(sys.argv) not in (2, 3) or sys.argv[2:] not in ([], ['--force']):
+        print("Usage: python single_trend_cloud_generator.py <SYMBOL> [--force]")
         sys.exit(1)
 
     symbol = sys.argv[1].upper()
     print(f"🚀 Single Trend Cloud Generator for {symbol}")
 
     try:
-        results_path = generate_single_trend_clouds(symbol)
+        results_path = generate_single_trend_clouds(symbol, force='--force' in sys.argv)
         print(f"✅ Success: {results_path}")
         sys.exit(0)
     except Exception as e:
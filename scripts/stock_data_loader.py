@@ -7,7 +7,6 @@ import sqlite3
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import yfinance as yf
 
 
 def load_stock_data_from_db(symbol, days=365, timeframe='1D', filter_premarket=True, 
@@ -340,4 +339,38 @@ def check_database_contents():
 
     except Exception as e:
         print(f"❌ Error checking database: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def data_watermark(symbol, timeframe='1D', db_path='data/stock-data.db'):
+    """
+    Cheap stamp of the symbol's stored bars, as a cache watermark.
+
+    The store writes bars with INSERT OR REPLACE, which gives a rewritten bar
+    (e.g. today's bar updated intraday, or a revised older bar) a new
+    AUTOINCREMENT id without moving MAX(timestamp). The stamp therefore
+    combines the last bar timestamp with MAX(id) and the row count, so any
+    insert, replace or delete changes it.
+
+    Tries the same timeframe spellings as load_stock_data_from_db. Returns None
+    when the database or the symbol is unavailable (the loader would fall back
+    to random sample data, which must not be cached).
+
+    Returns:
+        {'last_bar': epoch seconds, 'max_id': int, 'rows': int} or None
+    """
+    try:
+        # Read-only: never create an empty database file
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            for candidate in [timeframe] + [t for t in ['1d', '1D', 'daily', 'DAILY'] if t != timeframe]:
+                row = conn.execute(
+                    "SELECT MAX(timestamp), MAX(id), COUNT(*) FROM market_data WHERE symbol = ? AND timeframe = ?",
+                    (symbol, candidate)
+                ).fetchone()
+                if row and row[0] is not None:
+                    return {'last_bar': int(row[0]), 'max_id': int(row[1]), 'rows': int(row[2])}
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+    return None
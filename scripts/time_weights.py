@@ -0,0 +1,69 @@
+"""
+Time Weight Module
+Vectorized exponential time decay shared by the trendline and Fibonacci detectors
+"""
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400_000_000_000
+
+
+def dates_to_ns(dates):
+    """Convert a date, or an array-like of dates, to int64 nanoseconds since epoch"""
+    if isinstance(dates, (pd.Series, pd.Index, np.ndarray, list, tuple)):
+        values = np.asarray(pd.to_datetime(np.asarray(dates).ravel()), dtype='datetime64[ns]')
+        return values.view('int64').reshape(np.shape(dates))
+    return np.int64(pd.Timestamp(dates).value)
+
+
+def days_between(reference_dates, pivot_dates):
+    """
+    Whole days from each pivot date to each reference date (floored, like Timedelta.days).
+
+    Args:
+        reference_dates: Scalar, 1-D or 2-D batch of reference dates
+        pivot_dates: 1-D array of pivot dates
+
+    Returns:
+        int64 array of shape reference_dates.shape + pivot_dates.shape
+    """
+    reference_ns = np.asarray(dates_to_ns(reference_dates))
+    pivot_ns = np.asarray(dates_to_ns(pivot_dates))
+    return (reference_ns[..., np.newaxis] - pivot_ns) // NS_PER_DAY
+
+
+def days_since(start_date, dates):
+    """Whole days from start_date to each date (floored, like Timedelta.days)"""
+    return (np.asarray(dates_to_ns(dates)) - dates_to_ns(start_date)) // NS_PER_DAY
+
+
+def calculate_time_weights(days_ago, half_life_days=80, min_weight=0.1):
+    """
+    Exponential decay weights for an array of day offsets.
+
+    weight = max(0.5 ** (days_ago / half_life_days), min_weight)
+
+    All arguments broadcast, so a parameter sweep is a single call, e.g.
+    half_life_days=np.array([40, 80, 160])[:, None] against a (P,) offset array
+    returns a (3, P) weight array.
+    """
+    days_ago = np.asarray(days_ago)
+    decay_factor = np.exp(-days_ago * np.log(2) / np.asarray(half_life_days))
+    return np.maximum(decay_factor, min_weight)
+
+
+def time_weights_for_dates(pivot_dates, reference_dates, half_life_days=80, min_weight=0.1):
+    """
+    Time weights of pivot dates relative to one or many reference dates.
+
+    Args:
+        pivot_dates: 1-D array of pivot dates (P,)
+        reference_dates: Scalar, (R,) or (R, K) batch of reference dates, e.g. the
+                         last date of each rolling window
+        half_life_days, min_weight: Scalars or arrays broadcastable to the output
+
+    Returns:
+        float array of shape reference_dates.shape + (P,)
+    """
+    return calculate_time_weights(days_between(reference_dates, pivot_dates), half_life_days, min_weight)
@@ -11,11 +11,139 @@ Key Features:
 - Support/Resistance classification
 """
 
+import os
+import sys
 import numpy as np
 import pandas as pd
 from datetime import timedelta
 from typing import List, Dict, Any, Optional
 
+# Add the scripts directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from time_weights import days_since, dates_to_ns, NS_PER_DAY
+
+
+class _ZoneSource:
+    """Trendlines and projection base date shared by all zones of one detection run."""
+
+    __slots__ = ('trendlines', 'current_date')
+
+    def __init__(self, trendlines: List[Dict[str, Any]], current_date: pd.Timestamp):
+        self.trendlines = trendlines
+        self.current_date = current_date
+
+
+class ConvergenceZone:
+    """
+    Compact convergence zone (and, once ranked, trend cloud).
+
+    Holds the zone statistics plus small per-member arrays (trendline index, days
+    ahead, projected price) and per-trendline aggregates, instead of projection
+    dicts that each pin a whole trendline with its pivot dicts. Supports the dict
+    style access used throughout (zone['center_price'], zone.get('merged_from', 1)).
+    The full trendline objects and projection records are resolved lazily from the
+    detection run's trendlines, when the detector was asked to retain them.
+    """
+
+    FIELDS = ('center_price', 'price_std', 'price_range', 'unique_trendlines', 'total_projections',
+              'total_weighted_strength', 'avg_weight', 'tightness_score', 'convergence_quality',
+              'cloud_type', 'merged_from', 'softmax_weight', 'cloud_id')
+    LAZY_FIELDS = ('projections', 'unique_trendline_data')
+
+    __slots__ = FIELDS + ('trendline_ids', 'trendline_strengths', 'trendline_weights',
+                          'member_trendline_ids', 'member_days_ahead', 'member_prices', '_source')
+
+    def __init__(self, member_trendline_ids, member_days_ahead, member_prices,
+                 trendline_ids, trendline_strengths, trendline_weights, cloud_type, source=None):
+        self.member_trendline_ids = member_trendline_ids
+        self.member_days_ahead = member_days_ahead
+        self.member_prices = member_prices
+        self.trendline_ids = trendline_ids
+        self.trendline_strengths = trendline_strengths
+        self.trendline_weights = trendline_weights
+        self.cloud_type = cloud_type
+        self._source = source
+
+    # Dict-style access
+
+    def __getitem__(self, key):
+        if key in self.FIELDS or key in self.LAZY_FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [key for key in self.FIELDS if hasattr(self, key)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary fields as a plain dict (no trendline objects)."""
+        data = {key: getattr(self, key) for key in self.keys()}
+        data['trendline_ids'] = self.trendline_ids.tolist()
+        return data
+
+    def __repr__(self):
+        return (f"ConvergenceZone({self.cloud_type}, center={getattr(self, 'center_price', None)}, "
+                f"trendlines={len(self.trendline_ids)})")
+
+    # Lazy access to full objects
+
+    def _require_source(self) -> _ZoneSource:
+        if self._source is None:
+            raise ValueError("Trendlines were not retained for this zone (retain_trendlines=False)")
+        return self._source
+
+    @property
+    def trendlines(self) -> List[Dict[str, Any]]:
+        """The zone's unique trendlines, in first-occurrence order."""
+        source = self._require_source()
+        return [source.trendlines[idx] for idx in self.trendline_ids.tolist()]
+
+    @property
+    def projections(self) -> List[Dict[str, Any]]:
+        """Projection records of all zone members."""
+        source = self._require_source()
+        index = {idx: k for k, idx in enumerate(self.trendline_ids.tolist())}
+        records = []
+        for tl_idx, day, price in zip(self.member_trendline_ids.tolist(),
+                                      self.member_days_ahead.tolist(),
+                                      self.member_prices):
+            k = index[tl_idx]
+            records.append({
+                'trendline_idx': tl_idx,
+                'trendline': source.trendlines[tl_idx],
+                'date': source.current_date + timedelta(days=day),
+                'days_ahead': day,
+                'projected_price': price,
+                'weighted_strength': self.trendline_strengths[k],
+                'average_weight': self.trendline_weights[k]
+            })
+        return records
+
+    @property
+    def unique_trendline_data(self) -> Dict[int, Dict[str, Any]]:
+        """First projection record of each unique trendline."""
+        unique = {}
+        for record in self.projections:
+            unique.setdefault(record['trendline_idx'], record)
+        return unique
+
 
 class TrendCloudDetector:
     """
@@ -29,7 +157,11 @@ class TrendCloudDetector:
                  merge_threshold: float = 4.0,
                  min_trendlines: int = 3,
                  max_clouds: int = 6,
-                 temperature: float = 2.0):
+                 temperature: float = 2.0,
+                 retain_trendlines: bool = True,
+                 engine: str = 'greedy',
+                 density_bin_width: float = 0.001,
+                 density_bandwidth: float = 0.01):
         """
         Initialize the trend cloud detector.
         
@@ -40,23 +172,38 @@ class TrendCloudDetector:
             min_trendlines: Minimum trendlines required for a convergence zone
             max_clouds: Maximum number of final trend clouds to return
             temperature: Softmax temperature for weighting calculation
+            retain_trendlines: Let zones resolve their full trendline objects lazily;
+                               False keeps only trendline indices and aggregates
+            engine: 'greedy' (tolerance-based grouping and merging) or 'density'
+                    (peaks of a strength-weighted log-price histogram)
+            density_bin_width: Histogram bin width in log-price units (density engine)
+            density_bandwidth: Half-width of the box smoothing filter and of each
+                               cloud, in log-price units (density engine)
         """
+        if engine not in ('greedy', 'density'):
+            raise ValueError(f"Unknown convergence engine: {engine}")
         self.projection_days = projection_days
         self.convergence_tolerance = convergence_tolerance
         self.merge_threshold = merge_threshold
         self.min_trendlines = min_trendlines
         self.max_clouds = max_clouds
         self.temperature = temperature
+        self.retain_trendlines = retain_trendlines
+        self.engine = engine
+        self.density_bin_width = density_bin_width
+        self.density_bandwidth = density_bandwidth
     
     def find_convergence_points(self, 
                                trendlines: List[Dict[str, Any]], 
-                               stock_data: pd.DataFrame) -> List[Dict[str, Any]]:
+                               stock_data: pd.DataFrame,
+                               stats: Optional[Dict[str, Any]] = None) -> List[ConvergenceZone]:
         """
         Find points where multiple trendlines converge with proper strength summation and zone merging.
         
         Args:
             trendlines: List of time-weighted trendlines with strength data
             stock_data: Stock price data DataFrame
+            stats: Optional dict updated with projection and zone counts
             
         Returns:
             List of convergence zones with merged nearby zones
@@ -71,185 +218,259 @@ class TrendCloudDetector:
         trendline_projections = self._generate_projections(
             trendlines, stock_data, current_date, current_price
         )
+        if stats is not None:
+            stats['projections'] = len(trendline_projections['projected_price'])
+            stats['convergence_zones'] = 0
 
-        if len(trendline_projections) < self.min_trendlines:
+        if len(trendline_projections['projected_price']) < self.min_trendlines:
             return []
 
-        # Step 1: Find initial convergence zones
-        initial_zones = self._find_initial_convergence_zones(
-            trendline_projections, current_price
-        )
+        if self.engine == 'density':
+            merged_zones = self._find_density_zones(trendline_projections, current_price)
+        else:
+            # Step 1: Find initial convergence zones
+            initial_zones = self._find_initial_convergence_zones(
+                trendline_projections, current_price
+            )
 
-        # Step 2: Merge nearby zones that are too close together
-        merged_zones = self._merge_nearby_zones(initial_zones)
+            # Step 2: Merge nearby zones that are too close together
+            merged_zones = self._merge_nearby_zones(initial_zones)
 
+        if stats is not None:
+            stats['convergence_zones'] = len(merged_zones)
         return merged_zones
     
     def _generate_projections(self, 
                              trendlines: List[Dict[str, Any]], 
                              stock_data: pd.DataFrame,
                              current_date: pd.Timestamp,
-                             current_price: float) -> List[Dict[str, Any]]:
-        """Generate projection points for all trendlines."""
-        projections = []
-
-        for tl_idx, trendline in enumerate(trendlines):
-            # Extract time-weighted strength from each trendline
-            weighted_strength = trendline.get('weighted_strength', 0)
-            average_weight = trendline.get('average_weight', 0)
-            
-            for day in range(1, self.projection_days + 1):
-                future_date = current_date + timedelta(days=day)
-                x_future = (future_date - stock_data['Date'].iloc[0]).days
-
-                # Project using log scale
-                projected_log_price = trendline['log_slope'] * x_future + trendline['log_intercept']
-                projected_price = np.exp(projected_log_price)
-
-                # Only consider reasonable projections (±30% of current price)
-                if 0.7 * current_price <= projected_price <= 1.3 * current_price:
-                    projections.append({
-                        'trendline_idx': tl_idx,
-                        'trendline': trendline,
-                        'date': future_date,
-                        'days_ahead': day,
-                        'projected_price': projected_price,
-                        'weighted_strength': weighted_strength,
-                        'average_weight': average_weight
-                    })
-
-        return projections
-    
+                             current_price: float) -> Dict[str, Any]:
+        """
+        Generate projection points for all trendlines.
+
+        Projections are computed as one (trendlines x projection_days) matrix and
+        returned as flat arrays in trendline-major, day-minor order, keeping only
+        reasonable projections (within ±30% of the current price).
+        """
+        slopes = np.array([tl['log_slope'] for tl in trendlines], dtype=float)
+        intercepts = np.array([tl['log_intercept'] for tl in trendlines], dtype=float)
+        # Extract time-weighted strength from each trendline
+        weighted_strengths = np.array([tl.get('weighted_strength', 0) for tl in trendlines], dtype=float)
+        average_weights = np.array([tl.get('average_weight', 0) for tl in trendlines], dtype=float)
+
+        days_ahead = np.arange(1, self.projection_days + 1)
+        x_future = days_since(stock_data['Date'].iloc[0], current_date) + days_ahead
+
+        # Project using log scale
+        projected_prices = np.exp(slopes[:, np.newaxis] * x_future + intercepts[:, np.newaxis])
+        in_band = (0.7 * current_price <= projected_prices) & (projected_prices <= 1.3 * current_price)
+        trendline_idx, day_idx = np.nonzero(in_band)
+
+        return {
+            'trendline_idx': trendline_idx,
+            'days_ahead': days_ahead[day_idx],
+            'projected_price': projected_prices[in_band],
+            'weighted_strength': weighted_strengths[trendline_idx],
+            'average_weight': average_weights[trendline_idx],
+            'source': _ZoneSource(trendlines, current_date) if self.retain_trendlines else None
+        }
+
     def _find_initial_convergence_zones(self, 
-                                       trendline_projections: List[Dict[str, Any]],
-                                       current_price: float) -> List[Dict[str, Any]]:
-        """Find initial convergence zones before merging."""
-        initial_zones = []
-        used_projections = set()
+                                       trendline_projections: Dict[str, Any],
+                                       current_price: float,
+                                       order: Optional[np.ndarray] = None) -> List[ConvergenceZone]:
+        """
+        Find initial convergence zones before merging.
+
+        Projections are sorted by price once; each unused anchor's window (every
+        projection within convergence_tolerance above it) is located by binary
+        search, and its unique trendlines are counted over the window's arrays.
+        A precomputed stable price order may be passed in (see the batch path).
+        """
+        prices = trendline_projections['projected_price']
+        trendline_ids = trendline_projections['trendline_idx']
 
         # Sort projections by price to find nearby clusters
-        sorted_projections = sorted(enumerate(trendline_projections), 
-                                   key=lambda x: x[1]['projected_price'])
+        if order is None:
+            order = np.argsort(prices, kind='stable')
+        sorted_prices = prices[order]
+        sorted_trendlines = trendline_ids[order]
+        window_ends = np.searchsorted(sorted_prices, sorted_prices + self.convergence_tolerance, side='right')
+        used = np.zeros(len(order), dtype=bool)
 
-        for i, (orig_idx, proj1) in enumerate(sorted_projections):
-            if orig_idx in used_projections:
+        initial_zones = []
+        for i in range(len(order)):
+            if used[i]:
                 continue
 
-            # Find all projections within tolerance of this one
-            converging_projections = [proj1]
-            converging_indices = {orig_idx}
-
-            for j, (other_idx, proj2) in enumerate(sorted_projections[i+1:], i+1):
-                if other_idx in used_projections:
-                    continue
+            # Window of projections within tolerance of this one (a prefix, since sorted)
+            end = _exact_window_end(sorted_prices, i, window_ends[i], self.convergence_tolerance)
+            candidates = np.arange(i + 1, end)
 
-                # Check if projections are close in price and from different trendlines
-                price_diff = abs(proj1['projected_price'] - proj2['projected_price'])
-                different_trendlines = proj1['trendline_idx'] != proj2['trendline_idx']
-
-                if price_diff <= self.convergence_tolerance and different_trendlines:
-                    converging_projections.append(proj2)
-                    converging_indices.add(other_idx)
-                elif price_diff > self.convergence_tolerance:
-                    # Since we're sorted by price, no more matches possible
-                    break
+            # Unused projections from trendlines other than the anchor's
+            candidates = candidates[~used[candidates] & (sorted_trendlines[candidates] != sorted_trendlines[i])]
+            members = np.concatenate(([i], candidates))
 
             # Only keep convergence zones with enough unique trendlines
-            unique_trendlines = set(p['trendline_idx'] for p in converging_projections)
-            
-            if len(unique_trendlines) >= self.min_trendlines:
-                zone = self._create_convergence_zone(
-                    converging_projections, unique_trendlines, current_price
-                )
+            if len(np.unique(sorted_trendlines[members])) >= self.min_trendlines:
+                zone = self._create_convergence_zone(order[members], trendline_projections, current_price)
                 initial_zones.append(zone)
-                used_projections.update(converging_indices)
+                used[members] = True
 
         return initial_zones
     
+    def _find_density_zones(self,
+                            trendline_projections: Dict[str, Any],
+                            current_price: float) -> List[ConvergenceZone]:
+        """
+        Find convergence zones as peaks of a smoothed projection density.
+
+        Projected log-prices are binned on a grid of density_bin_width, weighted by
+        trendline strength, and smoothed with a prefix-sum box filter of half-width
+        density_bandwidth. The strongest local maxima, at least density_bandwidth
+        apart, become zone centers and each projection joins its nearest center
+        within density_bandwidth. Cost is O(projections + bins), independent of
+        how many trendlines converge.
+        """
+        log_prices = np.log(trendline_projections['projected_price'])
+        strengths = trendline_projections['weighted_strength']
+
+        lowest = log_prices.min()
+        bins = ((log_prices - lowest) / self.density_bin_width).astype(np.int64)
+        histogram = np.bincount(bins, weights=strengths)
+
+        # Box filter via prefix sums: density[i] = sum of histogram[i - h : i + h + 1]
+        half_width = max(int(round(self.density_bandwidth / self.density_bin_width)), 1)
+        cumulative = np.concatenate(([0.0], np.cumsum(histogram)))
+        positions = np.arange(len(histogram))
+        density = (cumulative[np.minimum(positions + half_width + 1, len(histogram))]
+                   - cumulative[np.maximum(positions - half_width, 0)])
+
+        # Local maxima (the left edge of a plateau counts once)
+        padded = np.concatenate(([-np.inf], density, [-np.inf]))
+        is_peak = (density > padded[:-2]) & (density >= padded[2:]) & (density > 0)
+        peaks = positions[is_peak]
+        peaks = peaks[np.argsort(-density[peaks], kind='stable')]
+
+        # Strongest peaks first, suppressing any within the bandwidth of a kept one
+        centers = []
+        for peak in peaks:
+            if all(abs(peak - center) > half_width for center in centers):
+                centers.append(peak)
+                # Top-K candidates; twice max_clouds leaves room for min_trendlines rejects
+                if len(centers) == 2 * self.max_clouds:
+                    break
+        if not centers:
+            return []
+        center_logs = lowest + (np.sort(centers) + 0.5) * self.density_bin_width
+
+        # Assign each projection to its nearest center within the bandwidth
+        right = np.clip(np.searchsorted(center_logs, log_prices), 1, len(center_logs) - 1)
+        left = right - 1
+        if len(center_logs) == 1:
+            nearest = np.zeros(len(log_prices), dtype=int)
+        else:
+            nearest = np.where(np.abs(log_prices - center_logs[left]) <= np.abs(log_prices - center_logs[right]),
+                               left, right)
+        assigned = np.abs(log_prices - center_logs[nearest]) <= self.density_bandwidth
+
+        zones = []
+        for k in range(len(center_logs)):
+            members = np.flatnonzero(assigned & (nearest == k))
+            if len(np.unique(trendline_projections['trendline_idx'][members])) >= self.min_trendlines:
+                zones.append(self._create_convergence_zone(members, trendline_projections, current_price))
+
+        # Same ordering as merged greedy zones
+        zones.sort(key=lambda x: (x['total_weighted_strength'], x['convergence_quality']), reverse=True)
+        return zones
+
     def _create_convergence_zone(self, 
-                                converging_projections: List[Dict[str, Any]],
-                                unique_trendlines: set,
-                                current_price: float) -> Dict[str, Any]:
-        """Create a single convergence zone from projections."""
+                                member_indices: np.ndarray,
+                                projections: Dict[str, Any],
+                                current_price: float) -> ConvergenceZone:
+        """Create a single convergence zone from the projections at member_indices."""
         # Calculate convergence zone statistics
-        prices = [p['projected_price'] for p in converging_projections]
+        prices = projections['projected_price'][member_indices]
         center_price = np.mean(prices)
-        price_std = np.std(prices) if len(prices) > 1 else 0.1
-
-        # Sum time-weighted strengths from UNIQUE trendlines only
-        unique_projections = {}
-        for p in converging_projections:
-            tl_idx = p['trendline_idx']
-            if tl_idx not in unique_projections:
-                unique_projections[tl_idx] = p
-        
+        member_trendline_ids = projections['trendline_idx'][member_indices]
+
+        # Time-weighted strengths from UNIQUE trendlines only (first occurrence order)
+        _, first = np.unique(member_trendline_ids, return_index=True)
+        first = np.sort(first)
+        unique_members = member_indices[first]
+
+        zone = ConvergenceZone(
+            member_trendline_ids=member_trendline_ids.astype(np.int32),
+            member_days_ahead=projections['days_ahead'][member_indices].astype(np.int16),
+            member_prices=prices,
+            trendline_ids=member_trendline_ids[first],
+            trendline_strengths=projections['weighted_strength'][unique_members],
+            trendline_weights=projections['average_weight'][unique_members],
+            cloud_type='Resistance' if center_price > current_price else 'Support',
+            source=projections['source']
+        )
+        self._set_zone_statistics(zone)
+        return zone
+
+    def _set_zone_statistics(self, zone: ConvergenceZone) -> None:
+        """Fill a zone's summary statistics from its member and trendline arrays."""
+        prices = zone.member_prices
+        zone.center_price = np.mean(prices)
+        zone.price_std = np.std(prices) if len(prices) > 1 else 0.1
+        zone.price_range = [prices.min(), prices.max()]
+        zone.total_projections = len(prices)
+
         # Sum the weighted strengths (time-decayed pivot points) for unique trendlines
-        total_weighted_strength = sum(p['weighted_strength'] for p in unique_projections.values())
-        avg_weight = np.mean([p['average_weight'] for p in unique_projections.values()])
-        
+        zone.total_weighted_strength = sum(zone.trendline_strengths.tolist())
+        zone.avg_weight = np.mean(zone.trendline_weights)
+
         # Count of unique trendlines contributing to convergence
-        num_unique_trendlines = len(unique_projections)
+        zone.unique_trendlines = len(zone.trendline_ids)
 
         # Convergence quality: combine tightness, trendline count, and total strength
-        tightness_score = 1.0 / (1.0 + price_std)
-        convergence_quality = (tightness_score * 
-                             num_unique_trendlines * 
-                             (total_weighted_strength / num_unique_trendlines))
-
-        return {
-            'center_price': center_price,
-            'price_std': price_std,
-            'price_range': [min(prices), max(prices)],
-            'unique_trendlines': num_unique_trendlines,
-            'total_projections': len(converging_projections),
-            'total_weighted_strength': total_weighted_strength,
-            'avg_weight': avg_weight,
-            'tightness_score': tightness_score,
-            'convergence_quality': convergence_quality,
-            'projections': converging_projections,
-            'unique_trendline_data': unique_projections,
-            'cloud_type': 'Resistance' if center_price > current_price else 'Support'
-        }
+        zone.tightness_score = 1.0 / (1.0 + zone.price_std)
+        zone.convergence_quality = (zone.tightness_score * 
+                                    zone.unique_trendlines * 
+                                    (zone.total_weighted_strength / zone.unique_trendlines))
     
-    def _merge_nearby_zones(self, initial_zones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Merge nearby zones that are too close together."""
+    def _merge_nearby_zones(self, initial_zones: List[ConvergenceZone]) -> List[ConvergenceZone]:
+        """
+        Merge nearby zones that are too close together.
+
+        Zones only merge with zones of the same cloud type, so each type is swept
+        once in center-price order: a zone absorbs every following zone within
+        merge_threshold of it, and the next unabsorbed zone starts a new group.
+        """
         if not initial_zones:
             return []
             
         # Sort by price for easier merging
         initial_zones.sort(key=lambda x: x['center_price'])
-        
+        centers = np.array([zone['center_price'] for zone in initial_zones])
+        cloud_types = [zone['cloud_type'] for zone in initial_zones]
+
+        groups = []
+        for cloud_type in dict.fromkeys(cloud_types):
+            positions = np.array([k for k, t in enumerate(cloud_types) if t == cloud_type])
+            type_centers = centers[positions]
+            group_ends = np.searchsorted(type_centers, type_centers + self.merge_threshold, side='right')
+
+            start = 0
+            while start < len(positions):
+                end = _exact_window_end(type_centers, start, group_ends[start], self.merge_threshold)
+                groups.append(positions[start:end].tolist())
+                start = end
+
+        # Keep groups in order of their anchor zone, as the pairwise scan produced them
+        groups.sort(key=lambda group: group[0])
+
         merged_zones = []
-        skip_indices = set()
-        
-        for i, zone1 in enumerate(initial_zones):
-            if i in skip_indices:
-                continue
-                
-            # Find all zones to merge with this one
-            zones_to_merge = [zone1]
-            merge_indices = {i}
-            
-            for j, zone2 in enumerate(initial_zones[i+1:], i+1):
-                if j in skip_indices:
-                    continue
-                    
-                price_diff = abs(zone1['center_price'] - zone2['center_price'])
-                same_type = zone1['cloud_type'] == zone2['cloud_type']
-                
-                if price_diff <= self.merge_threshold and same_type:
-                    zones_to_merge.append(zone2)
-                    merge_indices.add(j)
-            
-            # If we found zones to merge, create a combined zone
-            if len(zones_to_merge) > 1:
-                merged_zone = self._create_merged_zone(zones_to_merge)
-                merged_zones.append(merged_zone)
-                skip_indices.update(merge_indices)
+        for group in groups:
+            if len(group) > 1:
+                merged_zones.append(self._create_merged_zone([initial_zones[k] for k in group]))
             else:
                 # No merging needed, keep original zone
-                merged_zones.append(zone1)
-                skip_indices.add(i)
+                merged_zones.append(initial_zones[group[0]])
 
         # Sort by total weighted strength first, then convergence quality
         merged_zones.sort(key=lambda x: (x['total_weighted_strength'], x['convergence_quality']), 
@@ -257,49 +478,32 @@ class TrendCloudDetector:
 
         return merged_zones
     
-    def _create_merged_zone(self, zones_to_merge: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _create_merged_zone(self, zones_to_merge: List[ConvergenceZone]) -> ConvergenceZone:
         """Create a merged zone from multiple zones."""
-        # Combine all projections and unique trendline data
-        all_projections = []
-        all_unique_trendlines = {}
-        
+        # Union of unique trendlines, keeping first occurrence order
+        unique = {}
         for zone in zones_to_merge:
-            all_projections.extend(zone['projections'])
-            all_unique_trendlines.update(zone['unique_trendline_data'])
-        
+            for tl_idx, strength, weight in zip(zone.trendline_ids.tolist(),
+                                                zone.trendline_strengths.tolist(),
+                                                zone.trendline_weights.tolist()):
+                unique.setdefault(tl_idx, (strength, weight))
+
+        merged_zone = ConvergenceZone(
+            member_trendline_ids=np.concatenate([zone.member_trendline_ids for zone in zones_to_merge]),
+            member_days_ahead=np.concatenate([zone.member_days_ahead for zone in zones_to_merge]),
+            member_prices=np.concatenate([zone.member_prices for zone in zones_to_merge]),
+            trendline_ids=np.array(list(unique.keys()), dtype=zones_to_merge[0].trendline_ids.dtype),
+            trendline_strengths=np.array([strength for strength, _ in unique.values()]),
+            trendline_weights=np.array([weight for _, weight in unique.values()]),
+            cloud_type=zones_to_merge[0].cloud_type,  # Same type since we checked
+            source=zones_to_merge[0]._source
+        )
         # Recalculate merged statistics
-        all_prices = [p['projected_price'] for p in all_projections]
-        merged_center_price = np.mean(all_prices)
-        merged_price_std = np.std(all_prices) if len(all_prices) > 1 else 0.1
-        
-        # Sum strengths from all unique trendlines
-        merged_total_strength = sum(p['weighted_strength'] for p in all_unique_trendlines.values())
-        merged_avg_weight = np.mean([p['average_weight'] for p in all_unique_trendlines.values()])
-        merged_unique_count = len(all_unique_trendlines)
-        
-        # Recalculate quality
-        merged_tightness = 1.0 / (1.0 + merged_price_std)
-        merged_quality = (merged_tightness * 
-                        merged_unique_count * 
-                        (merged_total_strength / merged_unique_count))
-        
-        return {
-            'center_price': merged_center_price,
-            'price_std': merged_price_std,
-            'price_range': [min(all_prices), max(all_prices)],
-            'unique_trendlines': merged_unique_count,
-            'total_projections': len(all_projections),
-            'total_weighted_strength': merged_total_strength,
-            'avg_weight': merged_avg_weight,
-            'tightness_score': merged_tightness,
-            'convergence_quality': merged_quality,
-            'projections': all_projections,
-            'unique_trendline_data': all_unique_trendlines,
-            'cloud_type': zones_to_merge[0]['cloud_type'],  # Same type since we checked
-            'merged_from': len(zones_to_merge)  # Track how many zones were merged
-        }
+        self._set_zone_statistics(merged_zone)
+        merged_zone.merged_from = len(zones_to_merge)  # Track how many zones were merged
+        return merged_zone
     
-    def create_final_trend_clouds(self, convergence_zones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def create_final_trend_clouds(self, convergence_zones: List[ConvergenceZone]) -> List[ConvergenceZone]:
         """
         Create final trend clouds from convergence zones with softmax weighting.
         
@@ -342,6 +546,148 @@ class TrendCloudDetector:
 
         return top_zones
 
+    def find_convergence_points_batch(self,
+                                      window_trendline_params: Any,
+                                      window_meta: Any) -> List[List[ConvergenceZone]]:
+        """
+        Find merged convergence zones for many windows in one pass.
+
+        Trendline rows of every window are projected together, and all projections
+        are ordered by (window, price) with a single grouped sort; the convergence
+        and merge sweeps then run on each window's contiguous slice.
+
+        Args:
+            window_trendline_params: DataFrame or dict of columns window_id, log_slope,
+                                     log_intercept, weighted_strength and optionally
+                                     average_weight; rows of a window in trendline order
+            window_meta: DataFrame or dict of columns base_date, current_date,
+                         current_price and optionally window_id (defaults to row position)
+
+        Returns:
+            One list of merged convergence zones per window_meta row
+        """
+        params = pd.DataFrame(window_trendline_params)
+        meta = pd.DataFrame(window_meta)
+        window_ids = meta['window_id'].to_numpy() if 'window_id' in meta else np.arange(len(meta))
+        n_windows = len(meta)
+        zone_lists = [[] for _ in range(n_windows)]
+        if params.empty or n_windows == 0:
+            return zone_lists
+
+        # Map each trendline row to its window position, keeping rows of a window in order
+        row_window = pd.Index(window_ids).get_indexer(params['window_id'].to_numpy())
+        if (row_window < 0).any():
+            raise ValueError("window_trendline_params references window_id missing from window_meta")
+        row_order = np.argsort(row_window, kind='stable')
+        row_window = row_window[row_order]
+        window_offsets = np.searchsorted(row_window, np.arange(n_windows + 1))
+        local_idx = np.arange(len(row_window)) - window_offsets[row_window]
+
+        slopes = params['log_slope'].to_numpy(dtype=float)[row_order]
+        intercepts = params['log_intercept'].to_numpy(dtype=float)[row_order]
+        weighted_strengths = params['weighted_strength'].to_numpy(dtype=float)[row_order]
+        if 'average_weight' in params:
+            average_weights = params['average_weight'].to_numpy(dtype=float)[row_order]
+        else:
+            average_weights = np.zeros(len(row_order))
+
+        # Same projection arithmetic as _generate_projections, one row per trendline
+        current_prices = meta['current_price'].to_numpy(dtype=float)
+        base_offsets = (dates_to_ns(meta['current_date']) - dates_to_ns(meta['base_date'])) // NS_PER_DAY
+        days_ahead = np.arange(1, self.projection_days + 1)
+        x_future = base_offsets[row_window][:, np.newaxis] + days_ahead
+        row_prices = current_prices[row_window][:, np.newaxis]
+
+        projected_prices = np.exp(slopes[:, np.newaxis] * x_future + intercepts[:, np.newaxis])
+        in_band = (0.7 * row_prices <= projected_prices) & (projected_prices <= 1.3 * row_prices)
+        row_idx, day_idx = np.nonzero(in_band)
+
+        projections = {
+            'trendline_idx': local_idx[row_idx],
+            'days_ahead': days_ahead[day_idx],
+            'projected_price': projected_prices[in_band],
+            'weighted_strength': weighted_strengths[row_idx],
+            'average_weight': average_weights[row_idx]
+        }
+        projection_window = row_window[row_idx]
+        projection_offsets = np.searchsorted(projection_window, np.arange(n_windows + 1))
+
+        # Grouped sort by (window, price); lexsort is stable, matching the per-window argsort
+        grouped_order = np.lexsort((projections['projected_price'], projection_window))
+
+        for w in range(n_windows):
+            start, end = projection_offsets[w], projection_offsets[w + 1]
+            if end - start < self.min_trendlines:
+                continue
+            window_projections = {key: values[start:end] for key, values in projections.items()}
+            window_projections['source'] = None
+            if self.engine == 'density':
+                zone_lists[w] = self._find_density_zones(window_projections, current_prices[w])
+                continue
+            initial_zones = self._find_initial_convergence_zones(
+                window_projections, current_prices[w], order=grouped_order[start:end] - start
+            )
+            zone_lists[w] = self._merge_nearby_zones(initial_zones)
+
+        return zone_lists
+
+    def create_final_trend_clouds_batch(self,
+                                        zone_lists: List[List[ConvergenceZone]]) -> List[List[ConvergenceZone]]:
+        """
+        Create final trend clouds for many windows with one segmented softmax.
+
+        Equivalent to create_final_trend_clouds on each list; the per-window max and
+        sum run as segment reductions over the concatenated top zones.
+        """
+        top_lists = [zones[:self.max_clouds] for zones in zone_lists]
+        counts = np.array([len(zones) for zones in top_lists], dtype=int)
+        top_zones = [zone for zones in top_lists for zone in zones]
+        if not top_zones:
+            return top_lists
+
+        present = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+        sizes = counts[present]
+
+        strengths = np.array([zone['total_weighted_strength'] for zone in top_zones], dtype=float)
+        max_strengths = np.repeat(np.maximum.reduceat(strengths, starts), sizes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            softmax_logits = (strengths / max_strengths) / self.temperature
+        max_logits = np.repeat(np.maximum.reduceat(softmax_logits, starts), sizes)
+        exp_logits = np.exp(softmax_logits - max_logits)
+        # bincount accumulates each window in order, like np.sum over a short array
+        zone_windows = np.repeat(np.arange(len(sizes)), sizes)
+        softmax_weights = exp_logits / np.bincount(zone_windows, weights=exp_logits)[zone_windows]
+
+        # Single-zone windows get 1.0; windows without positive strength are uniform
+        zone_sizes = np.repeat(sizes, sizes)
+        softmax_weights = np.where(max_strengths > 0, softmax_weights, 1.0 / zone_sizes)
+        softmax_weights[zone_sizes == 1] = 1.0
+
+        for zone, weight in zip(top_zones, softmax_weights):
+            zone['softmax_weight'] = weight
+
+        for zones in top_lists:
+            for i, zone in enumerate(zones):
+                zone['cloud_id'] = f"{zone['cloud_type'][0]}{i}"
+
+        return top_lists
+
+
+def _exact_window_end(sorted_values: np.ndarray, start: int, guess: int, tolerance: float) -> int:
+    """
+    End (exclusive) of the run after sorted_values[start] with value - start value <= tolerance.
+
+    guess comes from searchsorted on start value + tolerance; it is nudged so the test
+    matches the difference-based comparison exactly at the floating-point boundary.
+    """
+    end = max(int(guess), start + 1)
+    while end < len(sorted_values) and sorted_values[end] - sorted_values[start] <= tolerance:
+        end += 1
+    while end > start + 1 and sorted_values[end - 1] - sorted_values[start] > tolerance:
+        end -= 1
+    return end
+
 
 def detect_trend_clouds(trendlines: List[Dict[str, Any]], 
                        stock_data: pd.DataFrame,
@@ -350,7 +696,12 @@ def detect_trend_clouds(trendlines: List[Dict[str, Any]],
                        merge_threshold: float = 4.0,
                        min_trendlines: int = 3,
                        max_clouds: int = 6,
-                       temperature: float = 2.0) -> List[Dict[str, Any]]:
+                       temperature: float = 2.0,
+                       retain_trendlines: bool = True,
+                       engine: str = 'greedy',
+                       density_bin_width: float = 0.001,
+                       density_bandwidth: float = 0.01,
+                       stats: Optional[Dict[str, Any]] = None) -> List[ConvergenceZone]:
     """
     Convenience function to detect trend clouds from trendlines.
     
@@ -363,9 +714,14 @@ def detect_trend_clouds(trendlines: List[Dict[str, Any]],
         min_trendlines: Minimum trendlines required for convergence
         max_clouds: Maximum number of final clouds
         temperature: Softmax temperature for weighting
+        retain_trendlines: Keep lazy access to the full trendlines from each cloud
+        engine: 'greedy' (tolerance grouping) or 'density' (histogram peaks)
+        density_bin_width: Log-price bin width for the density engine
+        density_bandwidth: Log-price smoothing half-width for the density engine
+        stats: Optional dict updated with projection, zone and cloud counts
         
     Returns:
-        List of final trend clouds with IDs and weights
+        List of final trend clouds (ConvergenceZone) with IDs and weights
     """
     detector = TrendCloudDetector(
         projection_days=projection_days,
@@ -373,18 +729,108 @@ def detect_trend_clouds(trendlines: List[Dict[str, Any]],
         merge_threshold=merge_threshold,
         min_trendlines=min_trendlines,
         max_clouds=max_clouds,
-        temperature=temperature
+        temperature=temperature,
+        retain_trendlines=retain_trendlines,
+        engine=engine,
+        density_bin_width=density_bin_width,
+        density_bandwidth=density_bandwidth
     )
     
     # Find convergence zones
-    convergence_zones = detector.find_convergence_points(trendlines, stock_data)
+    convergence_zones = detector.find_convergence_points(trendlines, stock_data, stats=stats)
     
     # Create final trend clouds
     final_clouds = detector.create_final_trend_clouds(convergence_zones)
+    if stats is not None:
+        stats['clouds'] = len(final_clouds)
     
     return final_clouds
 
 
+def detect_trend_clouds_batch(window_trendline_params: Any,
+                              window_meta: Any,
+                              projection_days: int = 5,
+                              convergence_tolerance: float = 2.5,
+                              merge_threshold: float = 4.0,
+                              min_trendlines: int = 3,
+                              max_clouds: int = 6,
+                              temperature: float = 2.0,
+                              engine: str = 'greedy',
+                              density_bin_width: float = 0.001,
+                              density_bandwidth: float = 0.01) -> List[List[ConvergenceZone]]:
+    """
+    Detect trend clouds for many windows from stacked trendline parameters.
+
+    Gives the same clouds as detect_trend_clouds run on each window (softmax
+    weights bit-identical for max_clouds < 8, to rounding above), without building
+    per-window DataFrames. Clouds reference trendlines by their row position
+    within the window and do not retain the trendline dicts.
+
+    Args:
+        window_trendline_params: DataFrame or dict of columns window_id, log_slope,
+                                 log_intercept, weighted_strength (, average_weight)
+        window_meta: DataFrame or dict of columns (window_id,) base_date,
+                     current_date, current_price; base_date is the first date of
+                     the window the trendlines were fitted on
+        projection_days, convergence_tolerance, merge_threshold, min_trendlines,
+        max_clouds, temperature, engine, density_bin_width, density_bandwidth:
+            As for detect_trend_clouds
+
+    Returns:
+        One list of final trend clouds per window_meta row
+    """
+    detector = TrendCloudDetector(
+        projection_days=projection_days,
+        convergence_tolerance=convergence_tolerance,
+        merge_threshold=merge_threshold,
+        min_trendlines=min_trendlines,
+        max_clouds=max_clouds,
+        temperature=temperature,
+        retain_trendlines=False,
+        engine=engine,
+        density_bin_width=density_bin_width,
+        density_bandwidth=density_bandwidth
+    )
+
+    zone_lists = detector.find_convergence_points_batch(window_trendline_params, window_meta)
+    return detector.create_final_trend_clouds_batch(zone_lists)
+
+
+def cloud_set_deviation(clouds_a: List[Dict[str, Any]],
+                        clouds_b: List[Dict[str, Any]],
+                        current_price: float) -> Dict[str, Any]:
+    """
+    Worst-case difference between two cloud sets for the same window.
+
+    Every cloud is matched to the nearest cloud of the same type in the other set.
+    A cloud with no counterpart of its type counts as a center deviation of 1.0.
+
+    Returns:
+        Dict with center_deviation (largest center distance as a fraction of
+        current_price), weight_deviation (largest softmax weight difference between
+        matched clouds) and count_difference
+    """
+    center_deviation = 0.0
+    weight_deviation = 0.0
+    for source, target in ((clouds_a, clouds_b), (clouds_b, clouds_a)):
+        for cloud in source:
+            candidates = [other for other in target if other['cloud_type'] == cloud['cloud_type']]
+            if not candidates:
+                center_deviation = max(center_deviation, 1.0)
+                continue
+            nearest = min(candidates, key=lambda other: abs(other['center_price'] - cloud['center_price']))
+            center_deviation = max(center_deviation,
+                                   abs(nearest['center_price'] - cloud['center_price']) / current_price)
+            weight_deviation = max(weight_deviation,
+                                   abs(nearest.get('softmax_weight', 1.0) - cloud.get('softmax_weight', 1.0)))
+
+    return {
+        'center_deviation': float(center_deviation),
+        'weight_deviation': float(weight_deviation),
+        'count_difference': abs(len(clouds_a) - len(clouds_b))
+    }
+
+
 def analyze_trend_cloud_metrics(trend_clouds: List[Dict[str, Any]], 
                                current_price: float) -> Dict[str, Any]:
     """
@@ -0,0 +1,175 @@
+"""
+Trend Cloud Stream Module
+Streaming NDJSON storage for continuous trend cloud results
+
+Layout of <SYMBOL>_continuous_trend_clouds.ndjson:
+    {"metadata": {...}}                                        header (run parameters)
+    {"calculation_date": ..., "projection_start": ..., "projection_end": ...,
+     "current_price": ..., "trend_clouds": [...]}              one compact line per date
+
+Fields shared by every cloud of a date are stored once on its line and folded
+back into each cloud by the reader.
+
+A sidecar <SYMBOL>_continuous_trend_clouds.index.json, written when the stream
+is closed, holds the final metadata and summary plus the byte offset of every
+`stride`-th record, so a reader can seek to a date range instead of parsing the
+whole file. Records are written as windows finish, in calculation-date order.
+"""
+
+import os
+import json
+import bisect
+from pathlib import Path
+
+STREAM_FORMAT = 'trend-cloud-ndjson/1'
+
+# Cloud fields that are the same for every cloud of one calculation date
+SHARED_FIELDS = ('calculation_date', 'projection_start', 'projection_end', 'current_price')
+
+
+def index_path_for(path):
+    """Sidecar index path for a stream file"""
+    path = Path(path)
+    return path.with_name(path.name[:-len(path.suffix)] + '.index.json')
+
+
+def _dumps(entry):
+    return json.dumps(entry, separators=(',', ':'), default=str)
+
+
+class TrendCloudStreamWriter:
+    """Writes one compact NDJSON line per calculation date as results arrive"""
+
+    def __init__(self, path, metadata, stride=32):
+        """
+        Args:
+            path: Output .ndjson path (overwritten)
+            metadata: Run metadata for the header line
+            stride: Record every stride-th record's byte offset in the index
+        """
+        self.path = Path(path)
+        self.stride = stride
+        self.records = 0
+        self.offsets = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._file.write((_dumps({'metadata': dict(metadata, format=STREAM_FORMAT)}) + '\n').encode('utf-8'))
+
+    def append(self, calculation_date, trend_clouds):
+        """Write the cloud records of one calculation date (dates must arrive in order)"""
+        if self.records % self.stride == 0:
+            self.offsets.append([calculation_date, self._file.tell()])
+        record = {field: trend_clouds[0][field] for field in SHARED_FIELDS if field in trend_clouds[0]}
+        record['calculation_date'] = calculation_date
+        record['trend_clouds'] = [{k: v for k, v in cloud.items() if k not in SHARED_FIELDS}
+                                  for cloud in trend_clouds]
+        line = _dumps(record) + '\n'
+        self._file.write(line.encode('utf-8'))
+        self.records += 1
+
+    def close(self, metadata=None, summary=None):
+        """Finish the stream and write the offset index with the final metadata and summary"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+
+        index = {
+            'format': STREAM_FORMAT,
+            'records': self.records,
+            'stride': self.stride,
+            'offsets': self.offsets,
+            'metadata': metadata,
+            'summary': summary
+        }
+        index_path = index_path_for(self.path)
+        temp_path = index_path.with_name(index_path.name + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(index, f, separators=(',', ':'), default=str)
+        os.replace(temp_path, index_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrendCloudStreamReader:
+    """Lazy reader for streams written by TrendCloudStreamWriter"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.header = json.loads(f.readline())['metadata']
+
+        self.index = None
+        index_path = index_path_for(self.path)
+        if index_path.exists():
+            with open(index_path, 'r') as f:
+                self.index = json.load(f)
+
+    @property
+    def metadata(self):
+        """Final metadata when the stream was closed, else the header"""
+        if self.index and self.index.get('metadata'):
+            return self.index['metadata']
+        return self.header
+
+    @property
+    def summary(self):
+        return self.index.get('summary') if self.index else None
+
+    def iter_records(self, start_date=None, end_date=None):
+        """
+        Yield one record per date (shared fields plus compact 'trend_clouds'), lazily.
+
+        Args:
+            start_date, end_date: Optional inclusive ISO date bounds; with an index
+                                  the reader seeks to the block containing start_date
+        """
+        start_date = _iso(start_date)
+        end_date = _iso(end_date)
+
+        with open(self.path, 'rb') as f:
+            f.readline()  # header
+            if start_date and self.index and self.index['offsets']:
+                dates = [date for date, _ in self.index['offsets']]
+                block = max(bisect.bisect_right(dates, start_date) - 1, 0)
+                f.seek(self.index['offsets'][block][1])
+
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                calculation_date = record['calculation_date']
+                # Compare on the bound's precision, so a bare date covers that whole day
+                if start_date and calculation_date[:len(start_date)] < start_date:
+                    continue
+                if end_date and calculation_date[:len(end_date)] > end_date:
+                    break
+                yield record
+
+    def iter_trend_clouds(self, start_date=None, end_date=None):
+        """Yield flat cloud records, as in the 'trend_clouds' list of the JSON results"""
+        for record in self.iter_records(start_date, end_date):
+            for cloud in record['trend_clouds']:
+                flat = {field: record[field] for field in SHARED_FIELDS[:3] if field in record}
+                flat.update(cloud)
+                if 'current_price' in record:
+                    flat['current_price'] = record['current_price']
+                yield flat
+
+    def load_results(self):
+        """Materialize the standard results dict (metadata, trend_clouds, summary)"""
+        results = {'metadata': self.metadata, 'trend_clouds': list(self.iter_trend_clouds())}
+        if self.summary:
+            results['summary'] = self.summary
+        return results
+
+
+def _iso(date):
+    """ISO string for a date bound (a string bound is used as given, e.g. '2020-01-31')"""
+    if date is None:
+        return None
+    return date if isinstance(date, str) else date.isoformat()
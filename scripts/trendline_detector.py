@@ -3,9 +3,17 @@ Trendline Detection Module
 Extracts trendline detection functionality from the trend cloud notebook
 """
 
+import os
+import sys
 import numpy as np
 import pandas as pd
-from scipy import stats
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Add the scripts directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from time_weights import time_weights_for_dates, days_since
+from trendline_kernels import csr_from_mask, weighted_line_fit_csr, band_captures, segment_sum
 
 
 def find_iterative_trendline_log(pivot1, pivot2, all_pivots, stock_data, tolerance_percent=2.0):
@@ -17,6 +25,9 @@ def find_iterative_trendline_log(pivot1, pivot2, all_pivots, stock_data, toleran
     4. Add them and recalculate best-fit line
     5. Repeat until no new points found within tolerance
     """
+    # Imported on use: scipy.stats dominates this module's import time
+    from scipy import stats
+
     # Start with the initial two points
     current_points = [pivot1, pivot2]
 
@@ -89,12 +100,18 @@ def find_iterative_trendline_log(pivot1, pivot2, all_pivots, stock_data, toleran
         return None
 
 
-def detect_powerful_trendlines_log(pivots, stock_data, max_lines=30):
-    """Find powerful LOG SCALE trendlines using iterative best-fit refinement with smart pair removal"""
+def detect_powerful_trendlines_log(pivots, stock_data, max_lines=30, tolerance_percent=2.0, stats=None):
+    """
+    Find powerful LOG SCALE trendlines using iterative best-fit refinement with smart pair removal
+
+    Args:
+        tolerance_percent: Price tolerance (%) for a pivot to join a trendline
+        stats: Optional dict updated with search counters
+    """
     trendlines = []
     used_trendline_pairs = set()
 
-    print(f"🔍 LOG SCALE iterative trendline detection with proper 2% tolerance...")
+    print(f"🔍 LOG SCALE iterative trendline detection with proper {tolerance_percent:g}% tolerance...")
 
     # Create list of all possible pairs first
     all_pairs = []
@@ -109,6 +126,8 @@ def detect_powerful_trendlines_log(pivots, stock_data, max_lines=30):
 
     processed_pairs = 0
     skipped_pairs = 0
+    refits = 0
+    refit_iterations = 0
 
     for i, j, pivot1, pivot2 in all_pairs:
         processed_pairs += 1
@@ -120,7 +139,10 @@ def detect_powerful_trendlines_log(pivots, stock_data, max_lines=30):
             continue
 
         # Find iterative trendline starting with this pair using LOG SCALE
-        result = find_iterative_trendline_log(pivot1, pivot2, pivots, stock_data, tolerance_percent=2.0)
+        result = find_iterative_trendline_log(pivot1, pivot2, pivots, stock_data, tolerance_percent=tolerance_percent)
+        refits += 1
+        if result:
+            refit_iterations += result['iterations']
 
         if result and result['strength'] >= 2:
             trendline = {
@@ -174,6 +196,17 @@ def detect_powerful_trendlines_log(pivots, stock_data, max_lines=30):
     print(f"   Processed {processed_pairs} pairs, skipped {skipped_pairs} internal pairs")
     print(f"   Final selection: {len(top_trendlines)} trendlines")
 
+    if stats is not None:
+        stats.update({
+            'pivots': len(pivots),
+            'pairs_total': len(all_pairs),
+            'pairs_processed': processed_pairs,
+            'pairs_skipped': skipped_pairs,
+            'refits': refits,
+            'refit_iterations': refit_iterations,
+            'trendlines_accepted': len(trendlines)
+        })
+
     if top_trendlines:
         strengths = [tl['strength'] for tl in top_trendlines]
         growth_rates = [tl['daily_growth_rate'] for tl in top_trendlines]
@@ -212,45 +245,39 @@ def calculate_time_weight(pivot_date, reference_date, half_life_days=80, min_wei
     Returns:
         Weight between min_weight and 1.0
     """
-    days_ago = (reference_date - pivot_date).days
-    
-    # Exponential decay: weight = 0.5^(days_ago / half_life_days)
-    decay_factor = np.exp(-days_ago * np.log(2) / half_life_days)
-    
-    # Ensure minimum weight
-    weight = max(decay_factor, min_weight)
-    
-    return weight
+    # Exponential decay: weight = 0.5^(days_ago / half_life_days), floored at min_weight
+    return float(time_weights_for_dates([pivot_date], reference_date, half_life_days, min_weight)[0])
+
+
+def pivot_time_weights(pivots, stock_data, half_life_days=80, min_weight=0.1):
+    """
+    Time weights for all pivots relative to the last date in stock_data.
+
+    Returns:
+        Weight array aligned with pivots
+    """
+    pivot_dates = [pivot['date'] for pivot in pivots]
+    return time_weights_for_dates(pivot_dates, stock_data['Date'].iloc[-1], half_life_days, min_weight)
 
 
-def apply_time_weights_to_pivots(pivots, stock_data, half_life_days=80, min_weight=0.1):
+def apply_time_weights_to_pivots(pivots, stock_data, half_life_days=80, min_weight=0.1, weights=None):
     """
     Apply time-based weights to pivot points.
-    
+
+    Args:
+        weights: Precomputed pivot_time_weights (computed here if None)
+
     Returns:
         List of pivots with added 'time_weight' field
     """
     if not pivots:
         return []
     
-    # Use the most recent date as reference
-    reference_date = stock_data['Date'].iloc[-1]
-    
-    weighted_pivots = []
-    for pivot in pivots:
-        weight = calculate_time_weight(
-            pivot['date'], 
-            reference_date, 
-            half_life_days, 
-            min_weight
-        )
-        
-        # Create new pivot with weight
-        weighted_pivot = pivot.copy()
-        weighted_pivot['time_weight'] = weight
-        weighted_pivots.append(weighted_pivot)
-    
-    return weighted_pivots
+    # Use the most recent date as reference; weights for all pivots in one pass
+    if weights is None:
+        weights = pivot_time_weights(pivots, stock_data, half_life_days, min_weight)
+
+    return [dict(pivot, time_weight=weight) for pivot, weight in zip(pivots, weights.tolist())]
 
 
 def find_weighted_iterative_trendline_log(pivot1, pivot2, all_pivots, stock_data, 
@@ -261,6 +288,9 @@ def find_weighted_iterative_trendline_log(pivot1, pivot2, all_pivots, stock_data
     Args:
         weight_factor: How much to amplify the effect of time weights (2.0 = double impact)
     """
+    # Imported on use: scipy.stats dominates this module's import time
+    from scipy import stats
+
     # Start with the initial two points
     current_points = [pivot1, pivot2]
     
@@ -396,33 +426,351 @@ def find_weighted_iterative_trendline_log(pivot1, pivot2, all_pivots, stock_data
         return None
 
 
+def find_weighted_iterative_trendlines_batch(pairs, all_pivots, stock_data,
+                                             tolerance_percent=2.0, weight_factor=2.0, max_iterations=100,
+                                             time_weights=None):
+    """
+    Batched find_weighted_iterative_trendline_log for many seed pairs at once.
+
+    Every seed pair starts as a 2-point group; each round fits all still-growing
+    groups with one segment-reduction pass and adds every pivot inside a group's
+    (time-weight adjusted) tolerance band, until no group grows. Results follow the
+    pairwise function's format and agree with it up to floating-point summation order.
+
+    Args:
+        pairs: List of (i, j) index pairs into all_pivots
+        time_weights: Weight array aligned with all_pivots (pivot_time_weights); read
+                      from each pivot's 'time_weight' if None
+
+    Returns:
+        List of result dicts (or None) aligned with pairs
+    """
+    if not pairs:
+        return []
+
+    n_pivots = len(all_pivots)
+    x = days_since(stock_data['Date'].iloc[0], [p['date'] for p in all_pivots]).astype(float)
+    y = np.array([p['log_price'] for p in all_pivots], dtype=float)
+    if time_weights is None:
+        time_weight = np.array([p.get('time_weight', 1.0) for p in all_pivots], dtype=float)
+    else:
+        time_weight = np.asarray(time_weights, dtype=float)
+    fit_weight = time_weight ** weight_factor
+
+    # Recent points get a tighter tolerance, as in the pairwise refit
+    log_tolerance = np.log(1 + tolerance_percent/100)
+    adjusted_tolerance = log_tolerance * (2.0 - time_weight)
+
+    n_groups = len(pairs)
+    seeds = np.asarray(pairs)
+    members = np.zeros((n_groups, n_pivots), dtype=bool)
+    members[np.arange(n_groups), seeds[:, 0]] = True
+    members[np.arange(n_groups), seeds[:, 1]] = True
+
+    # Round in which each pivot joined its group, to keep the pairwise point order
+    join_round = np.zeros((n_groups, n_pivots), dtype=np.int32)
+    iterations = np.zeros(n_groups, dtype=int)
+    active = np.arange(n_groups)
+
+    for iteration in range(1, max_iterations + 1):
+        iterations[active] = iteration
+
+        offsets, columns = csr_from_mask(members[active], join_round[active])
+        fit = weighted_line_fit_csr(offsets, x[columns], y[columns], fit_weight[columns])
+
+        captures = band_captures(fit['slope'], fit['intercept'], x, y, adjusted_tolerance)
+        captures &= ~members[active]
+        captures[fit['denominator'] == 0] = False
+
+        members[active] |= captures
+        join_round[active] = np.where(captures, iteration, join_round[active])
+
+        active = active[captures.any(axis=1)]
+        if len(active) == 0:
+            break
+
+    # Final weighted fit with all connected points
+    offsets, columns = csr_from_mask(members, join_round)
+    fit = weighted_line_fit_csr(offsets, x[columns], y[columns], fit_weight[columns])
+    weighted_strength = segment_sum(offsets, time_weight[columns])
+
+    results = []
+    for g in range(n_groups):
+        group_columns = columns[offsets[g]:offsets[g + 1]]
+        strength = len(group_columns)
+        slope = fit['slope'][g]
+        results.append({
+            'connected_points': [all_pivots[idx] for idx in group_columns],
+            'strength': strength,
+            'weighted_strength': weighted_strength[g],
+            'log_slope': slope,
+            'log_intercept': fit['intercept'][g],
+            'daily_growth_rate': (np.exp(slope) - 1) * 100,
+            'r_squared': fit['r_squared'][g],
+            'iterations': int(iterations[g]),
+            'average_weight': weighted_strength[g] / strength
+        })
+
+    return results
+
+
+# Parallel speculative refinement
+#
+# The greedy loop below is sequential only because `used_trendline_pairs` grows as
+# trendlines are accepted. The refits themselves are read-only over the pivots, so
+# the next few candidate pairs can be refined ahead of time in a pool and committed
+# in priority order; a refit whose seed pair was invalidated by an earlier commit is
+# simply discarded. Acceptance decisions are unchanged, so the output is identical
+# to the sequential run.
+
+_refine_worker_state = {}
+
+
+def _init_refine_worker(weighted_pivots, stock_data_head, tolerance_percent, weight_factor):
+    """Pool initializer: keep the window's pivots resident in each worker"""
+    _refine_worker_state['pivots'] = weighted_pivots
+    _refine_worker_state['stock_data'] = stock_data_head
+    _refine_worker_state['tolerance_percent'] = tolerance_percent
+    _refine_worker_state['weight_factor'] = weight_factor
+    _refine_worker_state['positions'] = {id(p): idx for idx, p in enumerate(weighted_pivots)}
+
+
+def _refine_pair_worker(pair_indices):
+    """Refine one candidate pair inside a worker, returning connected points as pivot indices"""
+    pivots = _refine_worker_state['pivots']
+    i, j = pair_indices
+    result = find_weighted_iterative_trendline_log(
+        pivots[i], pivots[j], pivots, _refine_worker_state['stock_data'],
+        tolerance_percent=_refine_worker_state['tolerance_percent'],
+        weight_factor=_refine_worker_state['weight_factor']
+    )
+    if result is None:
+        return None
+
+    # Pivot dicts are sent back as positions so the parent can reattach its own objects
+    positions = _refine_worker_state['positions']
+    result['connected_points'] = [positions[id(p)] for p in result['connected_points']]
+    return result
+
+
+def _iter_refined_pairs(all_pairs, used_trendline_pairs, refine_batch, batch_size):
+    """
+    Yield (pair, result) in priority order, refining up to batch_size pairs ahead.
+
+    Pairs already invalidated when a batch is formed are not refined (result None).
+    Since used_trendline_pairs only grows, the caller's commit-time check still
+    skips them, and also discards refits invalidated by commits within the batch.
+    """
+    position = 0
+    while position < len(all_pairs):
+        batch = all_pairs[position:position + batch_size]
+        position += len(batch)
+
+        pending = [pair for pair in batch
+                   if tuple(sorted([pair[0], pair[1]])) not in used_trendline_pairs]
+        results = dict(zip(((pair[0], pair[1]) for pair in pending), refine_batch(pending)))
+
+        for pair in batch:
+            yield pair, results.get((pair[0], pair[1]))
+
+
+# Warm-start support for consecutive rolling windows
+
+def pivot_key(pivot):
+    """Identify a pivot across overlapping windows (its 'index' is window-relative)"""
+    return (pivot['date'], pivot['type'])
+
+
+def trendline_signature(trendline):
+    """Window-independent identity of a trendline: the sorted keys of its connected points"""
+    return tuple(sorted(pivot_key(p) for p in trendline['connected_points']))
+
+
+def trendline_set_divergence(trendlines_a, trendlines_b):
+    """
+    Jaccard distance between two trendline sets (0.0 = same lines, 1.0 = disjoint).
+    """
+    signatures_a = set(trendline_signature(tl) for tl in trendlines_a)
+    signatures_b = set(trendline_signature(tl) for tl in trendlines_b)
+    union = signatures_a | signatures_b
+    if not union:
+        return 0.0
+    return 1.0 - len(signatures_a & signatures_b) / len(union)
+
+
+def _warm_start_candidate_pairs(weighted_pivots, seed_trendlines, seed_pivots=None, max_lines=None,
+                                time_weights=None):
+    """
+    Candidate (i, j) pairs for a warm-started search.
+
+    Seeds are mapped onto this window's pivots by date/type. A seed keeps its original
+    start/end pair when both survive, otherwise its first and last surviving points;
+    seeds with fewer than 2 surviving points are dropped. All pairs are generated
+    where at least one pivot is new, i.e. absent from seed_pivots (or, without
+    seed_pivots, later than every seed point). Pairs of old pivots are re-admitted
+    when their current priority is at least the lowest current priority of a seed
+    pair: the previous search reached them, and as the weights decay they can
+    outrank the seeds or yield lines the seeds no longer block. With fewer than
+    max_lines seeds the previous search ran out of pairs, so all old pairs return.
+    time_weights is the pivots' weight array (read from the pivots if None).
+    """
+    positions = {pivot_key(p): idx for idx, p in enumerate(weighted_pivots)}
+
+    seed_pairs = set()
+    seeds_dropped = 0
+    for trendline in seed_trendlines:
+        endpoints = [positions.get(pivot_key(trendline['start_pivot'])),
+                     positions.get(pivot_key(trendline['end_pivot']))]
+        if None in endpoints:
+            surviving = sorted(positions[pivot_key(p)] for p in trendline['connected_points']
+                               if pivot_key(p) in positions)
+            if len(surviving) < 2:
+                seeds_dropped += 1
+                continue
+            endpoints = [surviving[0], surviving[-1]]
+        i, j = sorted(endpoints)
+        if i != j:
+            seed_pairs.add((i, j))
+        else:
+            seeds_dropped += 1
+
+    if seed_pivots is not None:
+        known = set(pivot_key(p) for p in seed_pivots)
+        new_indices = [idx for idx, p in enumerate(weighted_pivots) if pivot_key(p) not in known]
+    else:
+        seed_dates = [p['date'] for tl in seed_trendlines for p in tl['connected_points']]
+        last_seed_date = max(seed_dates) if seed_dates else None
+        new_indices = [idx for idx, p in enumerate(weighted_pivots)
+                       if last_seed_date is None or p['date'] > last_seed_date]
+
+    candidate_pairs = set(seed_pairs)
+    for k in new_indices:
+        for other in range(len(weighted_pivots)):
+            if other != k:
+                candidate_pairs.add((min(k, other), max(k, other)))
+
+    readmitted = 0
+    if seed_pairs:
+        # Same score as the pair loop in detect_time_weighted_trendlines_log, for all pairs at once
+        if time_weights is None:
+            weights = np.array([p.get('time_weight', 1.0) for p in weighted_pivots])
+        else:
+            weights = np.asarray(time_weights, dtype=float)
+        days = days_since(weighted_pivots[0]['date'], [p['date'] for p in weighted_pivots])
+        priority = ((weights[:, np.newaxis] + weights) / 2 * 0.7 +
+                    (np.abs(days[:, np.newaxis] - days) / 365) * 0.3)
+        if max_lines is not None and len(seed_trendlines) < max_lines:
+            threshold = -np.inf
+        else:
+            threshold = min(priority[i, j] for i, j in seed_pairs)
+
+        old = np.ones(len(weighted_pivots), dtype=bool)
+        old[new_indices] = False
+        eligible = np.triu(priority >= threshold, k=1) & old[:, np.newaxis] & old
+        for i, j in zip(*np.nonzero(eligible)):
+            pair = (int(i), int(j))
+            if pair not in candidate_pairs:
+                candidate_pairs.add(pair)
+                readmitted += 1
+
+    warm_info = {
+        'seeds': len(seed_trendlines),
+        'seed_pairs': len(seed_pairs),
+        'seeds_dropped': seeds_dropped,
+        'new_pivots': len(new_indices),
+        'readmitted_pairs': readmitted
+    }
+    # Lexicographic order matches the cold pair enumeration, so ties sort identically
+    return sorted(candidate_pairs), warm_info
+
+
 def detect_time_weighted_trendlines_log(pivots, stock_data, max_lines=30, 
-                                      half_life_days=80, min_weight=0.1, weight_factor=2.0):
-    """Enhanced trendline detection with time weighting and recent pivot prioritization"""
-    
-    # Apply time weights to pivots
-    weighted_pivots = apply_time_weights_to_pivots(pivots, stock_data, half_life_days, min_weight)
+                                      half_life_days=80, min_weight=0.1, weight_factor=2.0,
+                                      workers=None, speculation_depth=None, parallel_backend='process',
+                                      seed_trendlines=None, seed_pivots=None, warm_start_mode='fast',
+                                      tolerance_percent=2.0, batched_refinement=False, stats=None):
+    """
+    Enhanced trendline detection with time weighting and recent pivot prioritization
+
+    Args:
+        workers: Refine candidate pairs in a pool of this many workers (None/1 = sequential)
+        speculation_depth: Candidate pairs refined ahead per round (default: 4 x workers)
+        parallel_backend: 'process' or 'thread' pool for speculative refinement
+        seed_trendlines: Previous window's trendlines to warm-start the search from
+        seed_pivots: Previous window's pivots, used to tell which pivots are new
+        warm_start_mode: 'fast' returns the warm-started result; 'strict' also runs the
+                         cold search, returns it, and records whether the two agree
+        tolerance_percent: Price tolerance (%) for a pivot to join a trendline
+        batched_refinement: Refine upcoming candidate pairs in vectorized rounds with
+                            find_weighted_iterative_trendlines_batch instead of one by one
+                            (speculation_depth pairs per round, default 32)
+        stats: Optional dict updated with search counters (and warm-start divergence)
+    """
+    if seed_trendlines is not None and warm_start_mode == 'strict':
+        search_args = dict(max_lines=max_lines, half_life_days=half_life_days, min_weight=min_weight,
+                           weight_factor=weight_factor, workers=workers,
+                           speculation_depth=speculation_depth, parallel_backend=parallel_backend,
+                           tolerance_percent=tolerance_percent, batched_refinement=batched_refinement)
+        warm_stats = {}
+        warm_trendlines = detect_time_weighted_trendlines_log(
+            pivots, stock_data, seed_trendlines=seed_trendlines, seed_pivots=seed_pivots,
+            warm_start_mode='fast', stats=warm_stats, **search_args
+        )
+        cold_stats = {}
+        cold_trendlines = detect_time_weighted_trendlines_log(pivots, stock_data, stats=cold_stats, **search_args)
+
+        divergence = trendline_set_divergence(warm_trendlines, cold_trendlines)
+        equivalent = ([trendline_signature(tl) for tl in warm_trendlines] ==
+                      [trendline_signature(tl) for tl in cold_trendlines])
+        print(f"   Warm start check: divergence={divergence:.3f}, equivalent={equivalent}")
+
+        if stats is not None:
+            stats.update(cold_stats)
+            stats['warm_start'] = dict(warm_stats['warm_start'], mode='strict',
+                                       divergence=divergence, equivalent=equivalent,
+                                       warm_pairs_total=warm_stats['pairs_total'])
+        return cold_trendlines
+
+    # Apply time weights to pivots. The search reads the weight array; the weighted pivot
+    # copies are what the pairwise refit reads and what trendlines report as their points
+    time_weights = pivot_time_weights(pivots, stock_data, half_life_days, min_weight) if pivots else np.zeros(0)
+    weighted_pivots = apply_time_weights_to_pivots(pivots, stock_data, half_life_days, min_weight, time_weights)
+    pair_weights = time_weights.tolist()
     
     trendlines = []
     used_trendline_pairs = set()
     
     print(f"🔍 Time-weighted LOG SCALE trendline detection...")
     print(f"   Half-life: {half_life_days} days, weight factor: {weight_factor:.1f}x")
-    
-    # Create list of all possible pairs
+
+    if seed_trendlines is not None:
+        if warm_start_mode != 'fast':
+            raise ValueError(f"Unknown warm_start_mode: {warm_start_mode}")
+        candidate_pairs, warm_info = _warm_start_candidate_pairs(weighted_pivots, seed_trendlines, seed_pivots,
+                                                                 max_lines, time_weights)
+        print(f"   Warm start: {warm_info['seed_pairs']} seed pairs ({warm_info['seeds_dropped']} seeds dropped), "
+              f"{warm_info['new_pivots']} new pivots, {warm_info['readmitted_pairs']} old pairs re-admitted")
+    else:
+        candidate_pairs = ((i, j) for i in range(len(weighted_pivots))
+                           for j in range(i + 1, len(weighted_pivots)))
+        warm_info = None
+
+    # Create list of all candidate pairs
     all_pairs = []
-    for i, pivot1 in enumerate(weighted_pivots):
-        for j, pivot2 in enumerate(weighted_pivots[i+1:], i+1):
-            # Calculate pair priority based on:
-            # 1. Combined time weight (favor recent pivots)
-            # 2. Time span (favor longer trendlines)
-            combined_weight = (pivot1.get('time_weight', 1.0) + pivot2.get('time_weight', 1.0)) / 2
-            time_span = abs((pivot2['date'] - pivot1['date']).days)
-            
-            # Priority score: combine weight and time span
-            priority_score = combined_weight * 0.7 + (time_span / 365) * 0.3
-            
-            all_pairs.append((i, j, pivot1, pivot2, priority_score))
+    for i, j in candidate_pairs:
+        pivot1 = weighted_pivots[i]
+        pivot2 = weighted_pivots[j]
+
+        # Calculate pair priority based on:
+        # 1. Combined time weight (favor recent pivots)
+        # 2. Time span (favor longer trendlines)
+        combined_weight = (pair_weights[i] + pair_weights[j]) / 2
+        time_span = abs((pivot2['date'] - pivot1['date']).days)
+
+        # Priority score: combine weight and time span
+        priority_score = combined_weight * 0.7 + (time_span / 365) * 0.3
+
+        all_pairs.append((i, j, pivot1, pivot2, priority_score))
     
     print(f"   Created {len(all_pairs)} potential trendline pairs")
     
@@ -431,68 +779,116 @@ def detect_time_weighted_trendlines_log(pivots, stock_data, max_lines=30,
     
     processed_pairs = 0
     skipped_pairs = 0
-    
-    for i, j, pivot1, pivot2, priority_score in all_pairs:
-        processed_pairs += 1
-        
-        # Smart pair removal: Skip if both points already used
-        pair_key = tuple(sorted([i, j]))
-        if pair_key in used_trendline_pairs:
-            skipped_pairs += 1
-            continue
-        
-        # Find weighted iterative trendline
-        result = find_weighted_iterative_trendline_log(
-            pivot1, pivot2, weighted_pivots, stock_data, 
-            tolerance_percent=2.0, weight_factor=weight_factor
-        )
-        
-        if result and result['strength'] >= 2:
-            trendline = {
-                'start_pivot': pivot1,
-                'end_pivot': pivot2,
-                'connected_points': result['connected_points'],
-                'strength': result['strength'],
-                'weighted_strength': result['weighted_strength'],
-                'average_weight': result['average_weight'],
-                'log_slope': result['log_slope'],
-                'log_intercept': result['log_intercept'],
-                'daily_growth_rate': result['daily_growth_rate'],
-                'r_squared': result['r_squared'],
-                'iterations': result['iterations'],
-                'length_days': abs((pivot2['date'] - pivot1['date']).days),
-                'priority_score': priority_score
-            }
+    refits = 0
+    refit_iterations = 0
+
+    def refine_sequential(pairs):
+        return [find_weighted_iterative_trendline_log(
+                    pivot1, pivot2, weighted_pivots, stock_data,
+                    tolerance_percent=tolerance_percent, weight_factor=weight_factor
+                ) for _, _, pivot1, pivot2, _ in pairs]
+
+    executor = None
+    if batched_refinement:
+        batch_size = speculation_depth or 32
+
+        def refine_batch(pairs):
+            return find_weighted_iterative_trendlines_batch(
+                [(i, j) for i, j, _, _, _ in pairs], weighted_pivots, stock_data,
+                tolerance_percent=tolerance_percent, weight_factor=weight_factor, time_weights=time_weights
+            )
+        print(f"   Batched refinement: {batch_size} pairs per round")
+    elif workers and workers > 1:
+        batch_size = speculation_depth or workers * 4
+        if parallel_backend == 'process':
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_refine_worker,
+                initargs=(weighted_pivots, stock_data.iloc[:1], tolerance_percent, weight_factor)
+            )
+
+            def refine_batch(pairs):
+                results = list(executor.map(_refine_pair_worker, [(i, j) for i, j, _, _, _ in pairs]))
+                for result in results:
+                    if result is not None:
+                        result['connected_points'] = [weighted_pivots[idx] for idx in result['connected_points']]
+                return results
+        elif parallel_backend == 'thread':
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+            def refine_batch(pairs):
+                return list(executor.map(lambda pair: refine_sequential([pair])[0], pairs))
+        else:
+            raise ValueError(f"Unknown parallel_backend: {parallel_backend}")
+        print(f"   Speculative refinement: {workers} {parallel_backend} workers, {batch_size} pairs ahead")
+    else:
+        batch_size = 1
+        refine_batch = refine_sequential
+
+    try:
+        refined_pairs = _iter_refined_pairs(all_pairs, used_trendline_pairs, refine_batch, batch_size)
+        for (i, j, pivot1, pivot2, priority_score), result in refined_pairs:
+            processed_pairs += 1
+
+            # Smart pair removal: Skip if both points already used
+            pair_key = tuple(sorted([i, j]))
+            if pair_key in used_trendline_pairs:
+                skipped_pairs += 1
+                continue
+
+            refits += 1
+            if result:
+                refit_iterations += result['iterations']
+
+            if result and result['strength'] >= 2:
+                trendline = {
+                    'start_pivot': pivot1,
+                    'end_pivot': pivot2,
+                    'connected_points': result['connected_points'],
+                    'strength': result['strength'],
+                    'weighted_strength': result['weighted_strength'],
+                    'average_weight': result['average_weight'],
+                    'log_slope': result['log_slope'],
+                    'log_intercept': result['log_intercept'],
+                    'daily_growth_rate': result['daily_growth_rate'],
+                    'r_squared': result['r_squared'],
+                    'iterations': result['iterations'],
+                    'length_days': abs((pivot2['date'] - pivot1['date']).days),
+                    'priority_score': priority_score
+                }
             
-            trendlines.append(trendline)
+                trendlines.append(trendline)
             
-            # Remove used pairs
-            connected_indices = []
-            for point in result['connected_points']:
-                try:
-                    idx = next(idx for idx, p in enumerate(weighted_pivots) if p == point)
-                    connected_indices.append(idx)
-                except StopIteration:
-                    continue
+                # Remove used pairs
+                connected_indices = []
+                for point in result['connected_points']:
+                    try:
+                        idx = next(idx for idx, p in enumerate(weighted_pivots) if p == point)
+                        connected_indices.append(idx)
+                    except StopIteration:
+                        continue
             
-            new_removed_pairs = 0
-            for pi in range(len(connected_indices)):
-                for pj in range(pi + 1, len(connected_indices)):
-                    pair_to_remove = tuple(sorted([connected_indices[pi], connected_indices[pj]]))
-                    if pair_to_remove not in used_trendline_pairs:
-                        used_trendline_pairs.add(pair_to_remove)
-                        new_removed_pairs += 1
+                new_removed_pairs = 0
+                for pi in range(len(connected_indices)):
+                    for pj in range(pi + 1, len(connected_indices)):
+                        pair_to_remove = tuple(sorted([connected_indices[pi], connected_indices[pj]]))
+                        if pair_to_remove not in used_trendline_pairs:
+                            used_trendline_pairs.add(pair_to_remove)
+                            new_removed_pairs += 1
             
-            if len(trendlines) <= 10:
-                print(f"   Found weighted trendline #{len(trendlines)}: {result['strength']} points, "
-                      f"weighted_strength={result['weighted_strength']:.2f}, "
-                      f"avg_weight={result['average_weight']:.3f}, "
-                      f"growth={result['daily_growth_rate']:.4f}%/day")
+                if len(trendlines) <= 10:
+                    print(f"   Found weighted trendline #{len(trendlines)}: {result['strength']} points, "
+                          f"weighted_strength={result['weighted_strength']:.2f}, "
+                          f"avg_weight={result['average_weight']:.3f}, "
+                          f"growth={result['daily_growth_rate']:.4f}%/day")
             
-            # Stop if we have enough trendlines
-            if len(trendlines) >= max_lines:
-                break
-    
+                # Stop if we have enough trendlines
+                if len(trendlines) >= max_lines:
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
     # Sort by weighted strength and R-squared
     trendlines.sort(key=lambda x: (x['weighted_strength'], x['r_squared']), reverse=True)
     
@@ -502,6 +898,19 @@ def detect_time_weighted_trendlines_log(pivots, stock_data, max_lines=30,
     print(f"\n✅ Found {len(trendlines)} valid time-weighted trendlines")
     print(f"   Processed {processed_pairs} pairs, skipped {skipped_pairs} used pairs")
     print(f"   Final selection: {len(top_trendlines)} trendlines")
+
+    if stats is not None:
+        stats.update({
+            'pivots': len(weighted_pivots),
+            'pairs_total': len(all_pairs),
+            'pairs_processed': processed_pairs,
+            'pairs_skipped': skipped_pairs,
+            'refits': refits,
+            'refit_iterations': refit_iterations,
+            'trendlines_accepted': len(trendlines)
+        })
+        if warm_info is not None:
+            stats['warm_start'] = dict(warm_info, mode='fast', divergence=None, equivalent=None)
     
     if top_trendlines:
         strengths = [tl['strength'] for tl in top_trendlines]
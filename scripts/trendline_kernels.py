@@ -0,0 +1,102 @@
+"""
+Trendline Kernels Module
+Batched weighted line fitting over ragged point groups
+
+Groups are passed in CSR form: `offsets` (G+1,) delimits each group's slice of the
+flat `x`, `y` and `w` value arrays, and every statistic is a segment reduction
+(np.add.reduceat), so thousands of small regressions cost a few array passes.
+"""
+
+import numpy as np
+
+
+def csr_from_mask(mask, order=None):
+    """
+    CSR groups from a (G, P) membership mask.
+
+    Args:
+        mask: Boolean (G, P) array; every row must have at least one member
+        order: Optional (G, P) sort key for members within a group (e.g. join round);
+               ties keep column order
+
+    Returns:
+        (offsets, columns): offsets (G+1,) and the member column of each value
+    """
+    rows, columns = np.nonzero(mask)
+    if order is not None:
+        keys = np.lexsort((columns, order[rows, columns], rows))
+        rows, columns = rows[keys], columns[keys]
+    counts = np.bincount(rows, minlength=mask.shape[0])
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return offsets, columns
+
+
+def weighted_line_fit_csr(offsets, x, y, w):
+    """
+    Weighted least-squares line for every group.
+
+    Args:
+        offsets: (G+1,) group boundaries into x, y, w (groups must be non-empty)
+        x, y, w: Flat value arrays
+
+    Returns:
+        Dict of (G,) arrays: slope, intercept, r_squared, denominator, sum_w, count.
+        slope is NaN where the x values of a group have no spread (denominator == 0).
+    """
+    offsets = np.asarray(offsets)
+    starts = offsets[:-1]
+    counts = np.diff(offsets)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    w = np.asarray(w, dtype=float)
+
+    sum_w = np.add.reduceat(w, starts)
+    mean_x = np.add.reduceat(w * x, starts) / sum_w
+    mean_y = np.add.reduceat(w * y, starts) / sum_w
+
+    dx = x - np.repeat(mean_x, counts)
+    dy = y - np.repeat(mean_y, counts)
+    numerator = np.add.reduceat(w * dx * dy, starts)
+    denominator = np.add.reduceat(w * dx ** 2, starts)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = numerator / denominator
+    intercept = mean_y - slope * mean_x
+
+    y_pred = np.repeat(slope, counts) * x + np.repeat(intercept, counts)
+    ss_res = np.add.reduceat(w * (y - y_pred) ** 2, starts)
+    ss_tot = np.add.reduceat(w * dy ** 2, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
+
+    return {
+        'slope': slope,
+        'intercept': intercept,
+        'r_squared': r_squared,
+        'denominator': denominator,
+        'sum_w': sum_w,
+        'count': counts
+    }
+
+
+def band_captures(slope, intercept, x, y, tolerance):
+    """
+    Points inside each line's tolerance band.
+
+    Args:
+        slope, intercept: (G,) line parameters
+        x, y: (P,) candidate points
+        tolerance: Scalar or (P,) per-point band half-width
+
+    Returns:
+        (G, P) boolean mask of |slope * x + intercept - y| <= tolerance
+    """
+    expected = np.asarray(slope)[:, np.newaxis] * x + np.asarray(intercept)[:, np.newaxis]
+    with np.errstate(invalid='ignore'):
+        return np.abs(expected - y) <= tolerance
+
+
+def segment_sum(offsets, values):
+    """Sum of values within each CSR group"""
+    return np.add.reduceat(np.asarray(values, dtype=float), np.asarray(offsets)[:-1])
@@ -0,0 +1,111 @@
+"""
+Window Profile Module
+Per-stage timings and counters for rolling-window trend cloud runs
+
+Each analyzed window produces one flat, picklable record:
+    calculation_date, status, error
+    <stage>_seconds for slice, pivots, trendlines, clouds, plus window_seconds
+    rows, pivots, pairs_total, pairs_processed, pairs_skipped,
+    trendlines_accepted, trendlines, projections, clouds
+
+summarize_profiles() aggregates the records into p50/p95/max per stage and
+counter for the results metadata; write_profile_csv() dumps them one row per
+window so the slow windows of a long run can be inspected directly.
+"""
+
+import time
+import contextlib
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STAGES = ('slice', 'pivots', 'trendlines', 'clouds')
+COUNTERS = ('rows', 'pivots', 'pairs_total', 'pairs_processed', 'pairs_skipped',
+            'trendlines_accepted', 'trendlines', 'projections', 'clouds')
+# Written by change-driven recomputation (recompute_on_change)
+RECOMPUTE_FIELDS = ('recompute', 'change_signals', 'weight_drift', 'center_deviation',
+                    'weight_deviation', 'count_difference')
+CSV_COLUMNS = (('calculation_date', 'status', 'error', 'window_seconds')
+               + tuple(f'{stage}_seconds' for stage in STAGES) + COUNTERS + RECOMPUTE_FIELDS)
+
+
+@contextlib.contextmanager
+def timed(profile, stage):
+    """Add the wall time of the block to profile['<stage>_seconds']"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        key = f'{stage}_seconds'
+        profile[key] = profile.get(key, 0.0) + time.perf_counter() - start
+
+
+def _distribution(values):
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return None
+    return {
+        'count': int(len(values)),
+        'total': float(values.sum()),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'max': float(values.max())
+    }
+
+
+def summarize_profiles(profiles, load_seconds=None, slowest=10):
+    """
+    Aggregate window records for the results metadata.
+
+    Args:
+        profiles: Window records, in calculation-date order
+        load_seconds: Wall time of loading and cleaning the data (None if passed in)
+        slowest: Number of slowest windows to list
+
+    Returns:
+        Dict with per-stage and per-counter distributions, status and exception
+        counts, and the slowest windows with their dominant stage
+    """
+    stages = {}
+    for stage in STAGES + ('window',):
+        key = f'{stage}_seconds'
+        stages[stage] = _distribution([p[key] for p in profiles if key in p])
+
+    window_total = stages['window']['total'] if stages['window'] else 0.0
+    for stage in STAGES:
+        if stages[stage] and window_total:
+            stages[stage]['share'] = stages[stage]['total'] / window_total
+
+    counters = {name: _distribution([p[name] for p in profiles if name in p]) for name in COUNTERS}
+
+    def dominant_stage(profile):
+        timings = {stage: profile.get(f'{stage}_seconds', 0.0) for stage in STAGES}
+        return max(timings, key=timings.get)
+
+    ranked = sorted(profiles, key=lambda p: p.get('window_seconds', 0.0), reverse=True)[:slowest]
+
+    return {
+        'windows_profiled': len(profiles),
+        'load_seconds': load_seconds,
+        'stages': stages,
+        'counters': counters,
+        'status': dict(Counter(p.get('status') for p in profiles)),
+        'exceptions': dict(Counter(p['error'] for p in profiles if p.get('error'))),
+        'slowest_windows': [{
+            'calculation_date': p['calculation_date'],
+            'window_seconds': p.get('window_seconds'),
+            'dominant_stage': dominant_stage(p),
+            'status': p.get('status')
+        } for p in ranked]
+    }
+
+
+def write_profile_csv(profiles, path):
+    """Write one row per window record; returns the path"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pd.DataFrame(list(profiles), columns=list(CSV_COLUMNS))
+    table.to_csv(path, index=False)
+    return path
@@ -0,0 +1,499 @@
+"""
+Work Queue Module
+SQLite work queue for continuous trend cloud runs spread over many processes or hosts
+
+A coordinator splits each symbol's calculation dates into leases in one SQLite
+file on a shared directory. The symbol's cleaned price columns and generator
+parameters are stored with them, so every worker analyzes identical inputs and
+needs nothing but the database file. Workers claim a lease, heartbeat while
+they work, and commit the lease's window results in the same transaction that
+marks it done (only if they still own it). A lease whose holder stops
+heartbeating expires and is claimed again; after max_attempts it is marked
+failed. merge() assembles the standard <SYMBOL>_continuous_trend_clouds.json.
+
+The database uses SQLite's rollback journal rather than WAL, which needs shared
+memory between processes and does not work on network filesystems. Lease
+expiry uses wall-clock time, so worker hosts need roughly synchronized clocks.
+
+Usage:
+    python scripts/work_queue.py init --db /shared/queue.db QQQ SPY --step-size 5 --lease-size 50
+    python scripts/work_queue.py work --db /shared/queue.db --processes 4   # on each host
+    python scripts/work_queue.py status --db /shared/queue.db
+    python scripts/work_queue.py merge --db /shared/queue.db --output-dir results
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import socket
+import sqlite3
+import argparse
+import contextlib
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from continuous_trend_cloud_generator import ContinuousTrendCloudGenerator
+from shared_arrays import price_arrays, price_frame
+from window_profile import summarize_profiles
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    symbol TEXT PRIMARY KEY,
+    parameters TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    analysis_start_date TEXT NOT NULL,
+    analysis_end_date TEXT NOT NULL,
+    total_dates INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prices (
+    symbol TEXT PRIMARY KEY,
+    dates BLOB NOT NULL,
+    prices BLOB NOT NULL,
+    log_prices BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    lease_id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    first_index INTEGER NOT NULL,
+    dates TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS leases_by_status ON leases (status, lease_id);
+CREATE TABLE IF NOT EXISTS results (
+    symbol TEXT NOT NULL,
+    date_index INTEGER NOT NULL,
+    calculation_date TEXT NOT NULL,
+    lease_id INTEGER NOT NULL,
+    clouds TEXT,
+    profile TEXT,
+    PRIMARY KEY (symbol, date_index)
+);
+"""
+
+
+class LeaseLost(Exception):
+    """The lease expired and was claimed by another worker"""
+
+
+class WorkQueue:
+    """Leases of calculation dates in a shared SQLite file"""
+
+    def __init__(self, path, timeout=60.0):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            timeout: Seconds to wait for another process's write lock
+        """
+        self.path = str(path)
+        self._connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self._connection.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+        self._connection.execute("PRAGMA journal_mode = DELETE")
+        with self._transaction() as cursor:
+            for statement in filter(str.strip, SCHEMA.split(';')):
+                cursor.execute(statement)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Write transaction holding the database lock from the start"""
+        cursor = self._connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Coordinator
+
+    def add_symbol(self, symbol, generator, stock_data=None, analysis_period_years=None, lease_size=50):
+        """
+        Split one symbol's calculation dates into leases.
+
+        Re-adding a symbol with the same parameters is a no-op, so init can be rerun.
+
+        Args:
+            symbol: Stock symbol
+            generator: ContinuousTrendCloudGenerator holding the run parameters
+            stock_data: Already cleaned price data; loaded with the generator if None
+            analysis_period_years: Years to analyze from the beginning (None = all)
+            lease_size: Calculation dates per lease
+
+        Returns:
+            Number of leases for the symbol
+
+        Raises:
+            ValueError: If the symbol is already queued with different parameters
+        """
+        parameters = generator.worker_parameters()
+        fingerprint = generator.parameter_fingerprint()
+        existing = self._connection.execute(
+            "SELECT fingerprint FROM jobs WHERE symbol = ?", (symbol,)).fetchone()
+        if existing:
+            if existing[0] != fingerprint:
+                raise ValueError(f"{symbol} is already queued with parameter fingerprint {existing[0]}, "
+                                 f"not {fingerprint}")
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM leases WHERE symbol = ?", (symbol,)).fetchone()[0]
+
+        if stock_data is None:
+            stock_data = generator.load_and_clean_data(symbol)
+
+        analysis_start_date = stock_data['Date'].iloc[0]
+        analysis_end_date = stock_data['Date'].iloc[-1]
+        if analysis_period_years:
+            analysis_end_date = min(analysis_start_date + pd.Timedelta(days=int(analysis_period_years * 365.25)),
+                                    analysis_end_date)
+        calculation_dates = generator.calculation_dates(stock_data, analysis_start_date, analysis_end_date)
+
+        arrays = price_arrays(stock_data)
+        with self._transaction() as cursor:
+            cursor.execute("INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)", (
+                symbol, json.dumps(parameters), fingerprint, analysis_start_date.isoformat(),
+                analysis_end_date.isoformat(), len(calculation_dates), time.time()))
+            cursor.execute("INSERT INTO prices VALUES (?, ?, ?, ?)", (
+                symbol, arrays['Date'].tobytes(), arrays['Price'].tobytes(), arrays['LogPrice'].tobytes()))
+            for first in range(0, len(calculation_dates), lease_size):
+                dates = [d.isoformat() for d in calculation_dates[first:first + lease_size]]
+                cursor.execute("INSERT INTO leases (symbol, first_index, dates) VALUES (?, ?, ?)",
+                               (symbol, first, json.dumps(dates)))
+
+        return math.ceil(len(calculation_dates) / lease_size)
+
+    def status(self):
+        """Lease counts per symbol and status: {symbol: {status: count}}"""
+        counts = {}
+        for symbol, status, count in self._connection.execute(
+                "SELECT symbol, status, COUNT(*) FROM leases GROUP BY symbol, status ORDER BY symbol"):
+            counts.setdefault(symbol, {})[status] = count
+        return counts
+
+    def outstanding(self):
+        """Leases not yet done or failed"""
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM leases WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+    def symbols(self):
+        return [row[0] for row in self._connection.execute("SELECT symbol FROM jobs ORDER BY symbol")]
+
+    # Workers
+
+    def claim(self, worker, lease_seconds=300.0, max_attempts=3):
+        """
+        Lease the first pending (or expired) batch of dates to worker.
+
+        Returns:
+            Dict with lease_id, symbol, first_index, dates (Timestamps) and attempt,
+            or None if nothing is claimable right now
+        """
+        now = time.time()
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE leases SET status = 'failed', error = 'lease expired after ' || attempts || ' attempts' "
+                "WHERE status = 'leased' AND expires_at < ? AND attempts >= ?", (now, max_attempts))
+            row = cursor.execute(
+                "SELECT lease_id, symbol, first_index, dates, attempts FROM leases "
+                "WHERE status = 'pending' OR (status = 'leased' AND expires_at < ?) "
+                "ORDER BY lease_id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            lease_id, symbol, first_index, dates, attempts = row
+            cursor.execute(
+                "UPDATE leases SET status = 'leased', worker = ?, attempts = attempts + 1, expires_at = ? "
+                "WHERE lease_id = ?", (worker, now + lease_seconds, lease_id))
+
+        return {
+            'lease_id': lease_id,
+            'symbol': symbol,
+            'first_index': first_index,
+            'dates': [pd.Timestamp(d) for d in json.loads(dates)],
+            'attempt': attempts + 1
+        }
+
+    def heartbeat(self, lease_id, worker, lease_seconds=300.0):
+        """Extend a lease; False if the worker no longer holds it"""
+        with self._transaction() as cursor:
+            cursor.execute("UPDATE leases SET expires_at = ? WHERE lease_id = ? AND worker = ? AND status = 'leased'",
+                           (time.time() + lease_seconds, lease_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, lease, worker, window_results, profiles):
+        """
+        Store a lease's window results and mark it done, if worker still holds it.
+
+        Args:
+            lease: Dict returned by claim()
+            worker: Worker id that claimed the lease
+            window_results: (records, detail) per date, as from analyze_chunk
+            profiles: Window profile records, one per date
+
+        Returns:
+            False if the lease was lost to another worker (nothing is written)
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE leases SET status = 'done', finished_at = ?, error = NULL "
+                "WHERE lease_id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), lease['lease_id'], worker))
+            if cursor.rowcount != 1:
+                return False
+            cursor.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", [
+                (lease['symbol'], lease['first_index'] + k, calc_date.isoformat(), lease['lease_id'],
+                 json.dumps(records) if records else None, json.dumps(profile, default=str))
+                for k, (calc_date, (records, _), profile)
+                in enumerate(zip(lease['dates'], window_results, profiles))
+            ])
+        return True
+
+    def fail(self, lease, worker, error, max_attempts=3):
+        """Release a lease after an error: pending again, or failed after max_attempts"""
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE leases SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, expires_at = NULL WHERE lease_id = ? AND worker = ? AND status = 'leased'",
+                (max_attempts, str(error)[:1000], lease['lease_id'], worker))
+
+    def load_job(self, symbol):
+        """(generator parameters, price DataFrame) stored for a symbol"""
+        parameters = json.loads(self._connection.execute(
+            "SELECT parameters FROM jobs WHERE symbol = ?", (symbol,)).fetchone()[0])
+        dates, prices, log_prices = self._connection.execute(
+            "SELECT dates, prices, log_prices FROM prices WHERE symbol = ?", (symbol,)).fetchone()
+        stock_data = price_frame({
+            'Date': np.frombuffer(dates, dtype=np.int64),
+            'Price': np.frombuffer(prices, dtype=np.float64),
+            'LogPrice': np.frombuffer(log_prices, dtype=np.float64)
+        })
+        return parameters, stock_data
+
+    # Merge
+
+    def merge(self, symbol, output_dir=None):
+        """
+        Assemble the standard results of a finished symbol and save them.
+
+        Args:
+            symbol: Stock symbol
+            output_dir: Results directory (default: the queued generator's output_dir)
+
+        Returns:
+            (results dict, saved JSON path)
+
+        Raises:
+            ValueError: If any of the symbol's leases is not done
+        """
+        counts = self.status().get(symbol, {})
+        unfinished = {status: count for status, count in counts.items() if status != 'done'}
+        if unfinished:
+            raise ValueError(f"{symbol} is not finished: {unfinished}")
+
+        parameters = json.loads(self._connection.execute(
+            "SELECT parameters FROM jobs WHERE symbol = ?", (symbol,)).fetchone()[0])
+        if output_dir is not None:
+            parameters['output_dir'] = str(output_dir)
+        generator = ContinuousTrendCloudGenerator(**parameters)
+
+        start, end, total_dates = self._connection.execute(
+            "SELECT analysis_start_date, analysis_end_date, total_dates FROM jobs WHERE symbol = ?",
+            (symbol,)).fetchone()
+
+        all_trend_clouds = []
+        profiles = []
+        successful_calculations = 0
+        for clouds, profile in self._connection.execute(
+                "SELECT clouds, profile FROM results WHERE symbol = ? ORDER BY date_index", (symbol,)):
+            if clouds:
+                all_trend_clouds.extend(json.loads(clouds))
+                successful_calculations += 1
+            if profile:
+                profiles.append(json.loads(profile))
+
+        if len(profiles) != total_dates:
+            raise ValueError(f"{symbol} has results for {len(profiles)} of {total_dates} calculation dates")
+
+        results = {
+            'metadata': generator.results_metadata(symbol, pd.Timestamp(start), pd.Timestamp(end), total_dates,
+                                                   successful_calculations, len(all_trend_clouds)),
+            'trend_clouds': all_trend_clouds
+        }
+        if generator.recompute_on_change:
+            results['metadata']['recompute'] = generator._recompute_summary(profiles)
+        results['metadata']['profile'] = summarize_profiles(profiles)
+
+        leases, workers, reclaimed = self._connection.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT worker), SUM(attempts > 1) FROM leases WHERE symbol = ?",
+            (symbol,)).fetchone()
+        results['metadata']['work_queue'] = {
+            'database': os.path.abspath(self.path),
+            'leases': leases,
+            'workers': workers,
+            'reclaimed_leases': reclaimed or 0
+        }
+
+        if all_trend_clouds:
+            results['summary'] = generator.results_summary(all_trend_clouds)
+
+        json_path = generator.save_results(results, symbol)
+        return results, json_path
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(db_path, worker_id=None, lease_seconds=300.0, poll_interval=5.0, max_attempts=3):
+    """
+    Claim and process leases until every lease is done or failed.
+
+    When nothing is claimable but other workers still hold leases, the worker
+    keeps polling so that it can pick up leases that expire.
+
+    Returns:
+        Number of leases this worker completed
+    """
+    worker_id = worker_id or default_worker_id()
+    completed = 0
+    jobs = {}
+
+    with WorkQueue(db_path) as queue:
+        while True:
+            lease = queue.claim(worker_id, lease_seconds, max_attempts)
+            if lease is None:
+                if queue.outstanding() == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            symbol = lease['symbol']
+            print(f"🔧 {worker_id}: lease {lease['lease_id']} ({symbol}, {len(lease['dates'])} dates, "
+                  f"attempt {lease['attempt']})")
+
+            last_heartbeat = [time.monotonic()]
+
+            def heartbeat(_):
+                if time.monotonic() - last_heartbeat[0] >= lease_seconds / 3:
+                    if not queue.heartbeat(lease['lease_id'], worker_id, lease_seconds):
+                        raise LeaseLost(f"Lease {lease['lease_id']} was reclaimed")
+                    last_heartbeat[0] = time.monotonic()
+
+            try:
+                if symbol not in jobs:
+                    parameters, stock_data = queue.load_job(symbol)
+                    jobs[symbol] = (ContinuousTrendCloudGenerator(**parameters), stock_data)
+                generator, stock_data = jobs[symbol]
+                window_results, _, profiles = generator.analyze_chunk(stock_data, lease['dates'],
+                                                                      on_window=heartbeat)
+            except LeaseLost as e:
+                print(f"⚠️ {worker_id}: {e}")
+                continue
+            except Exception as e:
+                print(f"❌ {worker_id}: lease {lease['lease_id']} failed: {type(e).__name__}: {e}")
+                queue.fail(lease, worker_id, f"{type(e).__name__}: {e}", max_attempts)
+                continue
+
+            if queue.complete(lease, worker_id, window_results, profiles):
+                completed += 1
+            else:
+                print(f"⚠️ {worker_id}: lease {lease['lease_id']} was reclaimed before it finished")
+
+    print(f"✅ {worker_id}: {completed} leases completed")
+    return completed
+
+
+def _worker_process(db_path, lease_seconds, poll_interval, max_attempts):
+    run_worker(db_path, lease_seconds=lease_seconds, poll_interval=poll_interval, max_attempts=max_attempts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distributed continuous trend cloud runs over a SQLite work queue')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    init = subparsers.add_parser('init', help='Queue symbols as leases of calculation dates')
+    init.add_argument('symbols', nargs='+')
+    init.add_argument('--db', required=True)
+    init.add_argument('--window-size', type=int, default=365)
+    init.add_argument('--step-size', type=int, default=5)
+    init.add_argument('--years', type=float, default=None, help='Years to analyze from the beginning')
+    init.add_argument('--lease-size', type=int, default=50, help='Calculation dates per lease')
+    init.add_argument('--output-dir', default='results')
+
+    work = subparsers.add_parser('work', help='Process leases until the queue is drained')
+    work.add_argument('--db', required=True)
+    work.add_argument('--processes', type=int, default=1, help='Worker processes on this host')
+    work.add_argument('--lease-seconds', type=float, default=300.0)
+    work.add_argument('--poll-interval', type=float, default=5.0)
+    work.add_argument('--max-attempts', type=int, default=3)
+
+    status = subparsers.add_parser('status', help='Lease counts per symbol')
+    status.add_argument('--db', required=True)
+
+    merge = subparsers.add_parser('merge', help='Write standard results JSON for finished symbols')
+    merge.add_argument('symbols', nargs='*', help='Symbols to merge (default: all)')
+    merge.add_argument('--db', required=True)
+    merge.add_argument('--output-dir', default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        with WorkQueue(args.db) as queue:
+            for symbol in args.symbols:
+                symbol = symbol.upper()
+                generator = ContinuousTrendCloudGenerator(window_size=args.window_size, step_size=args.step_size,
+                                                          output_dir=args.output_dir)
+                leases = queue.add_symbol(symbol, generator, analysis_period_years=args.years,
+                                          lease_size=args.lease_size)
+                print(f"📥 {symbol}: {leases} leases")
+
+    elif args.command == 'work':
+        if args.processes <= 1:
+            run_worker(args.db, lease_seconds=args.lease_seconds, poll_interval=args.poll_interval,
+                       max_attempts=args.max_attempts)
+        else:
+            processes = [multiprocessing.Process(target=_worker_process,
+                                                 args=(args.db, args.lease_seconds, args.poll_interval,
+                                                       args.max_attempts))
+                         for _ in range(args.processes)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+    elif args.command == 'status':
+        with WorkQueue(args.db) as queue:
+            for symbol, counts in queue.status().items():
+                print(f"{symbol}: " + ", ".join(f"{status} {count}" for status, count in sorted(counts.items())))
+
+    elif args.command == 'merge':
+        with WorkQueue(args.db) as queue:
+            failed = False
+            for symbol in [s.upper() for s in args.symbols] or queue.symbols():
+                try:
+                    results, json_path = queue.merge(symbol, args.output_dir)
+                    print(f"✅ {symbol}: {len(results['trend_clouds'])} clouds → {json_path}")
+                except ValueError as e:
+                    print(f"❌ {e}")
+                    failed = True
+            sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
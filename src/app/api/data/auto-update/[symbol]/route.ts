@@ -5,6 +5,7 @@ import { APIResponse, Timeframe } from '@/types';
 import { spawn } from 'child_process';
 import path from 'path';
 import fs from 'fs';
+import { callAnalysis, AnalysisServerUnavailableError } from '@/lib/services/analysis-client';
 
 const freshnessService = new DataFreshnessService();
 const multiTimeframeService = new MultiTimeframeService();
@@ -277,16 +278,48 @@ export async function POST(
 }
 
 /**
- * Generate trend clouds using Python script
+ * Generate trend clouds on the analysis server, or with the same generator as a Python
+ * process if it is not running. Both run SingleTrendCloudGenerator (365-day window,
+ * 5-day projection) and share the results/cache result cache
  */
 async function generateTrendClouds(symbol: string): Promise<{
   success: boolean;
   cloudCount: number;
   error?: string;
+}> {
+  try {
+    // Writes results/<SYMBOL>_continuous_trend_clouds.json like the fallback. The
+    // result cache watermark changes on any inserted or rewritten bar (INSERT OR REPLACE
+    // assigns a new row id), so newly fetched or updated prices force a recompute
+    const results = await callAnalysis<{ trend_clouds: unknown[] }>('single_trend_clouds', {
+      symbol,
+      save: true
+    });
+    return { success: true, cloudCount: results.trend_clouds.length };
+  } catch (error) {
+    if (error instanceof AnalysisServerUnavailableError) {
+      console.warn(`⚠️ ${error.message} - spawning Python instead`);
+      return spawnTrendCloudGeneration(symbol);
+    }
+    return {
+      success: false,
+      cloudCount: 0,
+      error: error instanceof Error ? error.message : 'Unknown error'
+    };
+  }
+}
+
+/**
+ * Generate trend clouds by running scripts/single_trend_cloud_generator.py
+ */
+function spawnTrendCloudGeneration(symbol: string): Promise<{
+  success: boolean;
+  cloudCount: number;
+  error?: string;
 }> {
   return new Promise((resolve) => {
     const projectRoot = process.cwd();
-    const scriptPath = path.join(projectRoot, 'generate_trend_clouds.py'); // Assuming this script exists
+    const scriptPath = path.join(projectRoot, 'scripts', 'single_trend_cloud_generator.py');
 
     // Check if Python script exists
     if (!fs.existsSync(scriptPath)) {
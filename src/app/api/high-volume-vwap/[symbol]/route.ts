@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { spawn } from 'child_process';
 import path from 'path';
+import { callAnalysis, AnalysisServerUnavailableError } from '@/lib/services/analysis-client';
 
 interface HighVolumeVWAPResponse {
   success: boolean;
@@ -89,58 +90,27 @@ export async function GET(
       }, { status: 400 });
     }
 
-    // Call Python script for high volume VWAP analysis
-    const pythonScriptPath = path.join(process.cwd(), 'scripts', 'api_high_volume_vwap.py');
-
-    const pythonArgs = [
-      pythonScriptPath,
-      symbol.toUpperCase(),
-      topVolumeDays.toString(),
-      volumeThreshold.toString(),
-      startDate,
-      useCache.toString()
-    ];
-
     console.log(`🚀 Starting high volume VWAP analysis for ${symbol}...`);
     console.log(`Parameters: ${topVolumeDays} days, ${volumeThreshold}% threshold, from ${startDate}`);
 
-    const result = await new Promise<HighVolumeVWAPResponse>((resolve, reject) => {
-      const pythonProcess = spawn('python3', pythonArgs);
-
-      let stdout = '';
-      let stderr = '';
-
-      pythonProcess.stdout.on('data', (data) => {
-        stdout += data.toString();
+    let result: HighVolumeVWAPResponse;
+    try {
+      // Resident analysis server: no interpreter start-up, price history cached
+      const data = await callAnalysis<HighVolumeVWAPResponse['data']>('high_volume_vwap', {
+        symbol: symbol.toUpperCase(),
+        top_volume_days: topVolumeDays,
+        volume_threshold: volumeThreshold,
+        start_date: startDate,
+        refresh: !useCache
       });
-
-      pythonProcess.stderr.on('data', (data) => {
-        stderr += data.toString();
-      });
-
-      pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-          console.error(`Python process exited with code ${code}`);
-          console.error(`stderr: ${stderr}`);
-          reject(new Error(`Python analysis failed with code ${code}: ${stderr}`));
-        } else {
-          try {
-            const result = JSON.parse(stdout) as HighVolumeVWAPResponse;
-            resolve(result);
-          } catch (parseError) {
-            console.error('Failed to parse Python output:', parseError);
-            console.error('stdout:', stdout);
-            console.error('stderr:', stderr);
-            reject(new Error(`Failed to parse analysis results: ${parseError}`));
-          }
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        console.error('Failed to start Python process:', error);
-        reject(new Error(`Failed to start analysis process: ${error.message}`));
-      });
-    });
+      result = { success: true, data };
+    } catch (error) {
+      if (!(error instanceof AnalysisServerUnavailableError)) {
+        throw error;
+      }
+      console.warn(`⚠️ ${error.message} - spawning Python instead`);
+      result = await spawnHighVolumeVWAP(symbol, topVolumeDays, volumeThreshold, startDate, useCache);
+    }
 
     // Add metadata
     const processingTime = Date.now() - startTime;
@@ -213,4 +183,64 @@ export async function POST(
       }
     }, { status: 400 });
   }
-}
\ No newline at end of file
+}
+
+/**
+ * Run the analysis in a fresh Python process (used when the analysis server is not running)
+ */
+function spawnHighVolumeVWAP(
+  symbol: string,
+  topVolumeDays: number,
+  volumeThreshold: number,
+  startDate: string,
+  useCache: boolean
+): Promise<HighVolumeVWAPResponse> {
+  const pythonScriptPath = path.join(process.cwd(), 'scripts', 'api_high_volume_vwap.py');
+
+  const pythonArgs = [
+    pythonScriptPath,
+    symbol.toUpperCase(),
+    topVolumeDays.toString(),
+    volumeThreshold.toString(),
+    startDate,
+    useCache.toString()
+  ];
+
+  return new Promise<HighVolumeVWAPResponse>((resolve, reject) => {
+    const pythonProcess = spawn('python3', pythonArgs);
+
+    let stdout = '';
+    let stderr = '';
+
+    pythonProcess.stdout.on('data', (data) => {
+      stdout += data.toString();
+    });
+
+    pythonProcess.stderr.on('data', (data) => {
+      stderr += data.toString();
+    });
+
+    pythonProcess.on('close', (code) => {
+      if (code !== 0) {
+        console.error(`Python process exited with code ${code}`);
+        console.error(`stderr: ${stderr}`);
+        reject(new Error(`Python analysis failed with code ${code}: ${stderr}`));
+      } else {
+        try {
+          const result = JSON.parse(stdout) as HighVolumeVWAPResponse;
+          resolve(result);
+        } catch (parseError) {
+          console.error('Failed to parse Python output:', parseError);
+          console.error('stdout:', stdout);
+          console.error('stderr:', stderr);
+          reject(new Error(`Failed to parse analysis results: ${parseError}`));
+        }
+      }
+    });
+
+    pythonProcess.on('error', (error) => {
+      console.error('Failed to start Python process:', error);
+      reject(new Error(`Failed to start analysis process: ${error.message}`));
+    });
+  });
+}
@@ -0,0 +1,74 @@
+/**
+ * Analysis Server Client
+ * JSON-RPC client for the resident Python analysis server (scripts/analysis_server.py),
+ * so API routes can skip spawning a Python interpreter per request.
+ *
+ * Start the server from the project root:
+ *   python scripts/analysis_server.py serve --port 8765
+ */
+
+export type AnalysisMethod = 'single_trend_clouds' | 'high_volume_vwap' | 'patterns' | 'fibonacci_pivots';
+
+const ANALYSIS_SERVER_URL = process.env.ANALYSIS_SERVER_URL || 'http://127.0.0.1:8765';
+
+let nextRequestId = 1;
+
+/** The server is not running (or disabled with ANALYSIS_SERVER_URL=off); callers may fall back to spawning */
+export class AnalysisServerUnavailableError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'AnalysisServerUnavailableError';
+  }
+}
+
+/** The server answered with a JSON-RPC error */
+export class AnalysisError extends Error {
+  constructor(message: string, public code: number) {
+    super(message);
+    this.name = 'AnalysisError';
+  }
+}
+
+/**
+ * Call an analysis method on the resident server
+ *
+ * @throws AnalysisServerUnavailableError if the server cannot be reached
+ * @throws AnalysisError if the analysis failed or the params were rejected
+ */
+export async function callAnalysis<T = any>(
+  method: AnalysisMethod,
+  params: Record<string, unknown>,
+  timeoutMs: number = 5 * 60 * 1000
+): Promise<T> {
+  if (ANALYSIS_SERVER_URL === 'off') {
+    throw new AnalysisServerUnavailableError('Analysis server disabled');
+  }
+
+  let response: Response;
+  try {
+    response = await fetch(`${ANALYSIS_SERVER_URL}/rpc`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        jsonrpc: '2.0',
+        id: nextRequestId++,
+        method,
+        params: { ...params, timeout: timeoutMs / 1000 }
+      }),
+      signal: AbortSignal.timeout(timeoutMs + 5000)
+    });
+  } catch (error) {
+    if (error instanceof Error && error.name === 'TimeoutError') {
+      throw new AnalysisError(`${method} timed out after ${timeoutMs}ms`, -32002);
+    }
+    throw new AnalysisServerUnavailableError(
+      `Analysis server unreachable at ${ANALYSIS_SERVER_URL}: ${error instanceof Error ? error.message : error}`
+    );
+  }
+
+  const payload = await response.json();
+  if (payload.error) {
+    throw new AnalysisError(payload.error.message, payload.error.code);
+  }
+  return payload.result as T;
+}